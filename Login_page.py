@@ -1,9 +1,11 @@
 import streamlit as st
-import json
-import os
 import hashlib
 import platform
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from utils.user_store import open_user_store, read_bulk_csv
+from utils.datasets import forget_datasets
+from utils.workspace import forget_session_state
 
 # =========================
 # PAGE CONFIG
@@ -76,21 +78,15 @@ if "device_id" not in st.session_state:
     st.session_state.device_id = None
 
 # =========================
-# FILE HANDLERS
+# USER STORE
 # =========================
-USER_FILE = "users.json"
-
-if not os.path.exists(USER_FILE):
-    with open(USER_FILE, "w") as f:
-        json.dump({"admin@test.com": {"password": "123", "expiry": "2030-01-01", "device": ""}}, f)
-
-def load_users():
-    with open(USER_FILE, "r") as f:
-        return json.load(f)
+# SQLite (WAL) by default, users.json is migrated on first start.
+# Set USER_STORE=json to keep the old whole-file backend.
+@st.cache_resource
+def get_user_store():
+    return open_user_store()
 
-def save_users(data):
-    with open(USER_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+store = get_user_store()
 
 def device_fingerprint():
     base = platform.system() + platform.machine() + platform.processor()
@@ -121,26 +117,24 @@ def login_page():
             submitted = st.form_submit_button("Log In")
             
             if submitted:
-                users = load_users()
+                user = store.get(email)
 
-                if email not in users:
+                if user is None:
                     st.error("Invalid User ID")
                     return
 
-                if users[email]["password"] != password:
+                if user["password"] != password:
                     st.error("Incorrect Password")
                     return
 
-                if is_expired(users[email]["expiry"]):
+                if is_expired(user["expiry"]):
                     st.error("❌ Subscription Expired")
                     return
 
                 current_device = device_fingerprint()
 
-                if users[email]["device"] == "":
-                    users[email]["device"] = current_device
-                    save_users(users)
-                elif users[email]["device"] != current_device:
+                # binds on first login, atomic so two sessions can't both claim the account
+                if not store.bind_device(email, current_device):
                     st.error("❌ Account registered on another device")
                     return
 
@@ -165,34 +159,56 @@ if st.sidebar.button("Logout"):
     st.session_state.logged_in = False
     st.session_state.user_email = None
     st.session_state.device_id = None
+    forget_session_state()
+    forget_datasets()
     st.rerun()
 
 # Admin Panel
 if st.session_state.user_email == "admin@test.com":
     st.sidebar.subheader("👑 Admin Panel")
-    users = load_users()
     
     with st.sidebar.expander("➕ Add User"):
         new_email = st.text_input("New Email")
         new_pass = st.text_input("New Password")
         new_exp = st.date_input("Expiry")
         if st.button("Create"):
-            users[new_email] = {"password": new_pass, "expiry": str(new_exp), "device": ""}
-            save_users(users)
+            store.upsert(new_email, new_pass, str(new_exp))
             st.success("Done")
             
     with st.sidebar.expander("⚙ Manage"):
-        u_sel = st.selectbox("Select User", list(users.keys()))
+        u_sel = st.selectbox("Select User", store.list_emails())
         if st.button("Reset Device"):
-            users[u_sel]["device"] = ""
-            save_users(users)
+            store.reset_device(u_sel)
             st.success("Device Reset")
         if st.button("Delete User"):
             if u_sel != "admin@test.com":
-                users.pop(u_sel)
-                save_users(users)
+                store.delete(u_sel)
                 st.rerun()
 
+    with st.sidebar.expander("📥 Bulk Import (CSV)"):
+        st.caption("Columns: email, password, expiry (YYYY-MM-DD), reset_device (yes/no)")
+        bulk_file = st.file_uploader("Users CSV", type=["csv"], key="bulk_users_csv")
+        if bulk_file is not None:
+            bulk_rows, bulk_errors = read_bulk_csv(bulk_file.getvalue())
+            for err in bulk_errors[:10]:
+                st.warning(err)
+            st.write(f"{len(bulk_rows)} user row(s) ready")
+            if st.button("Apply Bulk Import") and bulk_rows:
+                counts = store.bulk_apply(bulk_rows)
+                st.success(f"Added {counts['inserted']}, updated {counts['updated']}, skipped {counts['skipped']}")
+
+    with st.sidebar.expander("⏳ Expiring Soon"):
+        days = st.number_input("Next N days", min_value=1, max_value=365, value=7)
+        today = datetime.today().date()
+        soon = store.expiring_between(str(today), str(today + timedelta(days=int(days))))
+        if soon:
+            st.dataframe([{"User": e, "Expiry": x} for e, x in soon], hide_index=True)
+        else:
+            st.write("No subscriptions expiring in this window.")
+        if st.button("🗑 Purge Expired"):
+            removed = store.purge_expired(str(today), keep=["admin@test.com"])
+            st.success(f"Removed {removed} expired user(s)")
+
 # --- MAIN DASHBOARD CONTENT ---
 st.title("📊 Secure Dashboard")
 st.success("Login Successful. Welcome to the secure area.")
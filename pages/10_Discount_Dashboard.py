@@ -4,6 +4,13 @@ from datetime import datetime
 from fpdf import FPDF
 from io import BytesIO
 
+from utils.compact import compact_frame
+from utils.dedup import distinct_uploads, drop_overlapping_rows, summary
+from utils.ingest import expand_zips, read_uploads
+from utils.sku_index import sku_index
+from utils.upload_readers import discount_csv
+from utils.workspace import persist_state, restore_state, uploads_or_saved
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -38,27 +45,38 @@ required_cols = [
     COL_DISC_PRICE,
 ]
 
+# sirf yehi columns padhe jaate hain, seedha sahi type mein (utils.csv_stream)
+COL_DTYPES = {
+    COL_REASON: "category",
+    COL_SUBORDER: "str",
+    COL_ORDER_DATE: "str",
+    COL_PRODUCT: "str",
+    COL_SKU: "str",
+    COL_LIST_PRICE: "number",
+    COL_DISC_PRICE: "number",
+}
+
 # 1) CSV Upload & Merge
 with st.expander("📂 CSV Upload & Merge (Multiple Files)", expanded=True):
     uploaded_files = st.file_uploader(
-        "Ek ya multiple Orders CSV files upload karein",
-        type=["csv"],
+        "Ek ya multiple Orders CSV files (ya unki ZIP) upload karein",
+        type=["csv", "zip"],
         accept_multiple_files=True,
     )
+    uploaded_files = uploads_or_saved("discount_uploads", uploaded_files)
 
     merged_df = None
     if uploaded_files:
         dfs = []
         base_cols = None
 
-        for file in uploaded_files:
-            try:
-                temp_df = pd.read_csv(file)
-            except pd.errors.EmptyDataError:
+        files, dup_files = distinct_uploads(expand_zips(uploaded_files, (".csv",)))
+        for file, temp_df in zip(files, read_uploads(files, discount_csv, COL_DTYPES)):
+            if isinstance(temp_df, pd.errors.EmptyDataError):
                 st.warning(f"{file.name} khali hai (no data), isko skip kiya gaya.")
                 continue
-            except Exception as e:
-                st.error(f"{file.name} read karne mein error: {e}")
+            if isinstance(temp_df, Exception):
+                st.error(f"{file.name} read karne mein error: {temp_df}")
                 continue
 
             if temp_df.empty:
@@ -74,10 +92,15 @@ with st.expander("📂 CSV Upload & Merge (Multiple Files)", expanded=True):
                 temp_df = temp_df.reindex(columns=base_cols)
                 dfs.append(temp_df)
 
+        dfs, dup_rows, dup_keys = drop_overlapping_rows(dfs)
+        dropped = summary(dup_files, dup_rows, dup_keys)
+        if dropped:
+            st.info(dropped)
+
         if dfs:
-            merged_df = pd.concat(dfs, ignore_index=True)
+            merged_df = compact_frame(pd.concat(dfs, ignore_index=True))
             st.success(
-                f"Total {len(uploaded_files)} file(s) merge ho gayi hain. "
+                f"Total {len(files)} file(s) merge ho gayi hain. "
                 f"Total rows: {len(merged_df)}"
             )
         else:
@@ -124,12 +147,11 @@ if isinstance(end_date, datetime):
 
 # ================= SKU Grouping System (INTEGRATED) =================
 # Prepare SKU List
-df[COL_SKU] = df[COL_SKU].astype(str)
 all_skus = sorted(df[COL_SKU].dropna().unique().tolist())
+sku_search = sku_index(all_skus)
 
 # --- Session State Init ---
-if 'sku_groups' not in st.session_state:
-    st.session_state['sku_groups'] = []
+restore_state('sku_groups', default=[])
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📦 SKU Group Manager")
@@ -142,7 +164,7 @@ with st.sidebar.expander("➕ Create New Group", expanded=False):
     # Find Matches
     found_matches = []
     if search_keyword:
-        found_matches = [s for s in all_skus if search_keyword.lower() in s.lower()]
+        found_matches = sku_search.match(search_keyword)
     
     st.caption(f"Step 2: Review Selection ({len(found_matches)} found)")
     
@@ -182,6 +204,7 @@ with st.sidebar.expander("➕ Create New Group", expanded=False):
                     break
             if not found:
                 st.session_state["sku_groups"].append({"name": group_name_input, "skus": selected_for_group})
+            persist_state("sku_groups")
             st.toast(f"✅ Group '{group_name_input}' Saved with {len(selected_for_group)} SKUs!")
         else:
             st.toast("⚠️ Name and valid selection required.")
@@ -191,6 +214,7 @@ with st.sidebar.expander("➕ Create New Group", expanded=False):
     st.markdown("---")
     if st.button("🧹 Clear All Groups"):
         st.session_state["sku_groups"] = []
+        persist_state("sku_groups")
         st.rerun()
 
 # --- Group Selection Logic ---
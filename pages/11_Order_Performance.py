@@ -19,6 +19,13 @@ from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 
+from utils.ads_ledger import AdsLedger
+from utils.compact import compact_frame
+from utils.dedup import distinct_uploads, drop_overlapping_rows, summary
+from utils.ingest import expand_zips, read_uploads
+from utils.upload_readers import ads_cost_file, order_performance_file
+from utils.workspace import uploads_or_saved
+
 # ================= STREAMLIT PAGE =================
 st.set_page_config(page_title="📦 Meesho Orders & Ads Dashboard", layout="wide")
 
@@ -47,23 +54,17 @@ st.markdown('<div class="title">📊 Meesho Orders & Ads Dashboard</div>', unsaf
 st.markdown('<div class="subtitle">Upload Orders + Ads → Insights → Export Reports</div>', unsafe_allow_html=True)
 
 # ================= HELPERS =================
-def detect_and_load(file):
-    name = file.name.lower()
-    if name.endswith(".csv"):
-        return pd.read_csv(file, low_memory=False)
-    elif name.endswith((".xls", ".xlsx")):
-        return pd.read_excel(file)
-    else:
-        raise ValueError("Upload CSV or Excel only.")
-
 def merge_multiple(files):
-    dfs = []
-    for i, f in enumerate(files):
-        df = detect_and_load(f)
-        if i > 0:
-            df = df.iloc[1:]
-        dfs.append(df)
-    return pd.concat(dfs, ignore_index=True)
+    files, dup_files = distinct_uploads(files)
+    dfs = read_uploads(files, order_performance_file)
+    for df in dfs:
+        if isinstance(df, Exception):
+            raise df
+    dfs, dup_rows, dup_keys = drop_overlapping_rows(dfs)
+    dropped = summary(dup_files, dup_rows, dup_keys)
+    if dropped:
+        st.info(dropped)
+    return compact_frame(pd.concat(dfs, ignore_index=True))
 
 def to_excel_bytes(df):
     buf = BytesIO()
@@ -72,7 +73,7 @@ def to_excel_bytes(df):
     return buf.getvalue()
 
 def robust_parse_dates(series):
-    s = pd.to_datetime(series, errors="coerce", infer_datetime_format=True)
+    s = pd.to_datetime(series, errors="coerce")
     if s.notna().any():
         return s
     return pd.to_datetime(series, errors="coerce", dayfirst=True)
@@ -103,29 +104,35 @@ st.sidebar.markdown("### Upload Files")
 
 uploaded_orders = st.sidebar.file_uploader(
     "Upload Orders Files",
-    type=["csv","xls","xlsx"],
+    type=["csv","xls","xlsx","zip"],
     accept_multiple_files=True,
     key="orders"
 )
+uploaded_orders = uploads_or_saved("order_performance_orders", uploaded_orders, st.sidebar)
 
 uploaded_ads = st.sidebar.file_uploader(
     "Upload Ads Cost Files",
-    type=["csv","xls","xlsx"],
+    type=["csv","xls","xlsx","zip"],
     accept_multiple_files=True,
     key="ads"
 )
+uploaded_ads = uploads_or_saved("order_performance_ads", uploaded_ads, st.sidebar)
 
 if not uploaded_orders:
     st.info("⚠️ Please upload Orders file to continue.")
     st.stop()
 
 # ================= LOAD ORDERS =================
-df = merge_multiple(uploaded_orders)
+order_files = expand_zips(uploaded_orders)
+if not order_files:
+    st.info("⚠️ The ZIP has no CSV / Excel orders file.")
+    st.stop()
+df = merge_multiple(order_files)
 cols = list(df.columns)
 
 supplier_id = "Unknown"
 try:
-    match = re.search(r"_(\d+)\.csv$", uploaded_orders[0].name)
+    match = re.search(r"_(\d+)\.csv$", order_files[0].name)
     if match:
         supplier_id = match.group(1)
 except:
@@ -204,22 +211,17 @@ st.plotly_chart(fig_time, use_container_width=True)
 
 # ================= ADS DASHBOARD (ENHANCED) =================
 if uploaded_ads:
-    ads_frames = []
-    for f in uploaded_ads:
-        raw = pd.read_excel(f, header=None)
-        raw = raw.drop(index=[0,2], errors="ignore").reset_index(drop=True)
-        raw.columns = raw.iloc[0]
-        raw = raw.drop(index=0).reset_index(drop=True)
-        ads_frames.append(raw)
-
-    ads = pd.concat(ads_frames, ignore_index=True)
-    ads["_date"] = pd.to_datetime(ads["Deduction Duration"], errors="coerce").dt.date
-    ads["_amount"] = pd.to_numeric(ads["Total Ads Cost"], errors="coerce")
-
-    ads_by_date = ads.groupby("_date")["_amount"].sum().reset_index()
-    ads_by_date.rename(columns={"_amount":"Ads Cost"}, inplace=True)
-
-    total_ads = ads_by_date["Ads Cost"].sum()
+    ads_files, dup_ads = distinct_uploads(expand_zips(uploaded_ads))
+    if dup_ads:
+        st.info(summary(dup_ads, 0, ()))
+    ads_frames = read_uploads(ads_files, ads_cost_file)
+    for raw in ads_frames:
+        if isinstance(raw, Exception):
+            raise raw
+
+    ads_ledger = AdsLedger(pd.concat(ads_frames, ignore_index=True))
+
+    total_ads = ads_ledger.daily.sum()
     per_order_cost = total_ads / total_orders if total_orders else 0
 
     st.markdown("### 📢 Ads Cost Overview")
@@ -231,16 +233,7 @@ if uploaded_ads:
     </div>
     """, unsafe_allow_html=True)
 
-    combined = pd.merge(
-        orders_by_date, ads_by_date,
-        left_on="_order_date_parsed", right_on="_date",
-        how="outer"
-    ).fillna(0)
-
-    combined["Ads Cost / Order"] = combined.apply(
-        lambda r: r["Ads Cost"]/r["Orders"] if r["Orders"] > 0 else 0,
-        axis=1
-    )
+    combined = ads_ledger.per_order(orders_by_date.set_index("_order_date_parsed")["Orders"])
 
     st.markdown("### 📊 Orders vs Ads Cost (Daily Comparison)")
     st.dataframe(combined, use_container_width=True)
@@ -268,7 +261,7 @@ with c3:
             data = [["Date","Orders","Ads Cost","Ads Cost / Order"]]
             for _, r in combined.iterrows():
                 data.append([
-                    str(r["_order_date_parsed"]),
+                    str(r["Date"]),
                     int(r["Orders"]),
                     f"₹{r['Ads Cost']:,.0f}",
                     f"₹{r['Ads Cost / Order']:,.2f}"
@@ -1,15 +1,24 @@
 # app.py - Updated with Upload area moved to main screen with Hide/Show triangle (Original script base)
 
 import os
-import re
-import zipfile
+import shutil
 import tempfile
+import uuid
+import zipfile
 from io import BytesIO
 from datetime import datetime
-import shutil
 import pandas as pd
 import streamlit as st
 
+from utils.bundle import bundle_download, bundle_download_name
+from utils.excel_reader import read_sheet, sheet_names
+from utils.ledger import (PaymentLedger, build_ledger_workbook, list_ledgers, member_fingerprint,
+                          parse_ledger_file)
+from utils.parallel import default_workers, run_ordered
+from utils.workspace import current_workspace, persist_state, restore_state
+from utils.zip_clean import (WANTED_SHEETS, bundle_outputs, merge_in_order, merge_supplier, merge_workbooks,
+                             number_part_of, partition_by_supplier, spool_wanted_sheets, write_spooled_workbook)
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -21,174 +30,204 @@ st.set_page_config(layout="wide", page_title="Meesho Merge & Clean (Web)")
 st.title("📦 Meesho — Merge, Clean & Export (Web)")
 st.caption("Based on your all_in_one_marge_v2.py logic — multi-ZIP supported, A1/A3 deletion and numeric coercion preserved.")
 
-# ------------------------------
-# Utility / cleaning functions (taken from your original script)
-# ------------------------------
-def is_suborder_or_blank(series: pd.Series) -> pd.Series:
-    is_blank = series.isna()
-    s_str = series.astype(str).str.strip()
-    s_norm = s_str.replace(r"\s+", " ", regex=True)
-    is_empty = s_norm.eq("") | s_norm.str.lower().eq("nan")
-    is_sub_order = s_norm.str.casefold().eq("sub order")
-    return is_blank | is_empty | is_sub_order
-
-def coerce_numeric_df(df: pd.DataFrame) -> pd.DataFrame:
-    def coerce_col(col: pd.Series) -> pd.Series:
-        if pd.api.types.is_numeric_dtype(col):
-            return col
-        original = col.copy()
-        mask = original.notna()
-        s = original[mask].astype(str)
-        s = s.str.replace(r"^\((.*)\)$", r"-\1", regex=True)
-        s = s.str.replace("\u2212", "-", regex=False).str.replace("\u2013", "-", regex=False)
-        s = s.str.replace(r"[₹,]", "", regex=True).str.replace(r"\s+", "", regex=True)
-        nums = pd.to_numeric(s, errors="coerce")
-        out = original.copy()
-        out.loc[mask & nums.notna()] = nums.loc[nums.notna()]
-        return out
-    return df.apply(coerce_col, axis=0)
-
-def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    """Remove rows where column A (index 0) OR column C (index 2) are blank/'Sub Order'. Then coerce numeric."""
-    if df is None or df.empty:
-        return df
-    df = df.copy()
-    try:
-        cond_a1 = is_suborder_or_blank(df.iloc[:, 0])
-    except Exception:
-        cond_a1 = pd.Series(False, index=df.index)
-    if df.shape[1] >= 3:
-        try:
-            cond_a3 = is_suborder_or_blank(df.iloc[:, 2])
-        except Exception:
-            cond_a3 = pd.Series(False, index=df.index)
-    else:
-        cond_a3 = pd.Series(False, index=df.index)
-    df = df.loc[~(cond_a1 | cond_a3)].copy()
-    df = coerce_numeric_df(df)
-    df.reset_index(drop=True, inplace=True)
-    return df
-
-def clean_excel_file(file_path, output_path):
-    """Remove fully-empty rows/cols and save cleaned workbook (like original script)."""
-    try:
-        xls = pd.ExcelFile(file_path, engine="openpyxl")
-        writer = pd.ExcelWriter(output_path, engine="openpyxl")
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(file_path, sheet_name=sheet, engine="openpyxl", header=None)
-            df.dropna(axis=0, how="all", inplace=True)
-            df.dropna(axis=1, how="all", inplace=True)
-            df.reset_index(drop=True, inplace=True)
-            df.to_excel(writer, sheet_name=sheet, index=False, header=False)
-        writer.close()
-    except Exception as e:
-        st.write("Error cleaning file:", file_path, "->", e)
-
 # ------------------------------
 # Main processor: multiple zips
 # ------------------------------
-def process_multiple_zip_files(uploaded_zip_files):
+def show_errors(errors):
+    for err in errors:
+        st.write("⚠️ Error reading file", err)
+
+def process_multiple_zip_files(uploaded_zip_files, workers=1):
     """
     uploaded_zip_files: list of Streamlit UploadedFile objects
-    Returns: (BytesIO buffer of final merged excel, number_part_string, date_str)
-    """
-    temp_root = tempfile.mkdtemp(prefix="meesho_web_")
-    extracted_dir = os.path.join(temp_root, "extracted")
-    cleaned_dir = os.path.join(temp_root, "cleaned")
-    os.makedirs(extracted_dir, exist_ok=True)
-    os.makedirs(cleaned_dir, exist_ok=True)
+    workers: >1 uses that many worker processes
+    Returns: (BytesIO buffer of the output, download file name)
 
-    # 1) save each uploaded zip to temp and extract .xlsx
-    for i, up in enumerate(uploaded_zip_files):
+    Files are grouped by the supplier id in their name and each supplier gets its own merged
+    workbook (one supplier -> the .xlsx itself, several -> a .zip of them). With several
+    suppliers every supplier is merged in its own worker, so the biggest one sets the wall
+    time; a single supplier spreads its workbooks over the workers instead.
+    Everything stays in memory: only the wanted sheets are parsed, once.
+    """
+    # 1) collect the .xlsx members of every uploaded zip (a later file with the same name wins)
+    workbooks = {}
+    for up in uploaded_zip_files:
         try:
-            tmp_zip_path = os.path.join(temp_root, f"upload_{i}_{os.path.basename(up.name)}")
-            with open(tmp_zip_path, "wb") as f:
-                f.write(up.getbuffer())
-            with zipfile.ZipFile(tmp_zip_path, 'r') as zf:
+            with zipfile.ZipFile(BytesIO(up.getvalue()), 'r') as zf:
                 for member in zf.namelist():
                     if member.endswith(".xlsx"):
                         try:
-                            data = zf.read(member)
-                            out_name = os.path.basename(member)
-                            out_path = os.path.join(extracted_dir, out_name)
-                            with open(out_path, "wb") as out_f:
-                                out_f.write(data)
+                            workbooks[os.path.basename(member)] = zf.read(member)
                         except Exception as e:
                             st.write("⚠️ Could not extract", member, "from", up.name, "->", e)
         except Exception as e:
             st.write("⚠️ Error processing uploaded ZIP:", up.name, e)
 
-    # 2) Clean each extracted workbook into cleaned_dir
-    for fname in sorted(os.listdir(extracted_dir)):
-        if fname.endswith(".xlsx") and not fname.startswith("~$"):
-            in_path = os.path.join(extracted_dir, fname)
-            out_path = os.path.join(cleaned_dir, f"cleaned_{fname}")
-            try:
-                clean_excel_file(in_path, out_path)
-            except Exception as e:
-                st.write("⚠️ clean_excel_file failed for", in_path, e)
-
-    # 3) Merge logic
-    wanted_sheets = ["Order Payments", "Ads Cost", "Referral Payments"]
-    merged_data = {sheet: [] for sheet in wanted_sheets}
-    first_file = True
-    number_part = "UNKNOWN"
-    
-    sample_file = next((f for f in os.listdir(cleaned_dir) if f.endswith(".xlsx") and not f.startswith("~$")), None)
-    if sample_file:
-        m = re.search(r"cleaned_(\d+)_SP", sample_file, flags=re.IGNORECASE)
-        if m:
-            number_part = m.group(1)
-
-    for fname in sorted(os.listdir(cleaned_dir)):
-        if not fname.endswith(".xlsx") or fname.startswith("~$"):
-            continue
-        full_path = os.path.join(cleaned_dir, fname)
+    names = [f for f in sorted(workbooks) if not f.startswith("~$")]
+    suppliers = partition_by_supplier(names) or {"UNKNOWN": []}
+
+    # 2) clean + merge per supplier
+    outputs = {}
+    if len(suppliers) == 1:
+        supplier, files = next(iter(suppliers.items()))
+        outputs[supplier], errors = merge_workbooks([(f, workbooks[f]) for f in files], workers)
+        show_errors(errors)
+    else:
+        jobs = [([(f, workbooks[f]) for f in files],) for files in suppliers.values()]
+        for supplier, result in zip(suppliers, run_ordered(merge_supplier, jobs, workers)):
+            if isinstance(result, Exception):
+                st.write("⚠️ Merge failed for supplier", supplier, "->", result)
+                continue
+            outputs[supplier], errors = result
+            show_errors(errors)
+    workbooks.clear()
+
+    date_str = datetime.now().strftime("%d-%b-%y")
+    return bundle_outputs(outputs, date_str)
+
+def list_zip_members(uploaded_zip_files):
+    """{basename: (upload index, member name, ZipInfo)} of the .xlsx members; a later file with the same name wins."""
+    members = {}
+    for i, up in enumerate(uploaded_zip_files):
         try:
-            xls = pd.ExcelFile(full_path, engine="openpyxl")
-            for sheet in wanted_sheets:
-                if sheet in xls.sheet_names:
-                    if first_file:
-                        df = pd.read_excel(full_path, sheet_name=sheet, engine="openpyxl", header=None)
-                    else:
-                        df = pd.read_excel(full_path, sheet_name=sheet, engine="openpyxl", header=None, skiprows=3)
-                    df.dropna(how='all', inplace=True)
-                    if not df.empty:
-                        try:
-                            df = clean_dataframe(df)
-                        except Exception:
-                            pass
-                        merged_data[sheet].append(df)
-            first_file = False
+            up.seek(0)
+            with zipfile.ZipFile(up, 'r') as zf:
+                for info in zf.infolist():
+                    if info.filename.endswith(".xlsx"):
+                        members[os.path.basename(info.filename)] = (i, info.filename, info)
         except Exception as e:
-            st.write("⚠️ Error reading cleaned file", fname, "->", e)
-
-    # 4) Compose final Excel in-memory
-    buf = BytesIO()
-    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-        for sheet in wanted_sheets:
-            if merged_data[sheet]:
-                final_df = pd.concat(merged_data[sheet], ignore_index=True)
-                final_df = clean_dataframe(final_df)
-                final_df.to_excel(writer, sheet_name=sheet, index=False, header=False)
-    buf.seek(0)
+            st.write("⚠️ Error processing uploaded ZIP:", up.name, e)
+    return members
+
+def extract_members(uploaded_zip_files, members, names, out_dir):
+    """Stream the listed members to ``out_dir`` through ZipFile.open, one ZIP open at a time. Returns {fname: path}."""
+    paths = {}
+    for i, up in enumerate(uploaded_zip_files):
+        own = [(k, f) for k, f in enumerate(names) if members[f][0] == i]
+        if not own:
+            continue
+        up.seek(0)
+        with zipfile.ZipFile(up, 'r') as zf:
+            for k, fname in own:
+                path = os.path.join(out_dir, f"{k:05d}.xlsx")
+                try:
+                    with zf.open(members[fname][1]) as src, open(path, "wb") as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+                    paths[fname] = path
+                except Exception as e:
+                    st.write("⚠️ Could not extract", members[fname][1], "from", up.name, "->", e)
+    return paths
 
+def stream_merge(uploaded_zip_files, members, names, workers, spool_dir):
+    """One supplier's files through the disk spool: extract, clean into Parquet parts, write the workbook."""
+    paths = extract_members(uploaded_zip_files, members, names, spool_dir)
+    names = [f for f in names if f in paths]
+    tags = {fname: os.path.splitext(os.path.basename(paths[fname]))[0] for fname in names}
+
+    # clean every workbook into the spool (workers write their own parts)
+    results = run_ordered(spool_wanted_sheets,
+                          [(paths[fname], k > 0, spool_dir, tags[fname]) for k, fname in enumerate(names)],
+                          workers)
+
+    # collect the spooled parts in sorted-filename order
+    errors = []
+    parts = {sheet: [] for sheet in WANTED_SHEETS}
+    reread = lambda f: spool_wanted_sheets(paths[f], False, spool_dir, tags[f])
+    for fname, spooled in merge_in_order(names, results, reread, errors):
+        for sheet, part in spooled.items():
+            parts[sheet].append(part)
+    show_errors(errors)
+    return write_spooled_workbook(parts)
+
+def process_zip_files_streaming(uploaded_zip_files, workers=1):
+    """
+    Low-memory variant of process_multiple_zip_files with the same output, for very large batches.
+    ZIP members are decompressed to disk through ZipFile.open, each workbook's cleaned sheets
+    are appended to an on-disk Parquet spool, and each supplier's workbook is written from the
+    spool row by row. Suppliers go one after another, so memory stays at about one workbook
+    per worker however many ZIPs are uploaded.
+    """
+    spool_dir = tempfile.mkdtemp(prefix="meesho_spool_")
+    try:
+        members = list_zip_members(uploaded_zip_files)
+        names = [f for f in sorted(members) if not f.startswith("~$")]
+        outputs = {}
+        for supplier, files in (partition_by_supplier(names) or {"UNKNOWN": []}).items():
+            outputs[supplier] = stream_merge(uploaded_zip_files, members, files, workers, spool_dir)
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    date_str = datetime.now().strftime("%d-%b-%y")
+    return bundle_outputs(outputs, date_str)
+
+def process_zip_files_ledger(uploaded_zip_files, workers=1):
+    """
+    Ledger mode: workbooks already in the supplier's ledger (same name and content) are skipped,
+    new ones are cleaned and added, and each supplier's workbook is written from its whole ledger.
+    Cost follows the new files only, not the full history.
+    """
+    root = current_workspace().dir
+    members = list_zip_members(uploaded_zip_files)
+    names = [f for f in sorted(members) if not f.startswith("~$")]
+    suppliers = list(partition_by_supplier(names)) or ["UNKNOWN"]
+
+    ledgers = {supplier: PaymentLedger(root, supplier) for supplier in suppliers}
+    new = [f for f in names if ledgers[number_part_of(f)].is_new(f, member_fingerprint(members[f][2]))]
+
+    tmp_dir = tempfile.mkdtemp(prefix="meesho_ledger_")
     try:
-        shutil.rmtree(temp_root)
-    except Exception:
-        pass
+        paths = extract_members(uploaded_zip_files, members, new, tmp_dir)
+        new = [f for f in new if f in paths]
+        tag = uuid.uuid4().hex
+        jobs = [(paths[f], ledgers[number_part_of(f)].staging_dir(), f"{tag}-{k}") for k, f in enumerate(new)]
+        for k, (fname, sheets) in enumerate(zip(new, run_ordered(parse_ledger_file, jobs, workers))):
+            if isinstance(sheets, Exception):
+                st.write("⚠️ Error reading file", fname, "->", sheets)
+                continue
+            ledgers[number_part_of(fname)].commit(fname, member_fingerprint(members[fname][2]), f"{tag}-{k}", sheets)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
+    st.toast(f"📒 {len(new)} new file(s) added to the ledger, {len(names) - len(new)} already there")
+    outputs = {}
+    for supplier, result in zip(suppliers, run_ordered(build_ledger_workbook, [(root, s) for s in suppliers], workers)):
+        if isinstance(result, Exception):
+            st.write("⚠️ Could not write the ledger of supplier", supplier, "->", result)
+            continue
+        outputs[supplier] = result
     date_str = datetime.now().strftime("%d-%b-%y")
-    return buf, number_part, date_str
+    return bundle_outputs(outputs, date_str)
+
+
+def refresh_bundle():
+    """Re-make the .meesho download for the current merged workbook (when asked for)."""
+    st.session_state.bundle_buf = None
+    if st.session_state.get("zip_bundle") and st.session_state.merged_buf:
+        st.session_state.bundle_buf = BytesIO(
+            bundle_download(st.session_state.merged_buf.getvalue(), st.session_state.filename))
+    persist_state('bundle_buf')
+
+
+def bundle_download_button(key: str):
+    if not st.session_state.bundle_buf:
+        return
+    st.download_button(
+        label="📦 Download compact bundle (.meesho)",
+        data=st.session_state.bundle_buf.getvalue(),
+        file_name=bundle_download_name(st.session_state.filename),
+        mime="application/zip",
+        use_container_width=True,
+        key=key
+    )
+
 
 # ------------------------------
 # NEW: Main screen layout with collapsible upload section next to download
 # ------------------------------
-# Initialize session state
-if 'merged_buf' not in st.session_state:
-    st.session_state.merged_buf = None
-if 'filename' not in st.session_state:
-    st.session_state.filename = None
+# Initialize session state (last merged workbook comes back from the user's workspace)
+restore_state('merged_buf', default=None)
+restore_state('filename', default=None)
+restore_state('bundle_buf', default=None)
 
 # Main layout: Preview/Download (left) + Upload (right)
 col1, col2 = st.columns([3, 1])
@@ -197,12 +236,17 @@ with col1:
     st.subheader("📊 Clean Excel Preview & Download")
     if st.session_state.merged_buf:
         try:
-            xls = pd.ExcelFile(st.session_state.merged_buf)
-            if "Order Payments" in xls.sheet_names:
-                df_preview = pd.read_excel(xls, sheet_name="Order Payments", engine="openpyxl", header=None)
-            else:
-                df_preview = pd.read_excel(xls, sheet_name=xls.sheet_names[0], engine="openpyxl", header=None)
-            st.dataframe(df_preview.head(50), use_container_width=True)
+            preview_buf = st.session_state.merged_buf
+            if (st.session_state.filename or "").endswith(".zip"):
+                # one workbook per supplier: preview the chosen one
+                with zipfile.ZipFile(BytesIO(preview_buf.getvalue())) as zf:
+                    members = zf.namelist()
+                    chosen = st.selectbox(f"🏷️ {len(members)} suppliers — preview", members, key="preview_member")
+                    preview_buf = BytesIO(zf.read(chosen))
+            names = sheet_names(preview_buf)
+            preview_sheet = "Order Payments" if "Order Payments" in names else names[0]
+            df_preview = read_sheet(preview_buf.getvalue(), preview_sheet, header=None, nrows=50)
+            st.dataframe(df_preview, use_container_width=True)
         except Exception as e:
             st.write("Preview not available:", e)
     else:
@@ -218,6 +262,30 @@ with col2:
             accept_multiple_files=True,
             key="main_uploader"
         )
+        zip_workers = st.number_input(
+            "⚙️ Parallel workers (1 = one by one)",
+            min_value=1, max_value=64, value=default_workers(),
+            step=1, key="zip_workers",
+            help="Workbooks are cleaned in this many processes at once. Big batches finish faster with more workers."
+        )
+        low_memory = st.checkbox(
+            "🪶 Low-memory mode (very large batches)",
+            key="zip_low_memory",
+            help="Workbooks are unpacked and cleaned one at a time through a disk spool, so memory stays flat "
+                 "however many ZIPs are uploaded. A little slower on small batches."
+        )
+        use_ledger = st.checkbox(
+            "📒 Supplier ledger (only new files are processed)",
+            key="zip_ledger",
+            help="Every processed file is kept in your ledger for its supplier. Upload only the new weeks: "
+                 "files already in the ledger are skipped and the Excel covers the full history."
+        )
+        st.checkbox(
+            "📦 Also make a compact .meesho bundle",
+            key="zip_bundle",
+            help="The same sheets as typed Parquet tables. The P&L, Upcoming Payment, Compare and Dispatch "
+                 "pages open it many times faster than the Excel."
+        )
 
 # Process & Download buttons below upload area
 if uploaded_zips:
@@ -226,10 +294,15 @@ if uploaded_zips:
         if st.button("🚀 Process uploaded ZIP(s) → Merge & Clean", type="primary", use_container_width=True):
             with st.spinner("Processing ZIPs — extracting, cleaning and merging (यह काम सर्वर पर होता है)..."):
                 try:
-                    merged_buf, number_part, date_str = process_multiple_zip_files(uploaded_zips)
-                    filename = f"{number_part}_{date_str}.xlsx"
+                    if use_ledger:
+                        process = process_zip_files_ledger
+                    else:
+                        process = process_zip_files_streaming if low_memory else process_multiple_zip_files
+                    merged_buf, filename = process(uploaded_zips, workers=int(zip_workers))
                     st.session_state.merged_buf = merged_buf
                     st.session_state.filename = filename
+                    persist_state('merged_buf', 'filename')
+                    refresh_bundle()
                     st.success("✅ Merge & Cleaning completed!")
                     st.rerun()
                 except Exception as e:
@@ -238,17 +311,52 @@ if uploaded_zips:
     # Download button next to process button (persistent)
     if st.session_state.merged_buf:
         with col_btn2:
+            is_zip = st.session_state.filename.endswith(".zip")
             st.download_button(
-                label="⬇️ Download Clean Excel",
+                label="⬇️ Download All Suppliers (ZIP)" if is_zip else "⬇️ Download Clean Excel",
                 data=st.session_state.merged_buf.getvalue(),
                 file_name=st.session_state.filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                mime="application/zip" if is_zip else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 use_container_width=True
             )
+            bundle_download_button("bundle_download")
 
 else:
     st.info("कृपया ऊपर के Upload क्षेत्र में कम-से-कम एक ZIP file चुनें (multiple select supported).")
 
+# ------------------------------
+# Supplier ledgers (kept by "Supplier ledger" mode)
+# ------------------------------
+ws = current_workspace()
+ledger_ids = list_ledgers(ws.dir) if ws else []
+if ledger_ids:
+    with st.expander("📒 My supplier ledgers", expanded=False):
+        st.dataframe(pd.DataFrame([PaymentLedger(ws.dir, s).stats() for s in ledger_ids]),
+                     use_container_width=True, hide_index=True)
+        sel_supplier = st.selectbox("Supplier", ledger_ids, key="ledger_supplier")
+        lc1, lc2 = st.columns(2)
+        if lc1.button("📄 Build Excel from ledger", use_container_width=True):
+            with st.spinner("Writing the full history from the ledger..."):
+                st.session_state.merged_buf = PaymentLedger(ws.dir, sel_supplier).build_workbook()
+                st.session_state.filename = f"{sel_supplier}_{datetime.now().strftime('%d-%b-%y')}.xlsx"
+                persist_state('merged_buf', 'filename')
+                refresh_bundle()
+            st.rerun()
+        if lc2.button("🗑 Reset ledger", use_container_width=True):
+            PaymentLedger(ws.dir, sel_supplier).reset()
+            st.rerun()
+        if st.session_state.merged_buf and not uploaded_zips:
+            is_zip = st.session_state.filename.endswith(".zip")
+            st.download_button(
+                label="⬇️ Download All Suppliers (ZIP)" if is_zip else "⬇️ Download Clean Excel",
+                data=st.session_state.merged_buf.getvalue(),
+                file_name=st.session_state.filename,
+                mime="application/zip" if is_zip else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                key="ledger_download"
+            )
+            bundle_download_button("ledger_bundle_download")
+
 # ------------------------------
 # Clean empty sidebar
 # ------------------------------
@@ -19,6 +19,17 @@ import streamlit as st
 import plotly.express as px
 from PIL import Image
 
+from utils.ads_ledger import AdsLedger, DURATION, has_ledger_columns
+from utils.compact import compact_frame
+from utils.datasets import PAYMENTS, upload_or_saved
+from utils.filter_index import FilterIndex, all_of
+from utils.ingest import excel_sheet_names, read_upload, upload_bytes, upload_digest
+from utils.numeric import to_amount
+from utils.pnl_metrics import PnlColumns, pnl_metrics, prepare_pnl_frame
+from utils.rollups import FREQUENCIES, RollupColumns, build_rollups, selected_statuses
+from utils.sku_index import sku_index
+from utils.workspace import persist_state, restore_state
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -50,14 +61,15 @@ def _detect_col(df: pd.DataFrame, *keyword_groups):
     return None
 
 @st.cache_data(show_spinner=False)
-def _read_uploaded(file):
-    name = file.name.lower()
-    if name.endswith('.csv'): return pd.read_csv(file), None
-    xls = pd.ExcelFile(file)
-    sheet_map = {s.lower(): s for s in xls.sheet_names}
-    orders_sheet = sheet_map.get('order payments', xls.sheet_names[0])
-    df_orders = pd.read_excel(xls, sheet_name=orders_sheet)
-    df_ads = pd.read_excel(xls, sheet_name=sheet_map['ads cost']) if 'ads cost' in sheet_map else None
+def _read_uploaded(name, digest, _file):
+    # keyed by the upload's digest; st.cache_data skips hashing the "_" argument (the bytes) on every rerun
+    file = _file
+    if name.lower().endswith('.csv'): return read_upload(file, "csv"), None
+    sheet_names = excel_sheet_names(file)
+    sheet_map = {s.lower(): s for s in sheet_names}
+    orders_sheet = sheet_map.get('order payments', sheet_names[0])
+    df_orders = read_upload(file, "excel", sheet_name=orders_sheet)
+    df_ads = read_upload(file, "excel", sheet_name=sheet_map['ads cost']) if 'ads cost' in sheet_map else None
     return df_orders, df_ads
 
 def _format_display(v):
@@ -80,11 +92,13 @@ def _card_html(title, value, bg="#0d47a1", icon="₹", tooltip=None):
 # ---------------- SIDEBAR ----------------
 st.sidebar.header("⚙️ Controls")
 
-if 'sku_groups' not in st.session_state: st.session_state['sku_groups'] = []
+restore_state('sku_groups', default=[])
 if 'selected_skus' not in st.session_state: st.session_state['selected_skus'] = []
 
 supplier_name_input = st.sidebar.text_input("🔹 Supplier Name", value="")
-up = st.sidebar.file_uploader("Upload Excel/CSV", type=["xlsx", "csv"])
+up = st.sidebar.file_uploader("Upload Excel/CSV", type=["xlsx", "csv", "meesho"])
+if up is None or not up.name.lower().endswith(".csv"):
+    up = upload_or_saved(PAYMENTS, up, st.sidebar)
 
 if up is None:
     st.info("Please upload your Meesho Excel File.")
@@ -100,6 +114,8 @@ st.sidebar.subheader("💰 Profit Settings")
 user_product_cost = st.sidebar.number_input("Enter Product Cost (Per Unit) ₹", min_value=0.0, value=0.0, step=10.0)
 
 if st.sidebar.button("🔄 Reset Filters"):
+    st.session_state['sku_groups'] = []
+    persist_state('sku_groups')
     for key in list(st.session_state.keys()):
         del st.session_state[key]
     st.session_state['sku_groups'] = []
@@ -107,12 +123,13 @@ if st.sidebar.button("🔄 Reset Filters"):
 
 # ---------------- DATA LOAD ----------------
 try:
-    orders_df, ads_df = _read_uploaded(up)
+    orders_df, ads_df = _read_uploaded(up.name, upload_digest(up), upload_bytes(up))
 except Exception as e:
     st.error(f"Error reading file: {e}")
     st.stop()
 
 orders_df.columns = [str(c).strip() for c in orders_df.columns]
+orders_df = compact_frame(orders_df)
 if ads_df is not None: ads_df.columns = [str(c).strip() for c in ads_df.columns]
 
 # Detect Columns
@@ -140,8 +157,8 @@ for c in [order_date_col, dispatch_date_col]:
         orders_df[c] = pd.to_datetime(orders_df[c], errors='coerce')
 
 # Clean Numerics
-if claims_col: orders_df[claims_col] = pd.to_numeric(orders_df[claims_col], errors='coerce').fillna(0)
-if recovery_col: orders_df[recovery_col] = pd.to_numeric(orders_df[recovery_col], errors='coerce').fillna(0)
+if claims_col: orders_df[claims_col] = to_amount(orders_df[claims_col])
+if recovery_col: orders_df[recovery_col] = to_amount(orders_df[recovery_col])
 
 # ---------------- FILTERS ----------------
 with st.sidebar.expander("🎛️ Advanced Filters", expanded=True):
@@ -152,10 +169,11 @@ with st.sidebar.expander("🎛️ Advanced Filters", expanded=True):
     if sku_col:
         orders_df[sku_col] = orders_df[sku_col].astype(str)
         all_skus = sorted(orders_df[sku_col].dropna().unique())
+        sku_search = sku_index(all_skus)
 
         st.markdown("**SKU Grouping & Search**")
         search_kw = st.text_input("Search SKU keyword")
-        matches = [s for s in all_skus if search_kw.lower() in s.lower()] if search_kw else []
+        matches = sku_search.match(search_kw) if search_kw else []
 
         group_name = st.text_input("Group Name", value=search_kw)
 
@@ -170,11 +188,13 @@ with st.sidebar.expander("🎛️ Advanced Filters", expanded=True):
                             found = True
                     if not found:
                         st.session_state["sku_groups"].append({"name": group_name, "skus": matches})
+                    persist_state("sku_groups")
                     st.rerun()
         with c2:
             if st.button("🧹 Clear All"):
                 st.session_state["sku_groups"] = []
                 st.session_state['selected_skus'] = []
+                persist_state("sku_groups")
                 st.rerun()
 
         def update_sku_selection():
@@ -187,7 +207,7 @@ with st.sidebar.expander("🎛️ Advanced Filters", expanded=True):
                     group_skus_list.extend(st.session_state['sku_groups'][idx]['skus'])
                 except: pass
             current_search = st.session_state.get('search_kw_internal', '')
-            manual = [s for s in all_skus if current_search.lower() in s.lower()] if (current_search and include_live) else []
+            manual = sku_search.match(current_search) if (current_search and include_live) else []
             final_set = sorted(list(set(group_skus_list + manual)))
             st.session_state['selected_skus'] = final_set
 
@@ -240,63 +260,117 @@ with st.sidebar.expander("📅 Date & Source Filters", expanded=True):
             dispatch_range = st.date_input("Dispatch Date Range", [ddmin, ddmax])
 
 # ---------------- APPLY FILTERS ----------------
-df_f = orders_df.copy()
-
+# built once per upload (kept in the session); a rerun only intersects the masks it needs
+def _build_filter_index(df):
+    idx = FilterIndex(len(df))
+    for c in (order_date_col, dispatch_date_col):
+        if c: idx.add_dates(c, df[c])
+    for c in (order_source_col, sku_col, catalog_id_col):
+        if c: idx.add_values(c, df[c].astype(str))
+    for c in (claims_col, recovery_col):
+        if c: idx.add_values(c, df[c])
+    idx.add_values("_status", df[status_col].astype(str).str.upper(), na=df[status_col].isna())
+    return idx
+
+_index_key = (upload_digest(up), tuple(orders_df.columns), len(orders_df))
+if st.session_state.get("pnl_filter_index", (None,))[0] != _index_key:
+    st.session_state["pnl_filter_index"] = (_index_key, _build_filter_index(orders_df))
+fidx = st.session_state["pnl_filter_index"][1]
+
+masks = []
 if order_date_col and date_range and len(date_range)==2:
-    df_f = df_f[(df_f[order_date_col] >= pd.Timestamp(date_range[0])) & (df_f[order_date_col] <= pd.Timestamp(date_range[1]))]
+    masks.append(fidx.between(order_date_col, date_range[0], date_range[1]))
 
 if dispatch_date_col and dispatch_range and len(dispatch_range)==2:
-    df_f = df_f[(df_f[dispatch_date_col] >= pd.Timestamp(dispatch_range[0])) & (df_f[dispatch_date_col] <= pd.Timestamp(dispatch_range[1]))]
+    masks.append(fidx.between(dispatch_date_col, dispatch_range[0], dispatch_range[1]))
 
 if order_source_col and sel_source:
-    df_f = df_f[df_f[order_source_col].astype(str).isin(sel_source)]
+    masks.append(fidx.isin(order_source_col, sel_source))
 
 if sku_col and selected_skus:
-    df_f = df_f[df_f[sku_col].astype(str).isin(selected_skus)]
+    masks.append(fidx.isin(sku_col, selected_skus))
 
 if catalog_id_col and sel_cats:
-    df_f = df_f[df_f[catalog_id_col].astype(str).isin(sel_cats)]
+    masks.append(fidx.isin(catalog_id_col, sel_cats))
 
 if claims_col and sel_claims:
-    df_f = df_f[df_f[claims_col].isin(sel_claims)]
+    masks.append(fidx.isin(claims_col, sel_claims))
 
 if recovery_col and sel_recovery:
-    df_f = df_f[df_f[recovery_col].isin(sel_recovery)]
+    masks.append(fidx.isin(recovery_col, sel_recovery))
 
 if 'All' not in sel_statuses:
     clean_stats = [s.upper() for s in sel_statuses if s]
     include_blank = "" in sel_statuses
     if clean_stats and include_blank:
-        mask = df_f[status_col].astype(str).str.upper().isin(clean_stats) | df_f[status_col].isna()
+        masks.append(fidx.isin("_status", clean_stats) | fidx.isna("_status"))
     elif clean_stats:
-        mask = df_f[status_col].astype(str).str.upper().isin(clean_stats)
+        masks.append(fidx.isin("_status", clean_stats))
     else:
-        mask = df_f[status_col].isna()
-    df_f = df_f[mask]
-
-# ---------------- RTO LOGIC ----------------
-def _ensure_rto(df):
-    if listing_price_col and total_sale_col:
-        mask = df[status_col].astype(str).str.upper() == 'RTO'
-        df.loc[mask, 'Shipping Charge'] = pd.to_numeric(df.loc[mask, total_sale_col], errors='coerce').fillna(0) - pd.to_numeric(df.loc[mask, listing_price_col], errors='coerce').fillna(0)
-        df.loc[mask, 'Shipping GST'] = df.loc[mask, 'Shipping Charge'] * 0.18
-        df.loc[mask, 'RTO Amount'] = pd.to_numeric(df.loc[mask, listing_price_col], errors='coerce').fillna(0) - df.loc[mask, 'Shipping GST']
-    return df
-
-df_f = _ensure_rto(df_f)
-
-# ---------------- COUNTS & METRICS ----------------
-counts = df_f[status_col].astype(str).str.upper().value_counts()
-c_del = counts.get('DELIVERED', 0)
-c_ret = counts.get('RETURN', 0)
-c_exc = counts.get('EXCHANGE', 0)
-c_can = counts.get('CANCELLED', 0)
-c_shp = counts.get('SHIPPED', 0)
-c_rto = counts.get('RTO', 0)
-
-c_claim = df_f[df_f[claims_col] != 0].shape[0] if claims_col else 0
-c_rec = df_f[df_f[recovery_col] != 0].shape[0] if recovery_col else 0
-grand_total_count = len(df_f)
+        masks.append(fidx.isna("_status"))
+
+mask = all_of(masks)
+df_f = orders_df.copy() if mask is None else orders_df[mask]
+
+# ---------------- RTO LOGIC + COUNTS & METRICS (one grouped pass) ----------------
+pnl_cols = PnlColumns(status_col, settle=settle_amt_col, claims=claims_col, recovery=recovery_col,
+                      listing_price=listing_price_col, total_sale=total_sale_col)
+df_f = prepare_pnl_frame(df_f, pnl_cols)
+metrics = pnl_metrics(df_f, pnl_cols)
+
+c_del = metrics.counts['DELIVERED']
+c_ret = metrics.counts['RETURN']
+c_exc = metrics.counts['EXCHANGE']
+c_can = metrics.counts['CANCELLED']
+c_shp = metrics.counts['SHIPPED']
+c_rto = metrics.counts['RTO']
+
+c_claim = metrics.claims_count
+c_rec = metrics.recovery_count
+grand_total_count = metrics.orders
+
+# Ads Cost sheet, parsed once into a date-indexed ledger (rollups + ads section)
+ads_ledger = AdsLedger(ads_df) if has_ledger_columns(ads_df) and not ads_df.empty else None
+
+# ---------------- ROLLUPS (daily / weekly / monthly, built once per upload) ----------------
+# the trends and per-day order counts read these; a filter they are not keyed by (source, claims,
+# recovery, a dispatch range that leaves dated rows out) rolls up the filtered rows instead, kept
+# per filter for the last few filters of this upload
+_FILTERED_ROLLUPS_KEPT = 8
+
+def _filtered_rollups(df, roll_cols):
+    filter_key = tuple(tuple(map(str, v)) if isinstance(v, (list, tuple)) else v
+                       for v in (date_range, dispatch_range, sel_source, selected_skus, sel_cats,
+                                 sel_claims, sel_recovery, sel_statuses))
+    if st.session_state.get("pnl_filtered_rollups", (None,))[0] != _index_key:
+        st.session_state["pnl_filtered_rollups"] = (_index_key, {})
+    kept = st.session_state["pnl_filtered_rollups"][1]
+    if filter_key not in kept:
+        kept[filter_key] = build_rollups(df, pnl_cols, roll_cols, ads_ledger)
+        while len(kept) > _FILTERED_ROLLUPS_KEPT:
+            kept.pop(next(iter(kept)))
+    return kept[filter_key]
+
+rollups = None
+if order_date_col:
+    roll_cols = RollupColumns(order_date_col, dispatch=dispatch_date_col, sku=sku_col, catalog=catalog_id_col)
+    if st.session_state.get("pnl_rollups", (None,))[0] != _index_key:
+        st.session_state["pnl_rollups"] = (_index_key, build_rollups(prepare_pnl_frame(orders_df.copy(), pnl_cols), pnl_cols, roll_cols, ads_ledger))
+    rollups = st.session_state["pnl_rollups"][1]
+
+    roll_filters = {}
+    if date_range and len(date_range) == 2:
+        roll_filters.update(start=date_range[0], end=date_range[1])
+    dispatch_all = True
+    if dispatch_date_col and dispatch_range and len(dispatch_range) == 2:
+        dispatch_all = pd.Timestamp(dispatch_range[0]) <= ddmin and pd.Timestamp(dispatch_range[1]) >= ddmax
+        roll_filters["dispatched"] = True
+    if sel_source or sel_claims or sel_recovery or not dispatch_all or rollups.timed:
+        rollups = _filtered_rollups(df_f, roll_cols)
+        roll_filters = {k: v for k, v in roll_filters.items() if k in ("start", "end")}
+    else:
+        roll_filters.update(skus=selected_skus or None, catalogs=sel_cats or None, statuses=selected_statuses(sel_statuses))
+    day_orders = rollups.orders("Daily", **roll_filters)
 
 # ---------------- VISUALS ----------------
 status_labels = [('✅ Delivered', c_del, '#2e7d32'), ('↩️ Return', c_ret, '#c62828'), 
@@ -312,23 +386,18 @@ st.markdown(f"""<div style='background-color:#0d47a1;padding:10px;border-radius:
 
 # ---------------- FINANCIAL SUMMARY ----------------
 st.subheader("₹ Financial Summary")
+a_del = metrics.amounts['DELIVERED']
+a_exc = metrics.amounts['EXCHANGE']
+a_can = metrics.amounts['CANCELLED']
+a_ret = metrics.amounts['RETURN']
+a_shp = metrics.amounts['SHIPPED']
+a_rto = metrics.amounts['RTO']
 if settle_amt_col:
-    df_f[settle_amt_col] = pd.to_numeric(df_f[settle_amt_col], errors='coerce').fillna(0)
-    
-    def get_sum(s): return df_f[df_f[status_col].astype(str).str.upper() == s][settle_amt_col].sum()
-    
-    a_del = get_sum('DELIVERED')
-    a_exc = get_sum('EXCHANGE')
-    a_can = get_sum('CANCELLED')
-    a_ret = get_sum('RETURN')
-    a_shp = get_sum('SHIPPED')
-    a_rto = df_f[df_f[status_col].astype(str).str.upper() == 'RTO']['RTO Amount'].sum() if 'RTO Amount' in df_f.columns else 0
+    a_claims = metrics.claims_amount
+    a_rec = metrics.recovery_amount
 
-    a_claims = df_f[claims_col].sum() if claims_col else 0
-    a_rec = abs(df_f[recovery_col].sum()) if recovery_col else 0
-
-    shipped_with_total = (a_del + a_can + a_shp) - (abs(a_ret) + abs(a_exc))
-    u_total = (a_del + a_exc + a_can) - abs(a_ret)
+    shipped_with_total = metrics.shipped_total
+    u_total = metrics.total_amount
 
     tt_ship = "Delivered + Cancelled + Shipped - (Return + Exchange)"
     tt_tot = "Delivered + Exchange + Cancelled - Return"
@@ -355,22 +424,14 @@ if settle_amt_col:
 st.markdown("---")
 st.subheader("💹 True Profit Analysis")
 
-total_ret_loss_abs = abs(a_ret)
-avg_ret_cost = total_ret_loss_abs / c_ret if c_ret > 0 else 0.0
-est_exchange_loss = c_exc * avg_ret_cost
-total_cogs = c_del * user_product_cost
-final_net_profit = a_del - (total_ret_loss_abs + est_exchange_loss + total_cogs)
-
-profit_data = {
-    "Metric": ["Delivered Revenue (+)", "Return Loss (-)", "Est. Exchange Charge (-)", "Product Cost (COGS) (-)", "FINAL NET PROFIT (=)"],
-    "Amount (₹)": [a_del, -total_ret_loss_abs, -est_exchange_loss, -total_cogs, final_net_profit],
-}
-st.table(pd.DataFrame(profit_data))
+profit = metrics.profit(user_product_cost)
+profit_table = profit.table()
+st.table(profit_table)
 
 kp1, kp2, kp3 = st.columns(3)
 kp1.markdown(_card_html("Delivered Amount", a_del, "#1b5e20", "✅"), unsafe_allow_html=True)
-kp2.markdown(_card_html("Total Deductions", (total_ret_loss_abs + est_exchange_loss + total_cogs), "#b71c1c", "Expenses"), unsafe_allow_html=True)
-kp3.markdown(_card_html("FINAL TRUE PROFIT", final_net_profit, "#0d47a1", "💰"), unsafe_allow_html=True)
+kp2.markdown(_card_html("Total Deductions", profit.deductions, "#b71c1c", "Expenses"), unsafe_allow_html=True)
+kp3.markdown(_card_html("FINAL TRUE PROFIT", profit.net, "#0d47a1", "💰"), unsafe_allow_html=True)
 
 # Return %
 st.markdown("---")
@@ -387,21 +448,15 @@ st.markdown("---")
 st.subheader("📢 Ads Cost Analysis")
 ads_table = None
 if ads_df is not None and not ads_df.empty:
-    if 'Deduction Duration' in ads_df.columns and 'Total Ads Cost' in ads_df.columns:
-        ads_df['Total Ads Cost'] = pd.to_numeric(ads_df['Total Ads Cost'], errors='coerce').fillna(0)
-        ads_df['Deduction Duration'] = pd.to_datetime(ads_df['Deduction Duration'], errors='coerce').dt.date
-        min_a, max_a = ads_df['Deduction Duration'].min(), ads_df['Deduction Duration'].max()
+    if ads_ledger is not None:
+        min_a, max_a = ads_ledger.rows[DURATION].min(), ads_ledger.rows[DURATION].max()
         ads_rng = st.date_input("Ads Date Range", [min_a, max_a])
         
         if len(ads_rng) == 2:
-            ads_f = ads_df[(ads_df['Deduction Duration'] >= ads_rng[0]) & (ads_df['Deduction Duration'] <= ads_rng[1])].copy()
-            if order_date_col:
-                daily_orders = df_f.groupby(df_f[order_date_col].dt.date).size().reset_index(name='Daily Orders')
-                daily_orders.columns = ['Deduction Duration', 'Daily Orders']
-                ads_f = pd.merge(ads_f, daily_orders, on='Deduction Duration', how='left').fillna(0)
-                ads_f['Per Order Cost'] = ads_f.apply(lambda row: row['Total Ads Cost'] / row['Daily Orders'] if row['Daily Orders'] > 0 else 0, axis=1)
-
-            ads_total = ads_f['Total Ads Cost'].sum()
+            ads_window = ads_ledger.window(ads_rng[0], ads_rng[1])
+            ads_f = ads_window.with_orders(day_orders) if order_date_col else ads_window.rows.copy()
+
+            ads_total = ads_window.total
             total_orders_period = ads_f['Daily Orders'].sum() if 'Daily Orders' in ads_f.columns else 0
             avg_per_order = ads_total / total_orders_period if total_orders_period > 0 else 0
 
@@ -412,20 +467,46 @@ if ads_df is not None and not ads_df.empty:
             fig_ads = px.bar(ads_f, x='Deduction Duration', y='Total Ads Cost', title="Daily Ads Spend")
             st.plotly_chart(fig_ads, use_container_width=True)
             ads_table = ads_f
+
+            alloc_cols = [c for c in (sku_col, catalog_id_col) if c]
+            if order_date_col and alloc_cols:
+                with st.expander("🧮 Ads Spend by SKU / Catalog"):
+                    alloc_by = st.radio("Attribute spend to", alloc_cols, horizontal=True, key="ads_alloc_by")
+                    keys = df_f[alloc_by].astype(str).fillna("")
+                    spend = ads_window.allocate(df_f[order_date_col], keys.where(keys.str.strip() != "", "(blank)"))
+                    st.caption(f"Each day's spend is split equally over that day's orders; orders without a {alloc_by} are under \"(blank)\". "
+                               f"Not attributed (undated spend, or no orders that day): ₹{ads_total - spend.sum():,.2f}")
+                    st.dataframe(spend.rename_axis(alloc_by).rename("Ads Cost").reset_index(), use_container_width=True, hide_index=True)
 else:
     st.info("No Ads Data found.")
 
+# Trends (month-over-month, from the rollups)
+trend_table = None
+if rollups is not None:
+    st.markdown("---")
+    st.subheader("📅 Monthly Trends")
+    trend_freq = st.radio("Period", FREQUENCIES, index=FREQUENCIES.index("Monthly"), horizontal=True, key="trend_freq")
+    trend_table = rollups.trend(trend_freq, user_product_cost, **roll_filters)
+    if trend_table.empty:
+        st.info("No dated orders in the selection.")
+    else:
+        period_fmt = {"Daily": "%d %b %Y", "Weekly": "Week of %d %b %Y", "Monthly": "%b %Y"}[trend_freq]
+        st.dataframe(trend_table.assign(Period=trend_table["Period"].dt.strftime(period_fmt)), use_container_width=True, hide_index=True)
+        trend_lines = [c for c in ("Delivered ₹", "Net Profit", "Ads Cost") if c in trend_table.columns]
+        fig_trend = px.line(trend_table, x="Period", y=trend_lines, markers=True, title=f"{trend_freq} P&L Trend")
+        st.plotly_chart(fig_trend, use_container_width=True)
+
 # Charts
 st.markdown("---")
 c1, c2 = st.columns(2)
 with c1:
-    status_counts_df = df_f[status_col].fillna("BLANK").value_counts().reset_index()
+    status_counts_df = df_f[status_col].astype(str).fillna("BLANK").value_counts().reset_index()
     status_counts_df.columns = ['Status', 'Count']
     fig1 = px.bar(status_counts_df, x='Status', y='Count', text='Count', title="Live Order Status")
     st.plotly_chart(fig1, use_container_width=True)
 with c2:
     if order_date_col:
-        date_counts = df_f.groupby(df_f[order_date_col].dt.date).size().reset_index(name='Orders')
+        date_counts = pd.DataFrame({order_date_col: day_orders.index.date, 'Orders': day_orders.to_numpy()})
         fig2 = px.bar(date_counts, x=order_date_col, y='Orders', text='Orders', title="Orders Timeline")
         st.plotly_chart(fig2, use_container_width=True)
 
@@ -435,8 +516,9 @@ st.subheader("📥 Downloads")
 buffer = BytesIO()
 with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
     df_f.to_excel(writer, sheet_name='Filtered Data', index=False)
-    pd.DataFrame(profit_data).to_excel(writer, sheet_name='Profit Logic', index=False)
+    profit_table.to_excel(writer, sheet_name='Profit Logic', index=False)
     if ads_table is not None: ads_table.to_excel(writer, sheet_name='Ads Analysis', index=False)
+    if trend_table is not None and not trend_table.empty: trend_table.to_excel(writer, sheet_name=f'{trend_freq} Trends', index=False)
 
 st.download_button("⬇️ Download Excel Report", data=buffer.getvalue(), file_name="Meesho_Report_v21.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
@@ -6,6 +6,11 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet
 
+from utils.ads_ledger import COST, DEDUCTION_DATE, AdsLedger
+from utils.compact import compact_frame
+from utils.datasets import PAYMENTS, upload_or_saved
+from utils.ingest import read_upload
+
 # 🔐 LOGIN CHECK (YAHI ADD KARNA HAI)
 if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
     st.warning("🔒 Please login first")
@@ -14,11 +19,10 @@ if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
 # -------------------------------
 # Function to generate Payment Date Summary
 # -------------------------------
-def generate_summary(order_df, adcost_df):
+def generate_summary(order_df, ads_ledger):
     summary_list = []
     
     order_df['Payment Date Parsed'] = pd.to_datetime(order_df['Payment Date'], errors="coerce").dt.date
-    adcost_df['Deduction Date'] = pd.to_datetime(adcost_df['Deduction Date'], errors="coerce").dt.date
     
     order_df['Payment Date Clean'] = order_df.apply(
         lambda row: row['Payment Date Parsed'] if pd.notnull(row['Payment Date Parsed']) else str(row['Payment Date']),
@@ -29,7 +33,7 @@ def generate_summary(order_df, adcost_df):
         status_summary = group.groupby('Live Order Status').agg(
             Status_Count=('Live Order Status', 'count'),
             Sum_Amount=('Final Settlement Amount', 'sum')
-        ).reset_index()
+        ).reset_index().astype({'Live Order Status': str})  # "Total" rows are appended below
 
         total_count = status_summary['Status_Count'].sum()
         total_amount = status_summary['Sum_Amount'].sum()
@@ -38,7 +42,7 @@ def generate_summary(order_df, adcost_df):
         try:
             parsed_date = pd.to_datetime(date, errors="coerce")
             if pd.notnull(parsed_date):
-                ads_cost = adcost_df.loc[adcost_df['Deduction Date'] == parsed_date.date(), 'Total Ads Cost'].sum()
+                ads_cost = ads_ledger.cost_on(parsed_date)
         except:
             ads_cost = 0
         
@@ -73,7 +77,7 @@ def generate_dispatch_summary(order_df):
         status_summary = group.groupby('Live Order Status').agg(
             Status_Count=('Live Order Status', 'count'),
             Sum_Amount=('Final Settlement Amount', 'sum')
-        ).reset_index()
+        ).reset_index().astype({'Live Order Status': str})  # "Total" rows are appended below
         
         total_count = status_summary['Status_Count'].sum()
         total_amount = status_summary['Sum_Amount'].sum()
@@ -152,12 +156,14 @@ st.title("📊 Order Settlement Dashboard")
 
 with st.sidebar:
     st.header("⚙️ Controls")
-    uploaded_file = st.file_uploader("Upload Excel File", type=["xlsx"])
+    uploaded_file = st.file_uploader("Upload Excel File", type=["xlsx", "meesho"])
+    uploaded_file = upload_or_saved(PAYMENTS, uploaded_file)
 
 if uploaded_file:
-    xls = pd.ExcelFile(uploaded_file)
-    order_df = pd.read_excel(xls, sheet_name="Order Payments")
-    adcost_df = pd.read_excel(xls, sheet_name="Ads Cost")
+    order_df = compact_frame(read_upload(uploaded_file, "excel", sheet_name="Order Payments"))
+    # only the ledger reads the ads sheet; the order rows are shown and exported in full
+    adcost_df = read_upload(uploaded_file, "excel", sheet_name="Ads Cost", usecols=[DEDUCTION_DATE, COST])
+    ads_ledger = AdsLedger(adcost_df, DEDUCTION_DATE)
 
     # Dashboard Calculations
     order_df['Payment Date Parsed'] = pd.to_datetime(order_df['Payment Date'], errors="coerce").dt.date
@@ -165,7 +171,7 @@ if uploaded_file:
     unscheduled_df = order_df[order_df['Payment Date Parsed'].isna()]
 
     scheduled_amount = scheduled_df['Final Settlement Amount'].sum()
-    total_ads_cost = abs(adcost_df['Total Ads Cost'].sum())
+    total_ads_cost = abs(ads_ledger.total)
     net_scheduled_payment = scheduled_amount - total_ads_cost
     unscheduled_amount = unscheduled_df['Final Settlement Amount'].sum()
     upcoming_payment = net_scheduled_payment + unscheduled_amount
@@ -187,7 +193,7 @@ if uploaded_file:
 
     # Payment Date Summary
     st.header("📅 Payment Date Wise Summary")
-    summary_list = generate_summary(order_df, adcost_df)
+    summary_list = generate_summary(order_df, ads_ledger)
     for item in summary_list:
         st.subheader(f"📅 Payment Date: {item['Payment Date']}")
         df = item["Summary"].copy()
@@ -12,6 +12,9 @@ import io
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 
+from utils.datasets import LABELS, register_frame
+from utils.workspace import persist_state, restore_state
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -254,14 +257,19 @@ with st.expander("📤 Upload PDFs", expanded=True):
     if st.button("🚀 Process PDFs") and files:
         with st.spinner("📄 PDFs पढ़े जा रहे हैं..."):
             st.session_state["seller_dfs"] = process_pdfs(files)
+            persist_state("seller_dfs")
         st.success("✅ Processing Completed Successfully")
 
 # ------------------------------------------------------------
 # OUTPUT
 # ------------------------------------------------------------
-if "seller_dfs" in st.session_state:
+restore_state("seller_dfs")
+
+if st.session_state.get("seller_dfs"):
     seller_dfs = st.session_state["seller_dfs"]
     all_df = pd.concat(seller_dfs.values(), ignore_index=True)
+    # shared with the Dispatch Order Details page (no Excel round trip)
+    register_frame(LABELS, all_df, f"{len(seller_dfs)} seller(s) from Meesho PDFs")
 
     # 🔎 FILTERS (SAME LINE)
     col1, col2 = st.columns(2)
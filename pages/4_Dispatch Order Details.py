@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import io
 
+from utils.datasets import LABELS, PAYMENTS, loaded_frame, upload_or_saved, use_loaded
+from utils.ingest import read_upload
+from utils.workspace import persist_state, restore_state
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -9,11 +13,9 @@ if "logged_in" not in st.session_state or not st.session_state.logged_in:
 # Page config
 st.set_page_config(page_title="Meesho Order Matcher", layout="wide")
 
-# Session storage
-if "merged_df" not in st.session_state:
-    st.session_state.merged_df = None
-if "courier_stats" not in st.session_state:
-    st.session_state.courier_stats = None
+# Session storage (restored from the user's workspace after refresh / login)
+restore_state("merged_df", default=None)
+restore_state("courier_stats", default=None)
 
 # ===============================
 # 🔽 UPLOAD SECTION (TRIANGLE)
@@ -24,9 +26,10 @@ with st.expander("▶️ PAYMENT & PDF FILE UPLOAD करें", expanded=True)
     with col1:
         payment_file = st.file_uploader(
             "PAYMENT SHEET अपलोड करें (Sub Order No वाला)",
-            type=['xlsx', 'xls'],
+            type=['xlsx', 'xls', 'meesho'],
             key="payment"
         )
+        payment_file = upload_or_saved(PAYMENTS, payment_file)
 
     with col2:
         pdf_file = st.file_uploader(
@@ -34,14 +37,16 @@ with st.expander("▶️ PAYMENT & PDF FILE UPLOAD करें", expanded=True)
             type=['xlsx', 'xls'],
             key="pdf"
         )
+        # label data of the PDF page, without the Excel download / re-upload
+        labels = use_loaded(LABELS) if pdf_file is None else None
 
 # ===============================
 # PROCESSING
 # ===============================
-if payment_file is not None and pdf_file is not None:
+if payment_file is not None and (pdf_file is not None or labels is not None):
 
-    payment_df = pd.read_excel(payment_file)
-    pdf_df = pd.read_excel(pdf_file)
+    payment_df = read_upload(payment_file, "excel")
+    pdf_df = read_upload(pdf_file, "excel") if pdf_file is not None else loaded_frame(LABELS)
 
     # Column detection (case-insensitive)
     payment_col = next((c for c in payment_df.columns if 'sub order' in c.lower()), None)
@@ -79,6 +84,7 @@ if payment_file is not None and pdf_file is not None:
         grand_total = courier_summary['Unique Packets'].sum()
 
         st.session_state.courier_stats = courier_summary
+        persist_state("merged_df", "courier_stats")
 
         st.subheader("🚚 Courier-wise Dispatch order")
         st.dataframe(courier_summary, use_container_width=True)
@@ -4,6 +4,13 @@ from io import BytesIO
 from fpdf import FPDF
 import tempfile
 
+from utils.compact import compact_frame
+from utils.dedup import distinct_uploads, drop_overlapping_rows, summary
+from utils.ingest import expand_zips, read_uploads
+from utils.sku_index import sku_index
+from utils.upload_readers import intransit_report
+from utils.workspace import persist_state, restore_state, uploads_or_saved
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -18,6 +25,7 @@ st.title("📦 Courier Partner Delivery & Return Analysis (with Select All Featu
 
 def add_grand_totals(df: pd.DataFrame) -> pd.DataFrame:
     """Add 'Grand Total' column and row for generic pivot tables."""
+    df.columns = df.columns.astype(object)  # a categorical column index takes no new labels
     df["Grand Total"] = df.sum(axis=1, numeric_only=True)
     total_row = df.sum(axis=0, numeric_only=True)
     total_row.name = "Grand Total"
@@ -27,6 +35,7 @@ def add_grand_totals(df: pd.DataFrame) -> pd.DataFrame:
 
 def add_totals_column(df: pd.DataFrame) -> pd.DataFrame:
     """Add 'Total' column and a 'Grand Total' row for date x courier table."""
+    df.columns = df.columns.astype(object)  # a categorical column index takes no new labels
     df["Total"] = df.sum(axis=1, numeric_only=True)
     total_row = df.sum(axis=0, numeric_only=True)
     total_row.name = "Grand Total"
@@ -155,20 +164,23 @@ def pivot_to_pdf_stylegroup(pivot_df: pd.DataFrame,
 # ----------------- Upload section -----------------
 with st.expander("Upload CSV/XLSX Files", expanded=True):
     uploaded_files = st.file_uploader(
-        "Upload CSV/XLSX Files",
+        "Upload CSV/XLSX Files (or ZIPs of them)",
         accept_multiple_files=True
     )
+    uploaded_files = uploads_or_saved("intransit_uploads", uploaded_files)
 
 if uploaded_files:
-    dfs = []
-    for f in uploaded_files:
-        if f.name.endswith(".csv"):
-            df = pd.read_csv(f, skiprows=7)
-        else:
-            df = pd.read_excel(f, skiprows=7)
-        dfs.append(df)
-
-    df_all = pd.concat(dfs, ignore_index=True)
+    files, dup_files = distinct_uploads(expand_zips(uploaded_files))
+    dfs = read_uploads(files, intransit_report)
+    for df in dfs:
+        if isinstance(df, Exception):
+            raise df
+    dfs, dup_rows, dup_keys = drop_overlapping_rows(dfs)
+    dropped = summary(dup_files, dup_rows, dup_keys)
+    if dropped:
+        st.info(dropped)
+
+    df_all = compact_frame(pd.concat(dfs, ignore_index=True))
 
     # Normalise Courier Partner names
     if "Courier Partner" in df_all.columns:
@@ -235,13 +247,13 @@ if uploaded_files:
     if "SKU" in df_all.columns:
         df_all["SKU"] = df_all["SKU"].astype(str)
         all_skus = sorted(df_all["SKU"].dropna().unique())
+        sku_search = sku_index(all_skus)
 
         st.sidebar.markdown("---")
         st.sidebar.markdown("### 📦 SKU Group Manager")
 
         # --- Session State Init ---
-        if 'sku_groups' not in st.session_state:
-            st.session_state['sku_groups'] = []
+        restore_state('sku_groups', default=[])
         
         # --- NEW: Creator Interface with SELECT ALL ---
         with st.sidebar.expander("➕ Create New Group (Smart Select)", expanded=False):
@@ -253,7 +265,7 @@ if uploaded_files:
             # Find Matches
             found_matches = []
             if search_keyword:
-                found_matches = [s for s in all_skus if search_keyword.lower() in s.lower()]
+                found_matches = sku_search.match(search_keyword)
             
             st.caption(f"Step 2: Review Selection ({len(found_matches)} found)")
             
@@ -299,6 +311,7 @@ if uploaded_files:
                             break
                     if not found:
                         st.session_state["sku_groups"].append({"name": group_name_input, "skus": selected_for_group})
+                    persist_state("sku_groups")
                     st.toast(f"✅ Group '{group_name_input}' Saved with {len(selected_for_group)} SKUs!")
                 else:
                     st.toast("⚠️ Name and valid selection required.")
@@ -309,6 +322,7 @@ if uploaded_files:
             st.markdown("---")
             if st.button("🧹 Clear All Groups"):
                 st.session_state["sku_groups"] = []
+                persist_state("sku_groups")
                 st.rerun()
 
         # -------------------------------------------------------------
@@ -4,6 +4,12 @@ from io import BytesIO
 from fpdf import FPDF
 import tempfile
 
+from utils.dedup import distinct_uploads, drop_overlapping_rows, summary
+from utils.ingest import expand_zips, read_uploads
+from utils.sku_index import sku_index
+from utils.upload_readers import delivered_report
+from utils.workspace import persist_state, restore_state, uploads_or_saved
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -199,34 +205,30 @@ with st.expander("📁 Upload CSV/XLSX Files", expanded=True):
     uploaded_files = st.file_uploader(
         "Upload CSV/XLSX Files",
         accept_multiple_files=True,
-        type=["csv", "xlsx", "xls"]
+        type=["csv", "xlsx", "xls", "zip"]
     )
+    uploaded_files = uploads_or_saved("delivered_uploads", uploaded_files)
 
-HEADER_ROW_INDEX = 7
+HEADER_ROW_INDEX = 7  # only when no "Courier Partner" / "Delivered Date" header row is found
 
 if uploaded_files:
+    files, dup_files = distinct_uploads(expand_zips(uploaded_files))
     dfs = []
-    for f in uploaded_files:
-        try:
-            if f.name.lower().endswith(".csv"):
-                df = pd.read_csv(f, skiprows=HEADER_ROW_INDEX, dtype=str, encoding="utf-8")
-            else:
-                df = pd.read_excel(f, skiprows=HEADER_ROW_INDEX, dtype=str)
-        except Exception:
-            try:
-                if f.name.lower().endswith(".csv"):
-                    df = pd.read_csv(f, dtype=str, encoding="utf-8")
-                else:
-                    df = pd.read_excel(f, dtype=str)
-            except Exception as e:
-                st.error(f"Failed to read {f.name}: {e}")
-                continue
+    for f, df in zip(files, read_uploads(files, delivered_report, HEADER_ROW_INDEX)):
+        if isinstance(df, Exception):
+            st.error(f"Failed to read {f.name}: {df}")
+            continue
         dfs.append(df)
 
     if not dfs:
         st.error("No readable files uploaded.")
         st.stop()
 
+    dfs, dup_rows, dup_keys = drop_overlapping_rows(dfs)
+    dropped = summary(dup_files, dup_rows, dup_keys)
+    if dropped:
+        st.info(dropped)
+
     df_all = pd.concat(dfs, ignore_index=True).reset_index(drop=True)
     df_all.columns = [str(c).strip() for c in df_all.columns]
 
@@ -295,13 +297,13 @@ if uploaded_files:
     if "SKU" in df_all.columns:
         df_all["SKU"] = df_all["SKU"].astype(str)
         all_skus = sorted(df_all["SKU"].dropna().unique())
+        sku_search = sku_index(all_skus)
 
         st.sidebar.markdown("---")
         st.sidebar.markdown("### 📦 SKU Group Manager")
 
         # --- Session State Init ---
-        if 'sku_groups' not in st.session_state:
-            st.session_state['sku_groups'] = []
+        restore_state('sku_groups', default=[])
         
         # --- Group Creator Interface (Search -> Select All -> Save) ---
         with st.sidebar.expander("➕ Create New Group", expanded=False):
@@ -311,7 +313,7 @@ if uploaded_files:
             # Find Matches
             found_matches = []
             if search_keyword:
-                found_matches = [s for s in all_skus if search_keyword.lower() in s.lower()]
+                found_matches = sku_search.match(search_keyword)
             
             st.caption(f"Step 2: Review Selection ({len(found_matches)} found)")
             
@@ -351,6 +353,7 @@ if uploaded_files:
                             break
                     if not found:
                         st.session_state["sku_groups"].append({"name": group_name_input, "skus": selected_for_group})
+                    persist_state("sku_groups")
                     st.toast(f"✅ Group '{group_name_input}' Saved with {len(selected_for_group)} SKUs!")
                 else:
                     st.toast("⚠️ Name and valid selection required.")
@@ -360,6 +363,7 @@ if uploaded_files:
             st.markdown("---")
             if st.button("🧹 Clear All Groups"):
                 st.session_state["sku_groups"] = []
+                persist_state("sku_groups")
                 st.rerun()
 
         # --- Group Selection Logic ---
@@ -11,6 +11,11 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 
+from utils.dedup import distinct_uploads, drop_overlapping_rows, summary
+from utils.ingest import expand_zips, read_uploads
+from utils.upload_readers import order_list_file
+from utils.workspace import uploads_or_saved
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -193,38 +198,35 @@ def extract_color_from_row(row: pd.Series) -> str:
 
 # ---------------- Read & Merge ----------------
 
-def read_one(upload) -> pd.DataFrame:
-    name = upload.name.lower()
-    try:
-        if name.endswith(('.xlsx','.xls')):
-            return pd.read_excel(upload)
-        return pd.read_csv(upload, encoding='utf-8', on_bad_lines='skip')
-    except Exception:
-        upload.seek(0)
-        return pd.read_csv(upload, encoding='latin1', on_bad_lines='skip')
-
 def drop_header_like_rows(df: pd.DataFrame, header_cols: List[str]) -> pd.DataFrame:
+    # a row whose cells (as text) are exactly the header, e.g. a second file's header pasted in
+    if df.shape[1] != len(header_cols):
+        return df.copy()
     try:
-        mask = (df.astype(str).apply(lambda r: list(r.values), axis=1).astype(str) == str(header_cols))
+        mask = (df.astype(str) == [str(c) for c in header_cols]).all(axis=1)
         return df.loc[~mask].copy()
     except Exception:
         return df
 
 def merge_files(files) -> pd.DataFrame:
-    base = None
-    for f in files:
-        cur = read_one(f)
-        cur.columns = cur.columns.astype(str).str.strip()
-        if base is None:
-            base = cur.copy()
-        else:
-            cur = drop_header_like_rows(cur, list(base.columns))
-            for c in base.columns:
+    files, dup_files = distinct_uploads(expand_zips(files))
+    frames = []
+    for cur in read_uploads(files, order_list_file):
+        if isinstance(cur, Exception):
+            raise cur
+        if frames:
+            base_cols = frames[0].columns
+            cur = drop_header_like_rows(cur, list(base_cols))
+            for c in base_cols:
                 if c not in cur.columns:
                     cur[c] = pd.NA
-            cur = cur[base.columns]
-            base = pd.concat([base, cur], ignore_index=True)
-    return base if base is not None else pd.DataFrame()
+            cur = cur[base_cols]
+        frames.append(cur)
+    frames, dup_rows, dup_keys = drop_overlapping_rows(frames)
+    dropped = summary(dup_files, dup_rows, dup_keys)
+    if dropped:
+        st.info(dropped)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 # ---------------- Filtering ----------------
 
@@ -322,9 +324,10 @@ def main():
     with st.expander('Upload files'):  
         uploads = st.file_uploader(  
             'Upload multiple CSV/XLSX files',  
-            type=['csv','xlsx','xls'],  
+            type=['csv','xlsx','xls','zip'],  
             accept_multiple_files=True  
         )  
+        uploads = uploads_or_saved('order_list_uploads', uploads)
 
     with st.expander('Style Search'):  
         use_user_rules_first = st.toggle('Manual keywords first', value=True)  
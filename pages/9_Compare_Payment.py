@@ -6,6 +6,11 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
 
+from utils.datasets import PAYMENTS, upload_or_saved
+from utils.ingest import read_upload
+from utils.numeric import to_amount
+from utils.workspace import uploads_or_saved
+
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Please Login")
     st.stop()
@@ -20,8 +25,8 @@ def generate_reports_and_stats(old_df, new_df):
     amount_col = "Final Settlement Amount"
 
     # डेटा की सफाई
-    old_df[amount_col] = pd.to_numeric(old_df[amount_col].astype(str).str.replace(',', '').str.strip(), errors='coerce').fillna(0)
-    new_df[amount_col] = pd.to_numeric(new_df[amount_col].astype(str).str.replace(',', '').str.strip(), errors='coerce').fillna(0)
+    old_df[amount_col] = to_amount(old_df[amount_col])
+    new_df[amount_col] = to_amount(new_df[amount_col])
 
     # डेटा को मर्ज करना
     merged_df = pd.merge(
@@ -107,14 +112,16 @@ st.title("📊 Advanced Payment Reconciliation Tool")
 with st.expander("📂 Step 1: Upload Your Files", expanded=True):
     col1, col2 = st.columns(2)
     with col1:
-        old_file = st.file_uploader("1. Upload Old Data File ('Order Payments' शीट)", type=["xlsx"])
+        old_file = st.file_uploader("1. Upload Old Data File ('Order Payments' शीट)", type=["xlsx", "meesho"])
+        old_file = uploads_or_saved("compare_old_file", old_file)
     with col2:
-        new_file = st.file_uploader("2. Upload New Data File ('Order Payments' शीट)", type=["xlsx"])
+        new_file = st.file_uploader("2. Upload New Data File ('Order Payments' शीट)", type=["xlsx", "meesho"])
+        new_file = upload_or_saved(PAYMENTS, new_file)
 
 if old_file and new_file:
     try:
-        old_df = pd.read_excel(old_file, sheet_name="Order Payments", dtype=str)
-        new_df = pd.read_excel(new_file, sheet_name="Order Payments", dtype=str)
+        old_df = read_upload(old_file, "excel", sheet_name="Order Payments", dtype=str)
+        new_df = read_upload(new_file, "excel", sheet_name="Order Payments", dtype=str)
         st.success("✅ फ़ाइलें सफलतापूर्वक अपलोड हो गईं! रिपोर्ट तैयार है...")
 
         reports, stats = generate_reports_and_stats(old_df, new_df)
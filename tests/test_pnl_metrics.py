@@ -0,0 +1,25 @@
+"""
+utils/pnl_metrics against the P&L page's formulas from before it, on the
+frames of tools/check_pnl_metrics.py (synthetic, compacted, messy statuses
+and amounts, no RTO rows, few columns, empty).
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from check_pnl_metrics import new_metrics, old_formulas, values_match, variants  # noqa: E402
+
+CASES = {label: (df, cols) for label, df, cols in variants(5_000)}
+
+
+@pytest.mark.parametrize("label", list(CASES))
+def test_metrics_match_the_old_formulas(label):
+    df, cols = CASES[label]
+    (old, old_df), (new, new_df) = old_formulas(df, cols), new_metrics(df, cols)
+    assert [k for k in old if not values_match(old[k], new[k])] == []
+    pd.testing.assert_frame_equal(old_df, new_df, check_dtype=False)
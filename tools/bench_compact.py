@@ -0,0 +1,73 @@
+"""
+Memory and filter timings of a loaded "Order Payments" frame before and
+after utils/compact.compact_frame.
+
+    python tools/bench_compact.py --rows 200000
+
+The filter / groupby / value_counts results must be the same on both frames
+(checked before timing).
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import orders_frame  # noqa: E402
+from utils.compact import compact_frame, frame_bytes  # noqa: E402
+
+STATUS, SKU, AMOUNT = "Live Order Status", "Supplier SKU", "Final Settlement Amount"
+
+
+def ops(df: pd.DataFrame):
+    skus = df[SKU].drop_duplicates().iloc[::7].tolist()
+    return [
+        ("isin", lambda: df[df[STATUS].isin(["Delivered", "Return"]) & df[SKU].isin(skus)]),
+        ("groupby sum", lambda: df.groupby(SKU, sort=True)[AMOUNT].sum()),
+        ("value_counts", lambda: df[STATUS].value_counts()),
+        ("== status", lambda: (df[STATUS] == "RTO").sum()),
+    ]
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    # read back through CSV, as the pages get it: object/str text, int64 / float64 numbers
+    df = pd.read_csv(io.StringIO(orders_frame(args.rows).to_csv(index=False)))
+    compact = compact_frame(df)
+    print(f"{args.rows:,} rows: {frame_bytes(df) / 1e6:.1f} MB -> {frame_bytes(compact) / 1e6:.1f} MB")
+    print("  " + ", ".join(f"{c}: {t}" for c, t in compact.dtypes.astype(str).items() if t != str(df[c].dtype)))
+
+    for (label, old), (_, new) in zip(ops(df), ops(compact)):
+        a, b = old(), new()
+        if isinstance(a, pd.DataFrame):
+            pd.testing.assert_frame_equal(a, b, check_dtype=False, check_categorical=False)
+        elif isinstance(a, pd.Series):
+            pd.testing.assert_series_equal(a, b, check_dtype=False, check_categorical=False, check_index_type=False)
+        else:
+            assert a == b, label
+    for (label, old), (_, new) in zip(ops(df), ops(compact)):
+        t_old, t_new = _best(old, args.repeat), _best(new, args.repeat)
+        print(f"  {label:<13} {t_old * 1e3:8.1f} ms   compact {t_new * 1e3:8.1f} ms   x{t_old / t_new:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Time and peak memory of the order CSV read of 10_Discount_Dashboard.py,
+whole-file pd.read_csv vs utils/csv_stream.read_csv_typed.
+
+    python tools/bench_csv.py --rows 1000000
+
+Each read runs in a fresh interpreter; its peak is the highest RSS sampled
+during the read above the RSS just before it (after a small warm-up read).
+Both must give the same columns and values (checked first).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import order_export_csv  # noqa: E402
+from utils.csv_stream import read_csv_typed  # noqa: E402
+
+DTYPES = {
+    "Reason for Credit Entry": "category",
+    "Sub Order No": "str",
+    "Order Date": "str",
+    "Product Name": "str",
+    "SKU": "str",
+    "Supplier Listed Price (Incl. GST + Commission)": "number",
+    "Supplier Discounted Price (Incl GST and Commision)": "number",
+}
+
+
+def old_read(data: bytes) -> pd.DataFrame:
+    """What the page kept of a whole-file read before."""
+    df = pd.read_csv(BytesIO(data))
+    for c, kind in DTYPES.items():
+        if kind == "number":
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+def new_read(data: bytes) -> pd.DataFrame:
+    return read_csv_typed(data, DTYPES)
+
+
+def _frame_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def _rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _child(mode: str, path: str) -> None:
+    with open(path, "rb") as f:
+        data = f.read()
+    read = old_read if mode == "old" else new_read
+    read(data[:data.index(b"\n", 1 << 16) + 1])  # first-use imports and allocations out of the way
+    base, peak, done = _rss(), [0], threading.Event()
+
+    def sample():
+        while not done.wait(0.002):
+            peak[0] = max(peak[0], _rss())
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    t0 = time.perf_counter()
+    df = read(data)
+    elapsed = time.perf_counter() - t0
+    done.set()
+    sampler.join()
+    peak_mb = (max(peak[0], _rss()) - base) / 1e6
+    print(f"{elapsed:.3f} {peak_mb:.1f} {_frame_mb(df):.1f}")
+
+
+def check(data: bytes) -> None:
+    old, new = old_read(data)[list(DTYPES)], new_read(data)
+    assert list(old.columns) == list(new.columns), "columns differ"
+    for c, kind in DTYPES.items():
+        if kind == "number":
+            pd.testing.assert_series_equal(old[c], new[c], obj=c)
+        else:
+            pd.testing.assert_series_equal(old[c].astype(str), new[c].astype(str), check_dtype=False, obj=c)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.child:
+        return _child(*args.child)
+
+    data = order_export_csv(args.rows)
+    check(data)
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+        f.write(data)
+    try:
+        print(f"{args.rows:,} rows, {len(data) / 1e6:.0f} MB CSV")
+        for label, mode in (("pd.read_csv", "old"), ("read_csv_typed", "new")):
+            out = subprocess.run([sys.executable, __file__, "--child", mode, f.name],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            elapsed, peak, size = map(float, out)
+            print(f"  {label:<15} {elapsed:7.2f}s   peak +{peak:7.0f} MB   frame {size:6.0f} MB")
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Side-by-side timings of the Excel read paths (utils/excel_reader.py).
+
+    python tools/bench_excel.py --rows 100000
+
+On a synthetic P&L upload (Order Payments + Ads Cost) it times:
+
+  sheet names   pd.ExcelFile(...).sheet_names      vs  xl/workbook.xml
+  P&L upload    ExcelFile + parse per sheet         vs  sheet_names() + read_sheet() per sheet
+                (openpyxl, the old _read_uploaded)       (calamine)
+  one sheet     pd.read_excel(engine="openpyxl")    vs  read_sheet() (calamine)
+  4 columns     the same with usecols
+
+Every pair must give the same frames; the script checks that before timing.
+"""
+
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import pnl_workbook  # noqa: E402
+from utils.excel_reader import read_sheet, sheet_names  # noqa: E402
+
+USECOLS = ["Sub Order No", "Live Order Status", "Payment Date", "Final Settlement Amount"]
+
+
+def old_read_uploaded(data: bytes):
+    xls = pd.ExcelFile(BytesIO(data), engine="openpyxl")
+    sheet_map = {s.lower(): s for s in xls.sheet_names}
+    df_orders = pd.read_excel(xls, sheet_name=sheet_map.get("order payments", xls.sheet_names[0]))
+    df_ads = pd.read_excel(xls, sheet_name=sheet_map["ads cost"]) if "ads cost" in sheet_map else None
+    return df_orders, df_ads
+
+
+def new_read_uploaded(data: bytes):
+    sheet_map = {s.lower(): s for s in sheet_names(data)}
+    df_orders = read_sheet(data, sheet_map.get("order payments", next(iter(sheet_map.values()))))
+    df_ads = read_sheet(data, sheet_map["ads cost"]) if "ads cost" in sheet_map else None
+    return df_orders, df_ads
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000, help="Order Payments rows")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    data = pnl_workbook(args.rows)
+    print(f"{args.rows:,} rows, {len(data) / 1e6:.1f} MB workbook (best of {args.repeat})")
+
+    with pd.ExcelFile(BytesIO(data), engine="openpyxl") as xls:
+        assert xls.sheet_names == sheet_names(data), "sheet names differ"
+    for old, new in zip(old_read_uploaded(data), new_read_uploaded(data)):
+        pd.testing.assert_frame_equal(old, new)
+    pd.testing.assert_frame_equal(
+        pd.read_excel(BytesIO(data), sheet_name="Order Payments", engine="openpyxl", usecols=USECOLS),
+        read_sheet(data, "Order Payments", usecols=USECOLS))
+
+    def _names():
+        with pd.ExcelFile(BytesIO(data), engine="openpyxl") as xls:
+            return xls.sheet_names
+
+    rows = [
+        ("sheet names", _names, lambda: sheet_names(data)),
+        ("P&L upload", lambda: old_read_uploaded(data), lambda: new_read_uploaded(data)),
+        ("one sheet", lambda: pd.read_excel(BytesIO(data), sheet_name="Order Payments", engine="openpyxl"),
+         lambda: read_sheet(data, "Order Payments")),
+        ("4 columns", lambda: pd.read_excel(BytesIO(data), sheet_name="Order Payments", engine="openpyxl",
+                                            usecols=USECOLS),
+         lambda: read_sheet(data, "Order Payments", usecols=USECOLS)),
+    ]
+    for label, old, new in rows:
+        t_old, t_new = _best(old, args.repeat), _best(new, args.repeat)
+        print(f"  {label:<12} openpyxl {t_old:8.3f}s   excel_reader {t_new:8.3f}s   x{t_old / t_new:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
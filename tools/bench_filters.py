@@ -0,0 +1,122 @@
+"""
+P&L sidebar filters on a loaded "Order Payments" frame: the old filter-by-
+filter chain vs utils/filter_index.FilterIndex masks.
+
+    python tools/bench_filters.py --rows 300000
+
+Both must select the same rows (checked first). The index is built once per
+upload, so its build time is shown apart from the per-click time.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import orders_frame  # noqa: E402
+from utils.compact import compact_frame  # noqa: E402
+from utils.filter_index import FilterIndex, all_of  # noqa: E402
+
+DATE, DISPATCH, SOURCE, SKU, CATALOG = "Order Date", "Dispatch Date", "Order source", "Supplier SKU", "Catalog ID"
+CLAIMS, RECOVERY, STATUS = "Claims", "Recovery", "Live Order Status"
+
+
+def load(rows: int) -> pd.DataFrame:
+    df = compact_frame(orders_frame(rows))
+    for c in (DATE, DISPATCH):
+        df[c] = pd.to_datetime(df[c], errors="coerce")
+    df[SKU] = df[SKU].astype(str)
+    return df
+
+
+def selections(df: pd.DataFrame) -> dict:
+    skus = sorted(df[SKU].unique())
+    return {
+        "date": (pd.Timestamp("2026-01-05"), pd.Timestamp("2026-02-20")),
+        "dispatch": (pd.Timestamp("2026-01-08"), pd.Timestamp("2026-02-25")),
+        "source": ["Meesho"],
+        "sku": skus[::5],
+        "catalog": sorted(str(x) for x in df[CATALOG].unique())[::2],
+        "claims": [0.0, 120.0],
+        "recovery": [0.0, -80.0],
+        "status": ["Delivered", "Return", ""],
+    }
+
+
+def chain(df: pd.DataFrame, sel: dict) -> pd.DataFrame:
+    """The page's filters before FilterIndex."""
+    df_f = df.copy()
+    df_f = df_f[(df_f[DATE] >= sel["date"][0]) & (df_f[DATE] <= sel["date"][1])]
+    df_f = df_f[(df_f[DISPATCH] >= sel["dispatch"][0]) & (df_f[DISPATCH] <= sel["dispatch"][1])]
+    df_f = df_f[df_f[SOURCE].astype(str).isin(sel["source"])]
+    df_f = df_f[df_f[SKU].astype(str).isin(sel["sku"])]
+    df_f = df_f[df_f[CATALOG].astype(str).isin(sel["catalog"])]
+    df_f = df_f[df_f[CLAIMS].isin(sel["claims"])]
+    df_f = df_f[df_f[RECOVERY].isin(sel["recovery"])]
+    clean = [s.upper() for s in sel["status"] if s]
+    return df_f[df_f[STATUS].astype(str).str.upper().isin(clean) | df_f[STATUS].isna()]
+
+
+def build(df: pd.DataFrame) -> FilterIndex:
+    idx = FilterIndex(len(df))
+    for c in (DATE, DISPATCH):
+        idx.add_dates(c, df[c])
+    for c in (SOURCE, SKU, CATALOG):
+        idx.add_values(c, df[c].astype(str))
+    for c in (CLAIMS, RECOVERY):
+        idx.add_values(c, df[c])
+    idx.add_values("_status", df[STATUS].astype(str).str.upper(), na=df[STATUS].isna())
+    return idx
+
+
+def indexed(df: pd.DataFrame, idx: FilterIndex, sel: dict) -> pd.DataFrame:
+    clean = [s.upper() for s in sel["status"] if s]
+    mask = all_of([
+        idx.between(DATE, *sel["date"]),
+        idx.between(DISPATCH, *sel["dispatch"]),
+        idx.isin(SOURCE, sel["source"]),
+        idx.isin(SKU, sel["sku"]),
+        idx.isin(CATALOG, sel["catalog"]),
+        idx.isin(CLAIMS, sel["claims"]),
+        idx.isin(RECOVERY, sel["recovery"]),
+        idx.isin("_status", clean) | idx.isna("_status"),
+    ])
+    return df[mask]
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=300_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    df = load(args.rows)
+    sel = selections(df)
+    t0 = time.perf_counter()
+    idx = build(df)
+    t_build = time.perf_counter() - t0
+    pd.testing.assert_frame_equal(chain(df, sel), indexed(df, idx, sel))
+
+    t_chain = _best(lambda: chain(df, sel), args.repeat)
+    t_index = _best(lambda: indexed(df, idx, sel), args.repeat)
+    print(f"{args.rows:,} rows, {len(indexed(df, idx, sel)):,} selected")
+    print(f"  filter chain   {t_chain * 1e3:8.1f} ms per rerun")
+    print(f"  FilterIndex    {t_index * 1e3:8.1f} ms per rerun   (build once {t_build * 1e3:.0f} ms)   x{t_chain / t_index:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
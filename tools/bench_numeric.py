@@ -0,0 +1,89 @@
+"""
+Microbenchmark of the amount parsing kernel (utils/numeric.py) against the
+per-cell regex chain it replaced (``coerce_col`` of 1_zip_clean.py).
+
+    python tools/bench_numeric.py --rows 1000000 --unique 5000
+
+The column mixes amount texts ("₹1,234.50", "(120)", "−45"), plain numbers
+and a little header text, like an object column of a merged payment sheet.
+Both paths must give the same cells; the script checks that before timing.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.numeric import coerce_amount_cells, to_amount  # noqa: E402
+
+
+def coerce_col_regex(col: pd.Series) -> pd.Series:
+    """The previous implementation, kept here as the baseline."""
+    if pd.api.types.is_numeric_dtype(col):
+        return col
+    original = col.copy()
+    mask = original.notna()
+    s = original[mask].astype(str)
+    s = s.str.replace(r"^\((.*)\)$", r"-\1", regex=True)
+    s = s.str.replace("−", "-", regex=False).str.replace("–", "-", regex=False)
+    s = s.str.replace(r"[₹,]", "", regex=True).str.replace(r"\s+", "", regex=True)
+    nums = pd.to_numeric(s, errors="coerce")
+    out = original.copy()
+    out.loc[mask & nums.notna()] = nums.loc[nums.notna()]
+    return out
+
+
+def amount_column(rows: int, unique: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(-50000, 500000, unique) / 100
+    styles = [
+        lambda v: f"₹{v:,.2f}",
+        lambda v: f"({abs(v):,.2f})" if v < 0 else f"{v:,.2f}",
+        lambda v: f"{v:.2f}".replace("-", "−"),
+        lambda v: v,
+    ]
+    texts = np.array([styles[i % len(styles)](v) for i, v in enumerate(amounts)], dtype=object)
+    values = texts[rng.integers(0, unique, rows)]
+    values[rng.random(rows) < 0.01] = None
+    values[:3] = ["Final Settlement Amount", "Sub Order", "(see help)"]
+    return pd.Series(values, dtype=object)
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--unique", type=int, default=5000, help="distinct amount texts in the column")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    col = amount_column(args.rows, args.unique)
+    old, new = coerce_col_regex(col), coerce_amount_cells(col)
+    assert old.isna().equals(new.isna()) and (old[old.notna()] == new[new.notna()]).all(), "results differ"
+
+    t_old = _best(lambda: coerce_col_regex(col), args.repeat)
+    t_new = _best(lambda: coerce_amount_cells(col), args.repeat)
+    t_page = _best(lambda: pd.to_numeric(col.astype(str).str.replace(",", "").str.strip(), errors="coerce").fillna(0),
+                   args.repeat)
+    t_amount = _best(lambda: to_amount(col), args.repeat)
+
+    print(f"{args.rows:,} rows, {args.unique:,} distinct amounts (best of {args.repeat})")
+    print(f"  coerce cells   regex chain {t_old:8.3f}s   kernel {t_new:8.3f}s   x{t_old / t_new:5.1f}")
+    print(f"  to number      page 9 way  {t_page:8.3f}s   kernel {t_amount:8.3f}s   x{t_page / t_amount:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
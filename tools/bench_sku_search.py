@@ -0,0 +1,75 @@
+"""
+SKU keyword search of the group managers: the old list comprehension over
+every distinct SKU vs utils/sku_index.SkuIndex.
+
+    python tools/bench_sku_search.py --skus 25000
+
+Every query must give the same list as the comprehension (checked first,
+including 1- / 2-character, mixed-case, spaced and absent keywords). The
+index is built once per SKU list, so its build time is shown apart.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sku_index import SkuIndex  # noqa: E402
+
+PRODUCTS = ["Kurti", "Trouser", "Hoodie", "Tee", "Saree", "Dupatta", "Legging", "Palazzo", "Kurta Set", "Nightsuit"]
+SELLERS = ["RAMESH", "Shree", "Anvi", "Kalki", "MAHI", "Zoya"]
+COLOURS = ["Red", "BLUE", "Black", "Mustard", "Sea Green", "Off-White", "Maroon", "Pink"]
+SIZES = ["S", "M", "L", "XL", "XXL", "Free"]
+QUERIES = ["kurti", "KURTI", "ramesh", "sea green", "green", "off-w", "kurti red", "mahi-saree", "x", "xl", "l_",
+           "2024", "0", "nothing-like-this", "kurta set_black", "hoodie maroon xl"]
+
+
+def catalog(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    parts = zip(*(rng.choice(words, n) for words in (SELLERS, PRODUCTS, COLOURS, SIZES)))
+    return sorted(f"{seller}-{product}_{colour}_{size}_{i:05d}" for i, (seller, product, colour, size) in enumerate(parts))
+
+
+def scan(skus: list, kw: str) -> list:
+    """The pages' search before SkuIndex."""
+    return [s for s in skus if kw.lower() in s.lower()]
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--skus", type=int, default=25_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    skus = catalog(args.skus)
+    t0 = time.perf_counter()
+    idx = SkuIndex(skus)
+    t_build = time.perf_counter() - t0
+    for q in QUERIES:
+        assert idx.search(q) == scan(skus, q), q
+        words = q.split()
+        assert idx.search_all(q) == [s for s in skus if all(w.lower() in s.lower() for w in words)], q
+
+    print(f"{len(skus):,} SKUs, index built once in {t_build * 1e3:.0f} ms")
+    for q in QUERIES:
+        t_scan = _best(lambda: scan(skus, q), args.repeat)
+        t_index = _best(lambda: idx.match(q), args.repeat)
+        print(f"  {q!r:<20} {len(idx.match(q)):>6,} found   scan {t_scan * 1e3:7.2f} ms   "
+              f"index {t_index * 1e3:7.3f} ms   x{t_scan / t_index:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
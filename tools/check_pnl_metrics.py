@@ -0,0 +1,123 @@
+"""
+Regression check of utils/pnl_metrics against the P&L page's formulas as
+they were before it (per-status filters, value_counts, _ensure_rto).
+
+    python tools/check_pnl_metrics.py --rows 50000
+
+Runs on synthetic "Order Payments" frames, and on variants with mixed-case
+and missing statuses, NaN claims, no RTO rows and no claims / recovery /
+price columns. Counts must be equal, amounts equal to 1e-6 (the grouped sums
+add in another order), and the prepared frame equal to the old one.
+tests/test_pnl_metrics.py runs the same comparison under pytest.
+"""
+
+import argparse
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import orders_frame  # noqa: E402
+from utils.compact import compact_frame  # noqa: E402
+from utils.numeric import to_amount  # noqa: E402
+from utils.pnl_metrics import PnlColumns, pnl_metrics, prepare_pnl_frame  # noqa: E402
+
+COLS = PnlColumns("Live Order Status", settle="Final Settlement Amount", claims="Claims", recovery="Recovery",
+                  listing_price="Listing Price (Incl. taxes)", total_sale="Total Sale Amount (Incl. Shipping & GST)")
+PRODUCT_COST = 95.0
+
+
+def old_formulas(df: pd.DataFrame, c: PnlColumns):
+    """The page's code before utils/pnl_metrics, on a copy."""
+    df = df.copy()
+    if c.listing_price and c.total_sale:
+        mask = df[c.status].astype(str).str.upper() == 'RTO'
+        df.loc[mask, 'Shipping Charge'] = to_amount(df.loc[mask, c.total_sale]) - to_amount(df.loc[mask, c.listing_price])
+        df.loc[mask, 'Shipping GST'] = df.loc[mask, 'Shipping Charge'] * 0.18
+        df.loc[mask, 'RTO Amount'] = to_amount(df.loc[mask, c.listing_price]) - df.loc[mask, 'Shipping GST']
+    counts = df[c.status].astype(str).str.upper().value_counts()
+    out = {f"c_{s}": counts.get(s, 0) for s in ("DELIVERED", "RETURN", "EXCHANGE", "CANCELLED", "SHIPPED", "RTO")}
+    out["c_claim"] = df[df[c.claims] != 0].shape[0] if c.claims else 0
+    out["c_rec"] = df[df[c.recovery] != 0].shape[0] if c.recovery else 0
+    out["orders"] = len(df)
+    df[c.settle] = to_amount(df[c.settle])
+
+    def get_sum(s): return df[df[c.status].astype(str).str.upper() == s][c.settle].sum()
+    for s in ("DELIVERED", "EXCHANGE", "CANCELLED", "RETURN", "SHIPPED"):
+        out[f"a_{s}"] = get_sum(s)
+    out["a_RTO"] = df[df[c.status].astype(str).str.upper() == 'RTO']['RTO Amount'].sum() if 'RTO Amount' in df.columns else 0
+    out["a_claims"] = df[c.claims].sum() if c.claims else 0
+    out["a_rec"] = abs(df[c.recovery].sum()) if c.recovery else 0
+    a = out
+    out["shipped_total"] = (a["a_DELIVERED"] + a["a_CANCELLED"] + a["a_SHIPPED"]) - (abs(a["a_RETURN"]) + abs(a["a_EXCHANGE"]))
+    out["total_amount"] = (a["a_DELIVERED"] + a["a_EXCHANGE"] + a["a_CANCELLED"]) - abs(a["a_RETURN"])
+    ret_loss = abs(a["a_RETURN"])
+    avg_ret_cost = ret_loss / a["c_RETURN"] if a["c_RETURN"] > 0 else 0.0
+    exchange_loss = a["c_EXCHANGE"] * avg_ret_cost
+    cogs = a["c_DELIVERED"] * PRODUCT_COST
+    out["profit"] = [a["a_DELIVERED"], -ret_loss, -exchange_loss, -cogs, a["a_DELIVERED"] - (ret_loss + exchange_loss + cogs)]
+    return out, df
+
+
+def new_metrics(df: pd.DataFrame, c: PnlColumns):
+    df = prepare_pnl_frame(df.copy(), c)
+    m = pnl_metrics(df, c)
+    out = {f"c_{s}": n for s, n in m.counts.items()}
+    out.update({f"a_{s}": v for s, v in m.amounts.items()})
+    out.update(c_claim=m.claims_count, c_rec=m.recovery_count, orders=m.orders, a_claims=m.claims_amount,
+               a_rec=m.recovery_amount, shipped_total=m.shipped_total, total_amount=m.total_amount,
+               profit=m.profit(PRODUCT_COST).table()["Amount (₹)"].tolist())
+    return out, df
+
+
+def values_match(a, b) -> bool:
+    if isinstance(a, list):
+        return len(a) == len(b) and all(values_match(x, y) for x, y in zip(a, b))
+    return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-6)
+
+
+def variants(rows: int):
+    base = orders_frame(rows)
+    base["Claims"] = to_amount(base["Claims"])
+    base["Recovery"] = to_amount(base["Recovery"])
+    yield "synthetic", base, COLS
+    yield "compacted", compact_frame(base), COLS
+    rng = np.random.default_rng(1)
+    messy = base.copy()
+    status = messy[COLS.status].astype(object)
+    status[rng.random(rows) < 0.05] = None
+    status[rng.random(rows) < 0.1] = "delivered"
+    messy[COLS.status] = status
+    messy.loc[rng.random(rows) < 0.01, "Claims"] = np.nan
+    messy[COLS.settle] = messy[COLS.settle].map(lambda v: f"₹{v:,.2f}")
+    yield "messy", messy, COLS
+    yield "no RTO", base[base[COLS.status] != "RTO"], COLS
+    yield "few columns", base, PnlColumns(COLS.status, settle=COLS.settle)
+    yield "empty", base.iloc[:0], COLS
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=50_000)
+    args = ap.parse_args(argv)
+
+    failed = 0
+    for label, df, cols in variants(args.rows):
+        (old, old_df), (new, new_df) = old_formulas(df, cols), new_metrics(df, cols)
+        bad = sorted(k for k in old if not values_match(old[k], new[k]))
+        try:
+            pd.testing.assert_frame_equal(old_df, new_df, check_dtype=False)
+        except AssertionError as e:
+            bad.append(f"frame: {str(e).splitlines()[0]}")
+        print(f"{label:<12} {'ok' if not bad else 'MISMATCH ' + ', '.join(bad)}")
+        failed += bool(bad)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Regression check of utils/rollups against the P&L numbers computed from the
+filtered rows (pnl_metrics per period, and the per-day groupby the timeline
+used), with the time per view.
+
+    python tools/check_rollups.py --rows 50000
+
+Runs on a synthetic "Order Payments" frame with missing order / dispatch
+dates and statuses, for each frequency and a set of date, SKU, catalog,
+status and dispatch filters. Counts must be equal, amounts equal to 1e-6.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import ads_frame, orders_frame  # noqa: E402
+from utils.ads_ledger import AdsLedger  # noqa: E402
+from utils.compact import compact_frame  # noqa: E402
+from utils.numeric import to_amount  # noqa: E402
+from utils.pnl_metrics import PnlColumns, pnl_metrics, prepare_pnl_frame  # noqa: E402
+from utils.rollups import FREQUENCIES, RollupColumns, build_rollups, period_start, selected_statuses  # noqa: E402
+
+DATE, DISPATCH, SKU, CATALOG, STATUS = "Order Date", "Dispatch Date", "Supplier SKU", "Catalog ID", "Live Order Status"
+PNL = PnlColumns(STATUS, settle="Final Settlement Amount", claims="Claims", recovery="Recovery",
+                 listing_price="Listing Price (Incl. taxes)", total_sale="Total Sale Amount (Incl. Shipping & GST)")
+ROLL = RollupColumns(DATE, dispatch=DISPATCH, sku=SKU, catalog=CATALOG)
+PRODUCT_COST = 95.0
+CHECKED = {"Orders": "orders", "Delivered": ("counts", "DELIVERED"), "Return": ("counts", "RETURN"),
+           "Exchange": ("counts", "EXCHANGE"), "RTO": ("counts", "RTO"), "Delivered ₹": ("amounts", "DELIVERED"),
+           "Return ₹": ("amounts", "RETURN"), "RTO ₹": ("amounts", "RTO"), "Claims ₹": "claims_amount",
+           "Recovery ₹": "recovery_amount"}
+
+
+def load(rows: int) -> pd.DataFrame:
+    df = compact_frame(orders_frame(rows))
+    for c in (DATE, DISPATCH):
+        df[c] = pd.to_datetime(df[c], errors="coerce")
+    rng = np.random.default_rng(3)
+    df.loc[rng.random(rows) < 0.02, DISPATCH] = pd.NaT
+    df.loc[rng.random(rows) < 0.01, DATE] = pd.NaT
+    status = df[STATUS].astype(object)
+    status[rng.random(rows) < 0.03] = None
+    df[STATUS] = status
+    df[SKU] = df[SKU].astype(str)
+    for c in (PNL.claims, PNL.recovery):
+        df[c] = to_amount(df[c])
+    return df
+
+
+def views(df: pd.DataFrame) -> dict:
+    skus = sorted(df[SKU].unique())
+    cats = sorted(df[CATALOG].astype(str).unique())
+    return {
+        "all": {},
+        "date window": dict(start="2026-01-10", end="2026-02-13"),
+        "SKUs": dict(skus=skus[::7]),
+        "catalogs + status": dict(catalogs=cats[::3], statuses=selected_statuses(["Delivered", "Return", ""])),
+        "blank status": dict(statuses=selected_statuses([])),
+        "dispatched": dict(dispatched=True, start="2026-01-01", end="2026-12-31"),
+        "everything": dict(skus=skus[:50], start="2026-02-02", end="2026-02-20", dispatched=True, statuses=["RTO"]),
+    }
+
+
+def filtered(df: pd.DataFrame, view: dict) -> pd.DataFrame:
+    """The rows the page's filters keep for ``view`` (dated rows only)."""
+    keep = df[DATE].notna()
+    if "start" in view:
+        keep &= df[DATE] >= pd.Timestamp(view["start"])
+    if "end" in view:
+        keep &= df[DATE] <= pd.Timestamp(view["end"])
+    if "skus" in view:
+        keep &= df[SKU].isin(view["skus"])
+    if "catalogs" in view:
+        keep &= df[CATALOG].astype(str).isin(view["catalogs"])
+    if "statuses" in view:
+        key = df[STATUS].astype(str).str.upper()
+        keep &= key.isin([s for s in view["statuses"] if s]) | (key.isna() & (None in view["statuses"]))
+    if view.get("dispatched"):
+        keep &= df[DISPATCH].notna()
+    return prepare_pnl_frame(df[keep].copy(), PNL)
+
+
+def expected(rows: pd.DataFrame, freq: str) -> dict:
+    periods = period_start(rows[DATE].dt.normalize(), freq)
+    return {p: pnl_metrics(g, PNL) for p, g in rows.groupby(periods)}
+
+
+def _value(m, path):
+    if isinstance(path, tuple):
+        return getattr(m, path[0])[path[1]]
+    return getattr(m, path)
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    df = load(args.rows)
+    ads = ads_frame()
+    t0 = time.perf_counter()
+    rollups = build_rollups(prepare_pnl_frame(df.copy(), PNL), PNL, ROLL, AdsLedger(ads))
+    print(f"{args.rows:,} rows, rollups built once in {(time.perf_counter() - t0) * 1e3:.0f} ms")
+
+    failed = 0
+    for label, view in views(df).items():
+        rows = filtered(df, view)
+        for freq in FREQUENCIES:
+            table = rollups.trend(freq, PRODUCT_COST, **view).set_index("Period")
+            want = expected(rows, freq)
+            bad = [p for p in table.index if p not in want and table.loc[p, "Orders"]]
+            for period, m in want.items():
+                got = table.loc[period] if period in table.index else None
+                if got is None or not np.allclose([got[c] for c in CHECKED] + [got["Net Profit"]],
+                                                  [_value(m, p) for p in CHECKED.values()] + [m.profit(PRODUCT_COST).net],
+                                                  rtol=1e-9, atol=1e-6):
+                    bad.append(period)
+            per_day = rows.groupby(rows[DATE].dt.date).size()
+            days = rollups.orders("Daily", **view)
+            if days.tolist() != per_day.tolist() or list(days.index.date) != list(per_day.index):
+                bad.append("orders per day")
+            t_roll = _best(lambda: rollups.trend(freq, PRODUCT_COST, **view), args.repeat)
+            print(f"  {label:<18} {freq:<8} {len(table):>4} periods  {t_roll * 1e3:6.1f} ms  "
+                  f"{'ok' if not bad else 'MISMATCH ' + ', '.join(map(str, bad[:5]))}")
+            failed += bool(bad)
+    t_rows = _best(lambda: df.groupby(df[DATE].dt.date).size(), args.repeat)
+    t_days = _best(lambda: rollups.orders("Daily"), args.repeat)
+    print(f"  orders per day: groupby of the rows {t_rows * 1e3:.1f} ms, rollups {t_days * 1e3:.1f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
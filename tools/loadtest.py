@@ -0,0 +1,210 @@
+"""
+Multi-session load test for the login gate and the page pipelines.
+
+Every virtual seller is a headless Streamlit session (``AppTest``) that logs
+in through Login_page.py, switches to each page under test, uploads a
+synthetic export and then reruns the page a few times (what every widget
+click does). AppTest is not thread-safe, so every session runs in its own
+(spawned) process; the sessions of a level start together behind a
+barrier and share the user store, workspaces and parse cache on disk. A
+failing session records its error and the others go on.
+
+    python tools/loadtest.py --sessions 1,2,4,8 --rows 5000 --reruns 3
+
+Reports p50 / p95 / max rerun latency, reruns per second and the peak RSS
+of the largest session process for each concurrency level. Users and
+workspaces go to a temp dir.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {
+    "pnl": "pages/2_Profit _Loss.py",
+    "zip": "pages/1_zip_clean.py",
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, int(round(pct / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+class Session:
+    """One virtual seller driving the app through AppTest."""
+
+    def __init__(self, email, password, uploads, reruns, timeout):
+        self.email = email
+        self.password = password
+        self.uploads = uploads
+        self.reruns = reruns
+        self.timeout = timeout
+        self.timings = []  # (step, seconds)
+        self.errors = []
+
+    def _timed(self, step, at):
+        t0 = time.perf_counter()
+        at.run(timeout=self.timeout)
+        self.timings.append((step, time.perf_counter() - t0))
+        if at.exception:
+            self.errors.append(f"{step}: {at.exception[0].message}")
+
+    def run(self, pages):
+        try:
+            self._run(pages)
+        except Exception as e:
+            step = self.timings[-1][0] if self.timings else "start"
+            self.errors.append(f"after {step}: {type(e).__name__}: {e}")
+        return self
+
+    def _run(self, pages):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(os.path.join(ROOT, "Login_page.py"), default_timeout=self.timeout)
+        at.run()
+        at.text_input[0].input(self.email)
+        at.text_input[1].input(self.password)
+        at.button[0].click()
+        self._timed("login", at)
+        if not at.session_state["logged_in"]:
+            self.errors.append("login failed")
+            return
+
+        for name in pages:
+            at.switch_page(os.path.join(ROOT, PAGES[name]))
+            self._timed(f"{name}:open", at)
+            at.file_uploader[0].set_value(self.uploads[name])
+            self._timed(f"{name}:upload", at)
+            if name == "zip":
+                at.button[0].click()
+                self._timed(f"{name}:process", at)
+            for _ in range(self.reruns):
+                self._timed(f"{name}:rerun", at)
+
+
+def build_uploads(rows, zip_workbooks):
+    from synthetic import payment_zip, pnl_workbook
+
+    return {
+        "pnl": ("123456_pnl.xlsx", pnl_workbook(rows), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+        "zip": [("123456_payments.zip", payment_zip("123456", zip_workbooks, max(rows // zip_workbooks, 1)), "application/zip")],
+    }
+
+
+def _session_process(session, pages, barrier):
+    """One session in a worker process: (timings, errors, start, end, peak RSS MB)."""
+    # page deprecation / arrow-fallback warnings would drown the report
+    import streamlit  # noqa: F401  (sets up its loggers before we silence them)
+    logging.disable(logging.ERROR)
+    barrier.wait()
+    start = time.time()
+    session.run(pages)
+    return session.timings, session.errors, start, time.time(), _peak_rss_mb()
+
+
+def run_level(n, pages, uploads, reruns, timeout):
+    from utils.user_store import open_user_store
+
+    store = open_user_store()
+    store.bulk_apply([
+        {"email": f"seller{i}@load.test", "password": "pw", "expiry": "2099-12-31", "reset_device": True}
+        for i in range(n)
+    ])
+    sessions = [Session(f"seller{i}@load.test", "pw", uploads, reruns, timeout) for i in range(n)]
+
+    spawn = multiprocessing.get_context("spawn")
+    peaks, starts, ends = [], [], []
+    with spawn.Manager() as manager, ProcessPoolExecutor(max_workers=n, mp_context=spawn) as pool:
+        barrier = manager.Barrier(n)
+        futures = [pool.submit(_session_process, s, pages, barrier) for s in sessions]
+        for s, future in zip(sessions, futures):
+            try:
+                s.timings, s.errors, start, end, peak = future.result()
+            except Exception as e:  # the worker process itself died
+                s.errors.append(f"worker died: {type(e).__name__}: {e}")
+                continue
+            starts.append(start)
+            ends.append(end)
+            peaks.append(peak)
+    wall = max(ends) - min(starts) if starts else 0.0
+
+    runs = [t for s in sessions for step, t in s.timings]
+    reruns_only = [t for s in sessions for step, t in s.timings if step.endswith(":rerun")]
+    return {
+        "sessions": n,
+        "runs": len(runs),
+        "wall_s": round(wall, 3),
+        "throughput_runs_per_s": round(len(runs) / wall, 2) if wall else 0.0,
+        "p50_s": round(statistics.median(runs), 3) if runs else 0.0,
+        "p95_s": round(_percentile(runs, 95), 3),
+        "max_s": round(max(runs), 3) if runs else 0.0,
+        "rerun_p50_s": round(statistics.median(reruns_only), 3) if reruns_only else 0.0,
+        "rerun_p95_s": round(_percentile(reruns_only, 95), 3),
+        "peak_rss_mb": round(max(peaks), 1) if peaks else 0.0,
+        "failed_sessions": sum(bool(s.errors) for s in sessions),
+        "errors": [f"{s.email}: {e}" for s in sessions for e in s.errors][:5],
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", default="1,2,4,8", help="comma separated concurrency levels")
+    ap.add_argument("--pages", default="pnl,zip", help=f"pages to drive: {','.join(PAGES)}")
+    ap.add_argument("--rows", type=int, default=5000, help="order rows in the synthetic uploads")
+    ap.add_argument("--zip-workbooks", type=int, default=4, help="workbooks inside the synthetic ZIP")
+    ap.add_argument("--reruns", type=int, default=3, help="plain reruns per page after the upload")
+    ap.add_argument("--timeout", type=float, default=300, help="seconds allowed per script run")
+    ap.add_argument("--json", help="also write the results to this file")
+    args = ap.parse_args(argv)
+
+    levels = sorted(int(x) for x in args.sessions.split(",") if x.strip())
+    pages = [p.strip() for p in args.pages.split(",") if p.strip()]
+
+    tmp = tempfile.mkdtemp(prefix="meesho_load_")
+    os.environ["USER_DB"] = os.path.join(tmp, "users.db")
+    os.environ["USER_FILE"] = os.path.join(tmp, "users.json")
+    os.environ["WORKSPACE_DIR"] = os.path.join(tmp, "workspaces")
+    os.chdir(ROOT)
+
+    uploads = build_uploads(args.rows, args.zip_workbooks)
+    results = []
+    header = (f"{'sessions':>8} {'runs':>5} {'p50 s':>7} {'p95 s':>7} {'max s':>7} {'rerun p95':>9} {'runs/s':>7} "
+              f"{'peak MB':>8} {'failed':>6}")
+    print(header)
+    for n in levels:
+        r = run_level(n, pages, uploads, args.reruns, args.timeout)
+        results.append(r)
+        print(f"{r['sessions']:>8} {r['runs']:>5} {r['p50_s']:>7} {r['p95_s']:>7} {r['max_s']:>7} "
+              f"{r['rerun_p95_s']:>9} {r['throughput_runs_per_s']:>7} {r['peak_rss_mb']:>8} {r['failed_sessions']:>6}")
+        for e in r["errors"]:
+            print(f"{'':>8} ! {e}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
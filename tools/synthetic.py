@@ -0,0 +1,132 @@
+"""
+Synthetic Meesho exports for the load test and benchmarks in tools/.
+
+Column names follow the real "Order Payments" / "Ads Cost" / "Referral
+Payments" sheets closely enough for every page's column detection.
+"""
+
+import random
+import zipfile
+from datetime import date, timedelta
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+STATUSES = ["Delivered", "Return", "RTO", "Exchange", "Cancelled", "Shipped"]
+SOURCES = ["Meesho", "Meesho Ads"]
+
+ORDER_COLUMNS = [
+    "Sub Order No", "Order Date", "Dispatch Date", "Product Name", "Supplier SKU", "Catalog ID",
+    "Order source", "Live Order Status", "Product GST %", "Listing Price (Incl. taxes)", "Quantity",
+    "Transaction ID", "Payment Date", "Final Settlement Amount", "Total Sale Amount (Incl. Shipping & GST)",
+    "Claims", "Recovery",
+]
+
+
+def orders_frame(rows: int, seed: int = 0, start: date = date(2026, 1, 1), days: int = 60) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    order_dates = [start + timedelta(days=int(d)) for d in rng.integers(0, days, rows)]
+    listing = rng.integers(150, 900, rows).astype(float)
+    status = rng.choice(STATUSES, rows, p=[0.55, 0.12, 0.08, 0.05, 0.1, 0.1])
+    settle = np.where(status == "Return", -rng.integers(50, 200, rows), listing * 0.8).round(2)
+    return pd.DataFrame({
+        "Sub Order No": [f"{100000000000 + seed * rows + i}_1" for i in range(rows)],
+        "Order Date": [d.isoformat() for d in order_dates],
+        "Dispatch Date": [(d + timedelta(days=2)).isoformat() for d in order_dates],
+        "Product Name": [f"Product {i % 400}" for i in range(rows)],
+        "Supplier SKU": [f"SKU-{rng.choice(['KURTI', 'TROUSER', 'HOODIE', 'TEE'])}-{i % 2000:04d}" for i in range(rows)],
+        "Catalog ID": rng.integers(1000000, 1000400, rows),
+        "Order source": rng.choice(SOURCES, rows),
+        "Live Order Status": status,
+        "Product GST %": 5,
+        "Listing Price (Incl. taxes)": listing,
+        "Quantity": 1,
+        "Transaction ID": [f"TXN{i:08d}" for i in range(rows)],
+        "Payment Date": [(d + timedelta(days=10)).isoformat() if i % 5 else "" for i, d in enumerate(order_dates)],
+        "Final Settlement Amount": settle,
+        "Total Sale Amount (Incl. Shipping & GST)": listing + rng.integers(40, 90, rows),
+        "Claims": np.where(rng.random(rows) < 0.02, 120.0, 0.0),
+        "Recovery": np.where(rng.random(rows) < 0.02, -80.0, 0.0),
+    })
+
+
+def ads_frame(days: int = 60, start: date = date(2026, 1, 1), seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "Deduction Duration": [(start + timedelta(days=i)).isoformat() for i in range(days)],
+        "Deduction Date": [(start + timedelta(days=i)).isoformat() for i in range(days)],
+        "Total Ads Cost": [round(rng.uniform(100, 900), 2) for _ in range(days)],
+    })
+
+
+def referral_frame(rows: int = 20, seed: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Sub Order No": [f"{900000000000 + seed * rows + i}_1" for i in range(rows)],
+        "Referral Amount": [25.0] * rows,
+    })
+
+
+def pnl_workbook(rows: int, seed: int = 0) -> bytes:
+    """Cleaned workbook as produced by 1_zip_clean (header row first), input to the P&L page."""
+    buf = BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as w:
+        orders_frame(rows, seed).to_excel(w, sheet_name="Order Payments", index=False)
+        ads_frame(seed=seed).to_excel(w, sheet_name="Ads Cost", index=False)
+    return buf.getvalue()
+
+
+def _raw_sheet(df: pd.DataFrame) -> pd.DataFrame:
+    """Lay ``df`` out like a raw Meesho sheet: blank row, title row, header row, notes row, data."""
+    ncol = df.shape[1]
+    title = ["Payments to Date"] + [None] * (ncol - 1)
+    notes = ["Sub Order"] + ["(see help)"] * (ncol - 1)
+    body = [list(r) for r in df.itertuples(index=False)]
+    return pd.DataFrame([[None] * ncol, title, list(df.columns), notes] + body)
+
+
+def raw_payment_workbook(rows: int, seed: int = 0) -> bytes:
+    buf = BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as w:
+        _raw_sheet(orders_frame(rows, seed)).to_excel(w, sheet_name="Order Payments", index=False, header=False)
+        _raw_sheet(ads_frame(seed=seed)).to_excel(w, sheet_name="Ads Cost", index=False, header=False)
+        _raw_sheet(referral_frame(seed=seed)).to_excel(w, sheet_name="Referral Payments", index=False, header=False)
+        pd.DataFrame([["Summary sheet that is never merged"]]).to_excel(w, sheet_name="Summary", index=False, header=False)
+    return buf.getvalue()
+
+
+def payment_zip(supplier: str, workbooks: int, rows: int, seed: int = 0) -> bytes:
+    """A Meesho payments ZIP holding ``workbooks`` raw files named <supplier>_SP_<date>.xlsx."""
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(workbooks):
+            day = date(2026, 1, 1) + timedelta(days=seed * workbooks + i)
+            zf.writestr(f"{supplier}_SP_{day:%Y%m%d}.xlsx", raw_payment_workbook(rows, seed * 1000 + i))
+    return buf.getvalue()
+
+
+ORDER_EXPORT_STATES = ["Maharashtra", "Uttar Pradesh", "Karnataka", "Gujarat", "Bihar", "Delhi"]
+
+
+def order_export_csv(rows: int, seed: int = 0, start: date = date(2026, 1, 1), days: int = 365) -> bytes:
+    """Supplier panel "Orders" CSV, the upload of 10_Discount_Dashboard and 11_Order_Performance."""
+    rng = np.random.default_rng(seed)
+    listed = rng.integers(200, 900, rows).astype(float)
+    discounted = np.where(rng.random(rows) < 0.4, listed - rng.integers(10, 120, rows), listed)
+    reasons = np.array(["DELIVERED", "SHIPPED", "CANCELLED", "RTO_COMPLETE", "READY_TO_SHIP", "PENDING"])
+    df = pd.DataFrame({
+        "Reason for Credit Entry": rng.choice(reasons, rows, p=[0.5, 0.15, 0.1, 0.1, 0.1, 0.05]),
+        "Sub Order No": [f"{200000000000 + seed * rows + i}_1" for i in range(rows)],
+        "Order Date": [(start + timedelta(days=int(d))).isoformat() for d in rng.integers(0, days, rows)],
+        "Customer State": rng.choice(ORDER_EXPORT_STATES, rows),
+        "Product Name": [f"Product {i % 400} cotton kurti with dupatta set" for i in range(rows)],
+        "SKU": [f"SKU-{i % 2000:04d}" for i in range(rows)],
+        "Size": rng.choice(["S", "M", "L", "XL", "XXL", "Free Size"], rows),
+        "Quantity": 1,
+        "Supplier Listed Price (Incl. GST + Commission)": listed,
+        "Supplier Discounted Price (Incl GST and Commision)": discounted,
+        "Packet Id": [f"PKT{seed}{i:09d}" for i in range(rows)],
+    })
+    df.loc[df.index % 997 == 5, "Supplier Discounted Price (Incl GST and Commision)"] = np.nan
+    df.loc[df.index % 1009 == 7, "SKU"] = np.nan
+    return df.to_csv(index=False).encode()
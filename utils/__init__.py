@@ -0,0 +1 @@
+"""Shared helpers for the Streamlit pages (user store, ingestion, caching)."""
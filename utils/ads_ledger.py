@@ -0,0 +1,101 @@
+"""
+The "Ads Cost" sheet as one date-indexed ledger, shared by the P&L, Upcoming
+Payment and Order Performance pages.
+
+Each page used to parse the sheet its own way and join it to orders with a
+row-wise ``apply`` (cost / orders per day) or a scan of the sheet per
+payment date. ``AdsLedger(frame, date_col, cost_col)`` parses the dates and
+amounts once:
+
+    rows                 the sheet, date column as datetime.date, cost as numbers
+    daily                cost per day (sorted DatetimeIndex), undated rows apart
+    total / undated      all rows / rows without a date
+
+and the joins are index lookups:
+
+    cost_on(day)                    cost deducted on one day (0 if none)
+    window(start, end)              the ledger of the rows dated start..end
+    with_orders(orders_per_day)     rows + orders that day + cost per order
+    per_order(orders_per_day)       one row per day with orders or spend
+    allocate(order_days, keys)      each day's spend split equally over that
+                                    day's orders, summed per SKU / catalog
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.numeric import to_amount
+
+DURATION = "Deduction Duration"
+DEDUCTION_DATE = "Deduction Date"
+COST = "Total Ads Cost"
+
+
+def _days(values) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(pd.to_datetime(values, errors="coerce")).normalize()
+
+
+def _per_day(orders_per_day: pd.Series) -> pd.Series:
+    return pd.Series(orders_per_day.to_numpy(), index=_days(orders_per_day.index)).groupby(level=0).sum()
+
+
+def has_ledger_columns(frame: Optional[pd.DataFrame], date_col: str = DURATION, cost_col: str = COST) -> bool:
+    return frame is not None and {date_col, cost_col} <= set(frame.columns)
+
+
+class AdsLedger:
+    def __init__(self, frame: pd.DataFrame, date_col: str = DURATION, cost_col: str = COST):
+        self.date_col, self.cost_col = date_col, cost_col
+        self._days = _days(frame[date_col])
+        self.rows = frame.assign(**{date_col: self._days.date, cost_col: to_amount(frame[cost_col])})
+        cost = self.rows[cost_col].to_numpy(dtype=float)
+        dated = self._days.notna()
+        self.daily = pd.Series(cost[dated], index=self._days[dated]).groupby(level=0).sum().sort_index()
+        self.undated = float(cost[~dated].sum())
+
+    @property
+    def total(self) -> float:
+        return float(self.daily.sum()) + self.undated
+
+    def cost_on(self, day) -> float:
+        day = pd.Timestamp(day).normalize()
+        return float(self.daily.get(day, 0.0))
+
+    def window(self, start, end) -> "AdsLedger":
+        keep = (self._days >= pd.Timestamp(start)) & (self._days <= pd.Timestamp(end))
+        return AdsLedger(self.rows[keep], self.date_col, self.cost_col)
+
+    def with_orders(self, orders_per_day: pd.Series, orders: str = "Daily Orders",
+                    per_order: str = "Per Order Cost") -> pd.DataFrame:
+        """The rows with the orders of their day (``orders_per_day``: count by day) and cost / orders."""
+        out = self.rows.reset_index(drop=True)
+        counts = _per_day(orders_per_day).reindex(self._days, fill_value=0).to_numpy()
+        cost = out[self.cost_col].to_numpy(dtype=float)
+        out[orders] = counts
+        out[per_order] = np.divide(cost, counts, out=np.zeros(len(out)), where=counts > 0)
+        return out
+
+    def per_order(self, orders_per_day: pd.Series) -> pd.DataFrame:
+        """Date / Orders / Ads Cost / Ads Cost / Order for every day with orders or spend."""
+        counts = _per_day(orders_per_day)
+        days = counts.index.union(self.daily.index)
+        n = counts.reindex(days, fill_value=0).to_numpy()
+        cost = self.daily.reindex(days, fill_value=0.0).to_numpy(dtype=float)
+        return pd.DataFrame({
+            "Date": days.date, "Orders": n, "Ads Cost": cost,
+            "Ads Cost / Order": np.divide(cost, n, out=np.zeros(len(days)), where=n > 0),
+        })
+
+    def allocate(self, order_days: pd.Series, keys: pd.Series) -> pd.Series:
+        """Ads cost per key (SKU, catalog ...) of the orders dated ``order_days``, largest first.
+
+        Orders without a key are summed under a missing (NaN) key. Spend on a day without
+        orders, and undated spend, is not allocated (total - allocated).
+        """
+        days = _days(order_days)
+        per_day = pd.Series(1, index=days).groupby(level=0).sum()
+        share = self.daily.reindex(days, fill_value=0.0).to_numpy() / per_day.reindex(days).to_numpy()
+        share = np.nan_to_num(share)    # orders without a date
+        return pd.Series(share, index=keys.to_numpy()).groupby(level=0, dropna=False).sum().sort_values(ascending=False)
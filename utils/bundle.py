@@ -0,0 +1,221 @@
+"""
+Compact "Meesho bundle" (.meesho): the sheets of a merged payment workbook
+as Parquet, for the pages to load instead of parsing the .xlsx again.
+
+    <supplier>_<date>.meesho      zip (stored; the Parquet files are compressed)
+        bundle.json               {"format", "version", "supplier", "created", "date_range",
+                                   "sheets": {sheet: {"file", "rows", "cols", "header"}}}
+        <sheet idx>.parquet       the sheet's cells (utils.frame_io)
+
+A sheet is kept as its grid of raw cells (``pd.read_excel(header=None,
+dtype=object, na_filter=False)``: empty cells "", row 0 the header row) and
+parsed back with pandas' TextParser, with the options pd.read_excel gives
+it, so ``read_bundle_sheet(data, sheet, **opts)`` gives what
+``pd.read_excel(<the .xlsx>, sheet, **opts)`` gives for a single header
+row and any dtype / skiprows / nrows / usecols / na options. Multi-row
+headers, a multi-column index_col and Excel-letter usecols ("A:C") are
+refused. With ``usecols`` only those columns are loaded. Time-of-day cells
+(none in Meesho exports) are kept as text.
+"""
+
+import json
+import os
+import zipfile
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_list_like
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+from utils.excel_reader import excel_engine
+from utils.frame_io import read_frame, write_frame
+
+BUNDLE_EXT = ".meesho"
+FORMAT = "meesho-bundle"
+VERSION = 1
+_META = "bundle.json"
+
+
+def is_bundle(data: bytes) -> bool:
+    """True for the bytes of a .meesho file (an .xlsx is a zip too, without bundle.json)."""
+    if data[:4] != b"PK\x03\x04":
+        return False
+    try:
+        with zipfile.ZipFile(BytesIO(data)) as zf:
+            return _META in zf.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+def _payment_date_range(grid: pd.DataFrame) -> Optional[List[str]]:
+    if grid.empty:
+        return None
+    header = [str(v).strip().lower() for v in grid.iloc[0]]
+    if "payment date" not in header:
+        return None
+    dates = pd.to_datetime(grid.iloc[1:, header.index("payment date")], errors="coerce").dropna()
+    if dates.empty:
+        return None
+    return [dates.min().date().isoformat(), dates.max().date().isoformat()]
+
+
+def write_bundle(xlsx: bytes, supplier: str = "", sheets: Optional[List[str]] = None) -> bytes:
+    """The .meesho bundle of a merged workbook (``sheets``: which ones, default all)."""
+    buf = BytesIO()
+    meta = {"format": FORMAT, "version": VERSION, "supplier": supplier,
+            "created": datetime.now().isoformat(timespec="seconds"), "date_range": None, "sheets": {}}
+    with pd.ExcelFile(BytesIO(xlsx), engine=excel_engine()) as xls, \
+            zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        for idx, sheet in enumerate(xls.sheet_names):
+            if sheets is not None and sheet not in sheets:
+                continue
+            # the cells as the Excel reader gives them: empty cells "", error cells NaN
+            grid = _raw_grid(xls, sheet)
+            part = BytesIO()
+            write_frame(grid, part)
+            zf.writestr(f"{idx}.parquet", part.getvalue())
+            meta["sheets"][sheet] = {
+                "file": f"{idx}.parquet", "rows": int(grid.shape[0]), "cols": int(grid.shape[1]),
+                "header": ["" if pd.isna(v) else str(v) for v in grid.iloc[0]] if len(grid) else [],
+            }
+            if sheet == "Order Payments":
+                meta["date_range"] = _payment_date_range(grid)
+        zf.writestr(_META, json.dumps(meta))
+    return buf.getvalue()
+
+
+def _raw_grid(xls: pd.ExcelFile, sheet: str) -> pd.DataFrame:
+    try:
+        grid = xls.parse(sheet_name=sheet, header=None, dtype=object, na_filter=False)
+    except EmptyDataError:
+        return pd.DataFrame(dtype=object)
+    grid.columns = range(grid.shape[1])
+    return grid
+
+
+def bundle_meta(data: bytes) -> dict:
+    with zipfile.ZipFile(BytesIO(data)) as zf:
+        return json.loads(zf.read(_META))
+
+
+def bundle_sheet_names(data: bytes) -> List[str]:
+    return list(bundle_meta(data)["sheets"])
+
+
+def _sheet_key(meta: dict, sheet_name) -> str:
+    names = list(meta["sheets"])
+    if isinstance(sheet_name, int):
+        if not 0 <= sheet_name < len(names):
+            raise ValueError(f"Worksheet index {sheet_name} is invalid, {len(names)} worksheets found")
+        return names[sheet_name]
+    if sheet_name not in meta["sheets"]:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    return sheet_name
+
+
+def _grid_rows(data: bytes, meta: dict, sheet: str, columns: Optional[List[int]] = None,
+               rows: Optional[int] = None) -> List[list]:
+    """The stored cells of ``sheet`` as row lists (``columns``: only these grid columns)."""
+    with zipfile.ZipFile(BytesIO(data)) as zf:
+        part = BytesIO(zf.read(meta["sheets"][sheet]["file"]))
+    grid = read_frame(part, columns=columns)
+    if rows is not None:
+        grid = grid.iloc[:rows]
+    values = grid.to_numpy(dtype=object)
+    for col in values.T:
+        # the Excel readers give datetime.datetime, which pandas infers differently from Timestamp
+        stamps = np.fromiter((type(v) is pd.Timestamp for v in col), dtype=bool, count=len(col))
+        if stamps.any():
+            col[stamps] = [v.to_pydatetime() for v in col[stamps]]
+    return values.tolist()
+
+
+def _parse_rows(rows: List[list], sheet: str, header=0, index_col=None, usecols=None, **opts) -> pd.DataFrame:
+    """``rows`` parsed the way pd.read_excel parses a sheet's cells (one header row)."""
+    if is_list_like(header) and len(header) == 1:
+        header = header[0]
+    for name, value in (("header", header), ("index_col", index_col)):
+        if is_list_like(value):
+            raise ValueError(f"{name}={value!r} is not supported for .meesho bundles (sheet: {sheet})")
+    if isinstance(usecols, str):
+        raise ValueError(f"usecols={usecols!r} is not supported for .meesho bundles: use column names or positions")
+    try:
+        parser = TextParser(rows, header=header, index_col=index_col, usecols=usecols,
+                            skip_blank_lines=False, **opts)  # as pd.read_excel does (GH 39808)
+        return parser.read(nrows=opts.get("nrows"))
+    except EmptyDataError:
+        return pd.DataFrame()
+    except Exception as err:
+        err.args = (f"{err.args[0]} (sheet: {sheet})", *err.args[1:])
+        raise
+
+
+def _pruned_columns(meta: dict, sheet_name, opts: dict) -> Optional[List[int]]:
+    """Grid columns to load for ``usecols`` when that is sure to give the same frame, else None (all)."""
+    usecols = opts.get("usecols")
+    if usecols is None or callable(usecols) or isinstance(usecols, str):
+        return None
+    if opts.get("header", 0) != 0 or any(opts.get(k) is not None for k in ("names", "index_col", "skiprows")):
+        return None
+    usecols = list(usecols)
+    header = meta["sheets"][sheet_name]["header"]
+    if all(isinstance(c, int) for c in usecols):
+        if not all(0 <= c < meta["sheets"][sheet_name]["cols"] for c in usecols):
+            return None
+        columns = sorted(set(usecols))
+    elif all(isinstance(c, str) and header.count(c) == 1 for c in usecols):
+        columns = sorted(header.index(c) for c in usecols)
+    else:
+        return None
+    # a blank header cell is named "Unnamed: <position>", which pruning would change
+    return columns if all(header[c] != "" for c in columns) else None
+
+
+def read_bundle_sheet(data: bytes, sheet_name=0, **opts):
+    """``pd.read_excel(<the .xlsx>, sheet_name, **opts)`` answered from the bundle."""
+    opts.pop("engine", None)
+    meta = bundle_meta(data)
+    if sheet_name is None or is_list_like(sheet_name):
+        names = list(meta["sheets"]) if sheet_name is None else sheet_name
+        return {name: read_bundle_sheet(data, name, **opts) for name in names}
+    sheet = _sheet_key(meta, sheet_name)
+    columns = _pruned_columns(meta, sheet, opts)
+    if columns is not None:
+        # the pruned grid holds exactly the wanted columns, in sheet order
+        opts.pop("usecols")
+    return _parse_rows(_grid_rows(data, meta, sheet, columns), sheet, **opts)
+
+
+def bundle_rows(data: bytes, sheet_name=0, rows: Optional[int] = None) -> List[list]:
+    """excel_reader.sheet_rows() of the bundled sheet."""
+    meta = bundle_meta(data)
+    return _grid_rows(data, meta, _sheet_key(meta, sheet_name), rows=rows)
+
+
+def bundle_name(xlsx_name: str) -> str:
+    return os.path.splitext(xlsx_name)[0] + BUNDLE_EXT
+
+
+def bundle_download_name(filename: str) -> str:
+    """Download name of bundle_download() for a ZIP merge download named ``filename``."""
+    if filename.lower().endswith(".zip"):
+        return os.path.splitext(filename)[0] + "_meesho.zip"
+    return bundle_name(filename)
+
+
+def bundle_download(data: bytes, filename: str) -> bytes:
+    """
+    Bundles for a ZIP merge download (see zip_clean.bundle_outputs): one .meesho for
+    "<supplier>_<date>.xlsx", a zip of one .meesho per supplier for a multi-supplier .zip.
+    """
+    if not filename.lower().endswith(".zip"):
+        return write_bundle(data, os.path.basename(filename).split("_", 1)[0])
+    buf = BytesIO()
+    with zipfile.ZipFile(BytesIO(data)) as src, zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as dst:
+        for name in src.namelist():
+            dst.writestr(bundle_name(name), write_bundle(src.read(name), name.split("_", 1)[0]))
+    return buf.getvalue()
@@ -0,0 +1,82 @@
+"""
+Dtype compaction of loaded frames.
+
+Meesho exports repeat a handful of texts on every row ("Live Order Status",
+"Reason for Credit Entry", "Courier Partner", "Size", "Customer State", SKUs,
+dates kept as text ...). ``compact_frame(df)`` picks each column's type from
+its dtype, values and number of distinct values alone, so isin / groupby /
+value_counts / == work on integer codes where that pays:
+
+    text, distinct <= half the rows     category (categories sorted, as astype("category"))
+      and <= MAX_CATEGORIES
+    text, otherwise                     str (Arrow-backed)
+    text that looks like dates          str: pd.to_datetime maps a categorical through its
+                                        cache into another categorical, not datetime64
+    int64, |values| < 2**15             int32 (the product of two such columns still fits)
+    float64                             unchanged: float32 totals drift by paise
+
+Only columns whose every value is a str (or missing) are touched, so mixed
+cells (a number in a text column) keep their type. A categorical refuses
+values outside its categories, so code that writes new labels into a
+column or an index built from one (fillna("BLANK"), a "Total" row or
+column on a pivot) casts it to str / object first. The memory saved is
+logged at INFO on this module's logger.
+"""
+
+import logging
+import re
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+MAX_DISTINCT_RATIO = 0.5
+# beyond this many labels the categories cost about what the repeated strings did
+MAX_CATEGORIES = 1 << 15
+
+_DATE_TEXT = re.compile(r"^\s*\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}")
+
+# int32 arithmetic wraps around silently, so only columns far inside its range are downcast
+_INT32_SAFE = 1 << 15
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def _compact_text(col: pd.Series):
+    values = col.dropna()
+    if values.empty or pd.api.types.infer_dtype(values, skipna=False) != "string":
+        return None
+    distinct = values.unique()
+    dates = all(_DATE_TEXT.match(v) for v in distinct[:20])
+    if not dates and len(distinct) <= min(MAX_DISTINCT_RATIO * len(col), MAX_CATEGORIES):
+        return col.astype("category")
+    return None if col.dtype == "str" else col.astype("str")
+
+
+def _compact_int(col: pd.Series):
+    if col.empty or (col.min() > -_INT32_SAFE and col.max() < _INT32_SAFE):
+        return col.astype("int32")
+    return None
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` with its text columns categorical / str and int64 columns int32 where possible."""
+    before = frame_bytes(df)
+    out = {}
+    for i, (_, col) in enumerate(df.items()):
+        if col.dtype == "int64":
+            new = _compact_int(col)
+        elif col.dtype == object or col.dtype == "str":
+            new = _compact_text(col)
+        else:
+            new = None
+        if new is not None:
+            out[i] = new
+    if not out:
+        return df
+    df = df.copy(deep=False)
+    for i, col in out.items():
+        df.isetitem(i, col)
+    log.info("compacted %d columns: %.1f MB -> %.1f MB", len(out), before / 1e6, frame_bytes(df) / 1e6)
+    return df
@@ -0,0 +1,113 @@
+"""
+Typed, column-pruned CSV reads for the big order exports.
+
+``pd.read_csv`` on a year of Meesho order CSVs builds every column as Python
+objects before a page throws most of them away. ``read_csv_typed(data, dtypes)``
+reads only the columns in ``dtypes`` with pyarrow's streaming CSV reader, one
+block at a time, and reduces each block straight into the final column type:
+
+    "str"      pandas' Arrow-backed string dtype (the arrow buffers are kept as read)
+    "number"   pd.to_numeric(errors="coerce") per block: int64 when every
+               value is a whole number, as read_csv infers, else float64
+    "category" categorical
+
+so peak memory stays near the size of the typed result, not of the file. The
+values match ``pd.read_csv(usecols=...)`` followed by the same conversions.
+Columns of ``dtypes`` the file does not have are left out, as usecols would
+fail on them; the page reports what is missing. A file pyarrow cannot parse
+(ragged rows, a non-UTF-8 encoding) goes through pd.read_csv instead.
+"""
+
+import csv
+from io import BytesIO
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from pandas.api.types import union_categoricals
+
+BLOCK_BYTES = 4 << 20
+
+# pd.read_csv's default missing-value strings
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+_STR = pd.StringDtype("pyarrow", na_value=np.nan)
+
+
+def csv_header(data: bytes) -> List[str]:
+    """Column names on the first line of a CSV (a UTF-8 BOM is dropped)."""
+    head = data[:1 << 16].decode("utf-8-sig", errors="ignore")
+    return next(csv.reader(head.splitlines()[:1]), [])
+
+
+def _to_pandas(chunks: List[pa.Array]) -> pd.Series:
+    # large_string is what pandas' string dtype holds, so the buffers are taken over as they are
+    column = pa.chunked_array(chunks, type=pa.large_string())
+    return column.to_pandas(types_mapper={pa.large_string(): _STR}.get)
+
+
+def _reduce(chunk: pa.Array, kind: str):
+    if kind == "number":
+        nums = pd.to_numeric(_to_pandas([chunk]), errors="coerce")
+        return nums.to_numpy(dtype="int64" if nums.dtype == "int64" else "float64", na_value=np.nan)
+    if kind == "category":
+        return pd.Categorical(_to_pandas([chunk]))
+    return chunk
+
+
+def _finish(parts: list, kind: str) -> pd.Series:
+    if kind == "number":
+        # an int64 block next to a float64 one concatenates to float64
+        return pd.Series(np.concatenate(parts) if parts else np.empty(0))
+    if kind == "category":
+        if not parts:
+            return pd.Series(pd.Categorical([]), dtype="category")
+        # the same categories (sorted) as .astype("category") on the whole column
+        merged = union_categoricals(parts, sort_categories=True)
+        return pd.Series(merged)
+    return _to_pandas(parts)
+
+
+def _read_arrow(data: bytes, dtypes: Dict[str, str], block_bytes: int) -> pd.DataFrame:
+    reader = pacsv.open_csv(
+        pa.BufferReader(data),  # reads the bytes in place (a BytesIO is read through copies)
+        read_options=pacsv.ReadOptions(block_size=block_bytes),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(dtypes),
+            column_types={c: pa.large_string() for c in dtypes},
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    parts = {c: [] for c in dtypes}
+    for batch in reader:
+        for c in dtypes:
+            parts[c].append(_reduce(batch.column(c), dtypes[c]))
+    return pd.DataFrame({c: _finish(parts[c], dtypes[c]) for c in dtypes})
+
+
+def _read_pandas(data: bytes, dtypes: Dict[str, str]) -> pd.DataFrame:
+    df = pd.read_csv(BytesIO(data), usecols=list(dtypes), dtype=str)
+    for c, kind in dtypes.items():
+        if kind == "number":
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+        elif kind == "category":
+            df[c] = df[c].astype("category")
+    return df
+
+
+def read_csv_typed(data: bytes, dtypes: Dict[str, str], block_bytes: int = BLOCK_BYTES) -> pd.DataFrame:
+    """The ``dtypes`` columns ({name: "str" / "number" / "category"}) of a CSV, typed, in file order."""
+    if not data.strip():
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+    header = csv_header(data)
+    present = {c: dtypes[c] for c in header if c in dtypes}
+    try:
+        return _read_arrow(data, present, block_bytes)
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        return _read_pandas(data, present)
@@ -0,0 +1,100 @@
+"""
+Datasets loaded on one page, offered to the others for the rest of the session.
+
+The payment workbook is uploaded on P&L, Upcoming Payment, Compare Payment
+and Dispatch Order Details alike, and the label data extracted from PDFs on
+page 3 used to go out as Excel and come back in on page 4. A page that has a
+dataset registers it here under a well-known name; a page that needs it
+calls ``upload_or_loaded`` next to its uploader, which offers
+"Use loaded ..." when nothing is uploaded there. ``upload_or_saved`` also
+keeps the upload in the user's workspace (utils.workspace), so it is loaded
+again after a refresh or a new login.
+
+Entries live in ``st.session_state`` and are shared, not copied:
+
+    PAYMENTS   the uploaded workbook itself; every page reads it through
+               utils.ingest.read_upload with its own options, which is a
+               parse-cache hit once any page has parsed it
+    LABELS     the label frame of page 3 (``loaded_frame`` hands out a
+               shallow copy, so a page adding columns leaves it as it is)
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from utils.workspace import keep_uploads, saved_uploads
+
+PAYMENTS = "Order Payments workbook"
+LABELS = "PDF label data"
+
+DATASETS_KEY = "datasets"
+
+
+@dataclass
+class Dataset:
+    source: str                          # file name / page it came from
+    upload: object = None                # UploadedFile (or anything utils.ingest reads)
+    frame: Optional[pd.DataFrame] = None
+
+
+def _registry() -> dict:
+    return st.session_state.setdefault(DATASETS_KEY, {})
+
+
+def register_upload(name: str, upload) -> None:
+    _registry()[name] = Dataset(getattr(upload, "name", name), upload=upload)
+
+
+def register_frame(name: str, df: pd.DataFrame, source: str) -> None:
+    _registry()[name] = Dataset(source, frame=df)
+
+
+def loaded(name: str) -> Optional[Dataset]:
+    return _registry().get(name)
+
+
+def loaded_frame(name: str) -> Optional[pd.DataFrame]:
+    entry = loaded(name)
+    return None if entry is None or entry.frame is None else entry.frame.copy(deep=False)
+
+
+def use_loaded(name: str, container=st, key: Optional[str] = None) -> Optional[Dataset]:
+    """The registered ``name``, offered as a "Use loaded ..." checkbox (ticked); None when absent or unticked."""
+    entry = loaded(name)
+    if entry is None:
+        return None
+    if container.checkbox(f"Use loaded {name}: {entry.source}", value=True, key=key or f"use_loaded_{name}"):
+        return entry
+    return None
+
+
+def upload_or_loaded(name: str, upload, container=st, key: Optional[str] = None):
+    """
+    ``upload`` when there is one (it becomes the session's ``name``), else the registered
+    upload of ``name`` if the user keeps "Use loaded ..." ticked, else None.
+    """
+    if upload is not None:
+        register_upload(name, upload)
+        return upload
+    entry = use_loaded(name, container, key)
+    return entry.upload if entry is not None else None
+
+
+def upload_or_saved(name: str, upload, container=st, key: Optional[str] = None):
+    """upload_or_loaded(), with the user's last upload of ``name`` loaded again after a refresh / login."""
+    if upload is None and loaded(name) is None:
+        saved = saved_uploads(name)
+        if saved:
+            register_upload(name, saved[0])
+    upload = upload_or_loaded(name, upload, container, key)
+    if upload is not None:
+        keep_uploads(name, [upload])
+    return upload
+
+
+def forget_datasets() -> None:
+    """Drop the session's datasets (on logout)."""
+    st.session_state.pop(DATASETS_KEY, None)
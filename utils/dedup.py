@@ -0,0 +1,83 @@
+"""
+Duplicate files and overlapping rows of multi-file uploads.
+
+Sellers upload the same export twice, or weekly exports that overlap by a
+few days, and the pages used to concatenate everything and count the shared
+orders twice.
+
+``distinct_uploads(files)`` drops files whose bytes equal an earlier file's
+before anything is parsed. ``drop_overlapping_rows(frames)`` then drops the
+rows of a file whose natural key (the NATURAL_KEYS columns every frame has,
+e.g. Sub Order No + AWB Number) already appeared in an earlier file: keys are
+hashed per row with pd.util.hash_pandas_object and looked up with np.isin.
+Rows repeated inside one file are left alone (a payment sheet can list a sub
+order more than once), and so are rows with no key at all.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import upload_digest
+
+NATURAL_KEYS = ("Sub Order No", "AWB Number", "Packet Id")
+
+
+def distinct_uploads(uploads) -> Tuple[list, List[str]]:
+    """(uploads without exact duplicates of an earlier one, names of the ones dropped)."""
+    seen, kept, dropped = set(), [], []
+    for f in uploads:
+        digest = upload_digest(f)
+        if digest in seen:
+            dropped.append(getattr(f, "name", ""))
+            continue
+        seen.add(digest)
+        kept.append(f)
+    return kept, dropped
+
+
+def _key_text(col: pd.Series) -> pd.Series:
+    # 1.2345e14 read as float in one file and "123450000000000" as text in another are the same key
+    if pd.api.types.is_float_dtype(col):
+        whole = col.dropna()
+        if (whole == whole.round()).all():
+            col = col.astype("Int64")
+    return col.astype("str").str.strip().fillna("")
+
+
+def row_keys(df: pd.DataFrame, keys: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(uint64 hash of each row's ``keys`` cells, True where all of them are blank)."""
+    text = pd.DataFrame({k: _key_text(df[k]) for k in keys})
+    blank = (text == "").all(axis=1).to_numpy()
+    return pd.util.hash_pandas_object(text, index=False).to_numpy(), blank
+
+
+def drop_overlapping_rows(frames: list, keys: Sequence[str] = NATURAL_KEYS) -> Tuple[list, int, List[str]]:
+    """
+    (``frames`` without the rows whose key is in an earlier frame, rows dropped, key columns used).
+    Nothing is dropped when the frames share none of ``keys``.
+    """
+    used = [k for k in keys if frames and all(k in f.columns for f in frames)]
+    if len(frames) < 2 or not used:
+        return frames, 0, used
+    out, dropped, seen = [], 0, np.empty(0, dtype=np.uint64)
+    for df in frames:
+        hashes, blank = row_keys(df, used)
+        repeat = np.isin(hashes, seen) & ~blank
+        if repeat.any():
+            dropped += int(repeat.sum())
+            df = df.loc[~repeat]
+        out.append(df)
+        seen = np.union1d(seen, hashes[~blank])
+    return out, dropped, used
+
+
+def summary(files: List[str], rows: int, keys: Sequence[str]) -> Optional[str]:
+    """One line on what was dropped, None when nothing was."""
+    parts = []
+    if files:
+        parts.append(f"{len(files)} duplicate file(s) skipped ({', '.join(files)})")
+    if rows:
+        parts.append(f"{rows:,} row(s) already in an earlier file dropped (same {' + '.join(keys)})")
+    return "; ".join(parts) + "." if parts else None
@@ -0,0 +1,111 @@
+"""
+Excel reading backend shared by the pages and the ZIP merge.
+
+pandas' default openpyxl engine builds a Python cell object for every cell,
+which is most of a page's latency on a 100k-row "Order Payments" sheet.
+The Rust calamine engine (python-calamine) gives the same frames about 10x
+faster, so it is used whenever it is installed. The ``EXCEL_ENGINE`` env
+var ("calamine" / "openpyxl") forces one.
+
+Sheet names come from ``xl/workbook.xml`` without loading any sheet.
+``sheet_rows`` gives the first raw rows of a sheet (blank rows included, as
+``skiprows`` counts them) for header detection (utils.schemas).
+"""
+
+import os
+import zipfile
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional
+from xml.etree import ElementTree
+
+import pandas as pd
+from pandas.errors import EmptyDataError
+
+
+@lru_cache(maxsize=1)
+def _calamine_available() -> bool:
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def excel_engine() -> str:
+    """The pd.read_excel engine to use for .xlsx files."""
+    forced = os.environ.get("EXCEL_ENGINE", "").strip().lower()
+    if forced:
+        return forced
+    return "calamine" if _calamine_available() else "openpyxl"
+
+
+def _source(src):
+    return BytesIO(src) if isinstance(src, (bytes, bytearray)) else src
+
+
+def _head(src) -> bytes:
+    if isinstance(src, (bytes, bytearray)):
+        return bytes(src[:8])
+    if isinstance(src, (str, os.PathLike)):
+        with open(src, "rb") as f:
+            return f.read(8)
+    pos = src.tell()
+    head = src.read(8)
+    src.seek(pos)
+    return head
+
+
+def _engine_for(src):
+    """excel_engine(), or None (pandas' choice, xlrd) for a legacy .xls that openpyxl cannot read."""
+    engine = excel_engine()
+    if engine == "calamine":
+        return engine
+    # BIFF workbooks are OLE2 files, not zips
+    return None if _head(src).startswith(b"\xd0\xcf\x11\xe0") else engine
+
+
+def sheet_names(src) -> List[str]:
+    """Sheet names of a workbook (bytes, path or file object), in workbook order."""
+    try:
+        with zipfile.ZipFile(_source(src)) as zf:
+            root = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        names = [el.get("name") for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "sheet"]
+        if names:
+            return names
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        pass  # .xls or an unusual layout: let pandas find out
+    if hasattr(src, "seek"):
+        src.seek(0)
+    with pd.ExcelFile(_source(src), engine=_engine_for(src)) as xls:
+        return list(xls.sheet_names)
+
+
+def read_sheet(src, sheet_name=0, **opts) -> pd.DataFrame:
+    """pd.read_excel(src, sheet_name, **opts) with the fast engine. ``usecols`` / ``nrows`` limit the load."""
+    opts.setdefault("engine", _engine_for(src))
+    return pd.read_excel(_source(src), sheet_name=sheet_name, **opts)
+
+
+def sheet_rows(src, sheet_name=0, rows: Optional[int] = None) -> List[list]:
+    """The first ``rows`` rows of a sheet as cell lists, blank rows included (empty cells are "")."""
+    # calamine parses the whole sheet before giving any row; openpyxl's read-only mode streams
+    engine = "openpyxl" if rows is not None and _head(src).startswith(b"PK") else _engine_for(src)
+    try:
+        # raw cells: no header, no type inference, no NA conversion ("" stays "")
+        grid = pd.read_excel(_source(src), sheet_name=sheet_name, engine=engine, header=None, nrows=rows,
+                             dtype=object, na_filter=False)
+    except EmptyDataError:
+        return []
+    return grid.to_numpy(dtype=object).tolist()
+
+
+def read_sheets(src, sheets: Iterable[str], **opts) -> Dict[str, pd.DataFrame]:
+    """The listed sheets that exist in the workbook, opened once: {sheet: DataFrame}."""
+    engine = opts.pop("engine", None) or _engine_for(src)
+    out = {}
+    with pd.ExcelFile(_source(src), engine=engine) as xls:
+        for sheet in sheets:
+            if sheet in xls.sheet_names:
+                out[sheet] = xls.parse(sheet_name=sheet, **opts)
+    return out
@@ -0,0 +1,89 @@
+"""
+Precomputed filter index of a loaded frame (the P&L sidebar).
+
+The P&L page used to start each rerun from ``orders_df.copy()`` and narrow it
+filter by filter, running ``astype(str)`` / ``str.upper()`` on the status,
+SKU, source and catalog columns again on every click. A ``FilterIndex`` is
+built once per upload instead:
+
+    add_values(name, values)   the column as the page compares it (str-ified,
+                               upper-cased ...), factorized into int codes
+    add_dates(name, values)    datetime64 column, row order sorted by date
+
+and each filter then costs one pass over int codes or one searchsorted:
+
+    isin(name, selected)       bool mask: a lookup table over the codes
+    isna(name)                 bool mask of missing values
+    between(name, lo, hi)      bool mask of lo <= date <= hi (NaT excluded)
+
+``all_of(masks)`` intersects them, and the page indexes the frame once. Masks
+are positional: the frame must have the rows, in the order, the index was
+built on. A lookup table stands in for one stored mask per distinct value,
+which would cost rows x distinct SKUs bytes.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    def __init__(self, rows: int):
+        self.rows = rows
+        self._codes: Dict[str, np.ndarray] = {}
+        self._uniques: Dict[str, pd.Index] = {}
+        self._na: Dict[str, np.ndarray] = {}
+        self._order: Dict[str, np.ndarray] = {}
+        self._sorted: Dict[str, np.ndarray] = {}
+
+    def add_values(self, name: str, values: pd.Series, na: Optional[pd.Series] = None) -> None:
+        """Index ``values`` (``na``: the rows isna() selects, by default values.isna())."""
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        self._codes[name] = codes
+        self._uniques[name] = pd.Index(uniques)
+        self._na[name] = (values.isna() if na is None else na).to_numpy(dtype=bool)
+
+    def add_dates(self, name: str, values: pd.Series) -> None:
+        stamps = values.to_numpy()
+        order = np.argsort(stamps, kind="stable")  # NaT sorts last
+        self._order[name] = order
+        self._sorted[name] = stamps[order]
+
+    def values(self, name: str) -> list:
+        """Distinct values of ``name`` (missing ones left out), in first-seen order."""
+        return self._uniques[name].tolist()
+
+    def isin(self, name: str, selected: Iterable) -> np.ndarray:
+        """values.isin(selected), missing values included when ``selected`` has NaN / None."""
+        selected = list(selected)
+        uniques = self._uniques[name]
+        # last slot: the -1 code of missing values
+        allowed = np.zeros(len(uniques) + 1, dtype=bool)
+        positions = uniques.get_indexer(selected)
+        allowed[positions[positions >= 0]] = True
+        allowed[-1] = any(pd.isna(v) for v in selected)
+        return allowed[self._codes[name]]
+
+    def isna(self, name: str) -> np.ndarray:
+        return self._na[name]
+
+    def between(self, name: str, lo, hi) -> np.ndarray:
+        stamps = self._sorted[name]
+        lo = np.datetime64(pd.Timestamp(lo)).astype(stamps.dtype)
+        hi = np.datetime64(pd.Timestamp(hi)).astype(stamps.dtype)
+        start = np.searchsorted(stamps, lo, side="left")
+        stop = np.searchsorted(stamps, hi, side="right")
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[self._order[name][start:stop]] = True
+        return mask
+
+
+def all_of(masks: List[np.ndarray]) -> Optional[np.ndarray]:
+    """The intersection of ``masks``, None when there are none (no filter set)."""
+    if not masks:
+        return None
+    out = masks[0].copy()
+    for m in masks[1:]:
+        out &= m
+    return out
@@ -0,0 +1,162 @@
+"""
+Parquet read/write for the DataFrames the pages produce.
+
+Meesho sheets read with ``header=None`` and cleaned by ``coerce_numeric_df``
+end up with object columns that mix strings, ints, floats and dates, which
+Arrow refuses to store as one column. Such columns are split into one typed
+physical column per value kind ("slots") and stitched back on read, so a
+frame round-trips with the same cell values and Python types.
+
+Column labels are kept in the file metadata, so int labels (header=None),
+duplicate labels and a non-default index survive as well.
+"""
+
+import json
+from datetime import date, datetime
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+_META_KEY = b"frame_io"
+
+# slot name -> arrow type of the physical column holding that kind of value
+_SLOTS = {
+    "b": pa.bool_(),
+    "i": pa.int64(),
+    "f": pa.float64(),
+    "t": pa.timestamp("ns"),
+    "d": pa.date32(),
+    "s": pa.string(),
+}
+
+
+def _label_to_json(label):
+    if isinstance(label, (bool, np.bool_)):
+        return ["s", str(label)]
+    if isinstance(label, (int, np.integer)):
+        return ["i", int(label)]
+    if isinstance(label, (float, np.floating)):
+        return ["f", float(label)]
+    return ["s", str(label)]
+
+
+def _label_from_json(item):
+    kind, value = item
+    return value if kind != "s" else str(value)
+
+
+def _slot_of(v) -> Optional[str]:
+    if v is None or v is pd.NaT:
+        return None
+    if isinstance(v, (bool, np.bool_)):
+        return "b"
+    if isinstance(v, (int, np.integer)):
+        return "i" if -(2 ** 63) <= int(v) < 2 ** 63 else "s"
+    if isinstance(v, (float, np.floating)):
+        return None if np.isnan(v) else "f"
+    if isinstance(v, (pd.Timestamp, datetime, np.datetime64)):
+        return "t" if getattr(v, "tzinfo", None) is None else "s"
+    if isinstance(v, date):
+        return "d"
+    return "s"
+
+
+def _split_mixed(values: np.ndarray, strict: bool = False) -> dict:
+    """Split an object array into typed slot arrays (nulls elsewhere)."""
+    n = len(values)
+    buckets = {}
+    for pos, v in enumerate(values):
+        slot = _slot_of(v)
+        if slot is None:
+            continue
+        if slot not in buckets:
+            buckets[slot] = [None] * n
+        if slot == "s" and strict and not isinstance(v, str):
+            raise TypeError(f"{type(v).__name__} value would be stored as text")
+        buckets[slot][pos] = str(v) if slot == "s" else v
+    return {slot: pa.array(vals, type=_SLOTS[slot], from_pandas=True) for slot, vals in buckets.items()}
+
+
+def _encode_series(s: pd.Series, phys: str, arrays: List, names: List, strict: bool = False) -> List[str]:
+    try:
+        arr = pa.Array.from_pandas(s)
+        # object ints with gaps would come back as float64, keep them exact via slots
+        if not (s.dtype == object and pa.types.is_integer(arr.type) and arr.null_count):
+            arrays.append(arr)
+            names.append(phys)
+            return []
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        pass
+    slots = _split_mixed(s.to_numpy(dtype=object), strict)
+    for slot, arr in slots.items():
+        arrays.append(arr)
+        names.append(f"{phys}.{slot}")
+    return sorted(slots)
+
+
+def _decode_series(table: pa.Table, phys: str, slots: List[str], name) -> pd.Series:
+    if not slots:
+        return table.column(phys).to_pandas().rename(name)
+    out = np.full(table.num_rows, np.nan, dtype=object)
+    for slot in slots:
+        col = table.column(f"{phys}.{slot}")
+        valid = col.is_valid().to_numpy(zero_copy_only=False)
+        if slot == "t":
+            vals = col.to_pandas().to_numpy(dtype=object)
+        else:
+            vals = np.array(col.to_pylist(), dtype=object)
+        out[valid] = vals[valid]
+    return pd.Series(out, name=name)
+
+
+def write_frame(df: pd.DataFrame, path: str, strict: bool = False) -> None:
+    """
+    Write ``df`` to a Parquet file at ``path``.
+    Values of no supported kind are stored as their text; ``strict=True`` raises TypeError instead.
+    """
+    arrays, names, cols_meta = [], [], []
+    for pos in range(df.shape[1]):
+        phys = f"c{pos}"
+        slots = _encode_series(df.iloc[:, pos], phys, arrays, names, strict)
+        cols_meta.append({"label": _label_to_json(df.columns[pos]), "phys": phys, "slots": slots})
+
+    index_meta = None
+    if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1):
+        slots = _encode_series(pd.Series(df.index, copy=False), "idx", arrays, names, strict)
+        index_meta = {"name": None if df.index.name is None else str(df.index.name), "slots": slots}
+
+    meta = {"columns": cols_meta, "index": index_meta, "rows": int(len(df))}
+    schema = pa.schema([pa.field(n, a.type) for n, a in zip(names, arrays)], metadata={_META_KEY: json.dumps(meta)})
+    table = pa.Table.from_arrays(arrays, schema=schema) if arrays else pa.table({}, schema=schema)
+    pq.write_table(table, path, compression="zstd")
+
+
+def read_meta(path: str) -> dict:
+    return json.loads(pq.read_schema(path, memory_map=True).metadata[_META_KEY])
+
+
+def read_frame(path: str, columns: Optional[List] = None) -> pd.DataFrame:
+    """Read a frame written by ``write_frame``; ``columns`` limits which labels are loaded."""
+    meta = read_meta(path)
+    cols_meta = meta["columns"]
+    if columns is not None:
+        wanted = set(map(str, columns))
+        cols_meta = [c for c in cols_meta if str(_label_from_json(c["label"])) in wanted]
+
+    phys_names = []
+    for c in cols_meta:
+        phys_names += [c["phys"]] if not c["slots"] else [f"{c['phys']}.{s}" for s in c["slots"]]
+    index_meta = meta.get("index")
+    if index_meta:
+        phys_names += ["idx"] if not index_meta["slots"] else [f"idx.{s}" for s in index_meta["slots"]]
+
+    table = pq.read_table(path, columns=phys_names, memory_map=True)
+    data = [_decode_series(table, c["phys"], c["slots"], None) for c in cols_meta]
+    df = pd.concat(data, axis=1, ignore_index=True) if data else pd.DataFrame(index=range(meta["rows"]))
+    df.columns = pd.Index([_label_from_json(c["label"]) for c in cols_meta])
+    if index_meta:
+        df.index = pd.Index(_decode_series(table, "idx", index_meta["slots"], None), name=index_meta["name"])
+    return df
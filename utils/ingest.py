@@ -0,0 +1,147 @@
+"""
+Reading uploaded Excel / CSV files for the pages, through the parse cache.
+
+``read_upload(f, ...)`` takes the same keyword options as ``pd.read_excel`` /
+``pd.read_csv`` and returns what they would, but a file already parsed with
+the same options (by anyone, before a restart too) is loaded from
+utils.parse_cache instead of being parsed again. A .meesho bundle
+(utils.bundle) is answered from its Parquet tables, as its .xlsx would be.
+``read_csv_columns(f, dtypes)`` is the typed, column-pruned CSV read of
+utils.csv_stream, cached the same way. ``upload_digest(f)`` hashes an
+uploaded file once per session, not on every rerun. ``expand_zips(files)`` replaces each
+uploaded .zip by its report members, decompressed in memory, so the
+multi-file pages take Meesho's zipped exports as they come.
+"""
+
+import os
+import zipfile
+from io import BytesIO
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from utils.bundle import bundle_sheet_names, is_bundle, read_bundle_sheet
+from utils.csv_stream import read_csv_typed
+from utils.excel_reader import excel_engine, read_sheet, sheet_names
+from utils.parallel import default_workers, run_ordered
+from utils.parse_cache import cached_frame, content_digest
+
+_DIGESTS = "_upload_digests"  # session: (file_id, size) -> content digest of the upload
+
+
+def upload_bytes(upload) -> bytes:
+    """The full content of an UploadedFile / file-like / path / bytes, whatever its read position."""
+    if isinstance(upload, (bytes, bytearray)):
+        return bytes(upload)
+    if isinstance(upload, (str, os.PathLike)):
+        with open(upload, "rb") as f:
+            return f.read()
+    if hasattr(upload, "getvalue"):
+        return upload.getvalue()
+    upload.seek(0)
+    return upload.read()
+
+
+def upload_kind(upload) -> str:
+    """"csv" or "excel", from the file name."""
+    name = getattr(upload, "name", upload if isinstance(upload, str) else "")
+    return "csv" if str(name).lower().endswith(".csv") else "excel"
+
+
+class ZipMember:
+    """A report file inside an uploaded .zip, read like an UploadedFile."""
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.size = len(data)
+        self._data = data
+
+    def getvalue(self) -> bytes:
+        return self._data
+
+
+def expand_zips(uploads, suffixes=(".csv", ".xlsx", ".xls", ".meesho")) -> list:
+    """
+    ``uploads`` with every .zip replaced by its members ending in ``suffixes``, in name order.
+    Members are decompressed straight into memory; a .zip that cannot be opened is kept
+    as it is, so the page's reader reports it like any other unreadable file.
+    """
+    out = []
+    for f in uploads:
+        name = getattr(f, "name", "")
+        if not str(name).lower().endswith(".zip"):
+            out.append(f)
+            continue
+        try:
+            with zipfile.ZipFile(BytesIO(upload_bytes(f))) as zf:
+                infos = [i for i in zf.infolist()
+                         if not i.is_dir() and i.filename.lower().endswith(suffixes)
+                         and not os.path.basename(i.filename).startswith(("~$", "."))
+                         and not i.filename.startswith("__MACOSX/")]
+                for info in sorted(infos, key=lambda i: i.filename):
+                    out.append(ZipMember(os.path.basename(info.filename), zf.read(info)))
+        except zipfile.BadZipFile:
+            out.append(f)
+    return out
+
+
+def parse_upload(data: bytes, kind: str, **opts) -> pd.DataFrame:
+    """read_upload() without the cache."""
+    if kind == "csv":
+        return pd.read_csv(BytesIO(data), **opts)
+    if is_bundle(data):
+        return read_bundle_sheet(data, **opts)
+    return read_sheet(data, **opts)
+
+
+def upload_digest(upload) -> str:
+    """
+    content_digest() of the upload. A Streamlit UploadedFile is hashed once per session
+    (by file_id + size), not again on every rerun; anything else is hashed each call.
+    """
+    file_id = getattr(upload, "file_id", None)
+    if file_id is None:
+        return content_digest(upload_bytes(upload))
+    import streamlit as st  # only UploadedFiles have a file_id; pool workers never get here
+
+    digests = st.session_state.setdefault(_DIGESTS, {})
+    key = (file_id, getattr(upload, "size", None))
+    if key not in digests:
+        digests[key] = content_digest(upload_bytes(upload))
+    return digests[key]
+
+
+def read_upload(upload, kind: Optional[str] = None, **opts) -> pd.DataFrame:
+    """pd.read_excel / pd.read_csv(upload, **opts), cached by content + options (Excel through utils.excel_reader)."""
+    kind = kind or upload_kind(upload)
+    data = upload_bytes(upload)
+    digest = upload_digest(upload)
+    if kind == "csv":
+        return cached_frame(data, lambda: parse_upload(data, kind, **opts), digest, kind=kind, **opts)
+    if is_bundle(data):
+        # already typed and compressed: reading it is as fast as a cache hit
+        return read_bundle_sheet(data, **opts)
+    key_opts = {"engine": excel_engine(), **opts}
+    return cached_frame(data, lambda: parse_upload(data, kind, **opts), digest, kind=kind, **key_opts)
+
+
+def read_csv_columns(upload, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """utils.csv_stream.read_csv_typed(upload, dtypes), cached by content + dtypes."""
+    data = upload_bytes(upload)
+    return cached_frame(data, lambda: read_csv_typed(data, dtypes), upload_digest(upload), kind="csv-typed",
+                        dtypes=dtypes)
+
+
+def excel_sheet_names(upload) -> List[str]:
+    data = upload_bytes(upload)
+    return bundle_sheet_names(data) if is_bundle(data) else sheet_names(data)
+
+
+def read_uploads(uploads, reader: Callable, *args, workers: Optional[int] = None) -> list:
+    """
+    ``reader(name, bytes, position, *args)`` for every upload, on the process pool
+    (utils.parallel), results in upload order. A file that fails gives its exception
+    in its place. ``reader`` is one of utils.upload_readers (workers import it by name).
+    """
+    jobs = [(getattr(f, "name", ""), upload_bytes(f), pos, *args) for pos, f in enumerate(uploads)]
+    return run_ordered(reader, jobs, default_workers() if workers is None else workers)
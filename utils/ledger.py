@@ -0,0 +1,176 @@
+"""
+Per-supplier payment ledger for the ZIP merge page.
+
+Every payment workbook ever merged for a supplier is kept, cleaned, under the
+user's workspace:
+
+    <workspace>/ledgers/<supplier id>/
+        manifest.json                 {file name: {"fingerprint", "sheets": {sheet: columns}}}
+        <n>.<sheet idx>.head.parquet  first 3 rows of the sheet (cleaned)
+        <n>.<sheet idx>.body.parquet  the data rows (cleaned)
+
+A weekly upload only parses files whose fingerprint is not in the manifest
+yet; the merged workbook is then written from the ledger in one pass. Rows
+an earlier file already wrote are dropped from every sheet: Order Payments
+rows by Sub Order No + Payment Date, found on each file's own header row
+(whole rows when a file's header lacks them), the other sheets by whole
+rows.
+"""
+
+import json
+import os
+import shutil
+import threading
+import zipfile
+from typing import Dict, List, Optional
+
+from utils.frame_io import read_frame, write_frame
+from utils.zip_clean import WANTED_SHEETS, read_wanted_sheet_parts, write_spooled_workbook
+
+# header cells that identify a row of a merged sheet (matched case-insensitively); sheets
+# not listed here are de-duplicated on whole rows
+KEY_HEADERS = {"Order Payments": ["sub order no", "payment date"]}
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def member_fingerprint(info: zipfile.ZipInfo) -> str:
+    """Identity of a ZIP member without decompressing it: CRC-32 + size of the content."""
+    return f"{info.CRC:08x}-{info.file_size}"
+
+
+def parse_ledger_file(path: str, out_dir: str, tag: str) -> dict:
+    """
+    Clean one workbook into ``out_dir`` as ``<tag>.<sheet idx>.head/body.parquet``.
+    Returns {sheet: number of columns}. Runs in pool workers (utils.parallel).
+    """
+    sheets = {}
+    for sheet, (head, body) in read_wanted_sheet_parts(path).items():
+        stem = os.path.join(out_dir, f"{tag}.{WANTED_SHEETS.index(sheet)}")
+        write_frame(head, stem + ".head.parquet")
+        write_frame(body, stem + ".body.parquet")
+        sheets[sheet] = max(head.shape[1], body.shape[1])
+    return sheets
+
+
+class PaymentLedger:
+    def __init__(self, root: str, supplier: str):
+        self.supplier = supplier
+        self.dir = os.path.join(root, "ledgers", supplier)
+        os.makedirs(self.dir, exist_ok=True)
+        self._manifest_path = os.path.join(self.dir, "manifest.json")
+        with _locks_guard:
+            self.lock = _locks.setdefault(self.dir, threading.Lock())
+
+    # ---------- manifest ----------
+    def manifest(self) -> dict:
+        try:
+            with open(self._manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"files": {}, "next_id": 0}
+
+    def _save_manifest(self, manifest: dict) -> None:
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path)
+
+    def files(self) -> List[str]:
+        return sorted(self.manifest()["files"])
+
+    def is_new(self, fname: str, fp: str) -> bool:
+        entry = self.manifest()["files"].get(fname)
+        return entry is None or entry["fingerprint"] != fp
+
+    # ---------- updates ----------
+    def staging_dir(self) -> str:
+        path = os.path.join(self.dir, "staging")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def commit(self, fname: str, fp: str, staged_tag: str, sheets: dict) -> None:
+        """Move a file parsed by ``parse_ledger_file(..., staging_dir(), staged_tag)`` into the ledger."""
+        with self.lock:
+            manifest = self.manifest()
+            old = manifest["files"].get(fname)
+            file_id = manifest.get("next_id", 0)
+            manifest["next_id"] = file_id + 1
+            for sheet in sheets:
+                stem = f"{WANTED_SHEETS.index(sheet)}"
+                for kind in ("head", "body"):
+                    os.replace(os.path.join(self.staging_dir(), f"{staged_tag}.{stem}.{kind}.parquet"),
+                               os.path.join(self.dir, f"{file_id}.{stem}.{kind}.parquet"))
+            manifest["files"][fname] = {"fingerprint": fp, "id": file_id, "sheets": sheets}
+            self._save_manifest(manifest)
+            if old is not None:
+                self._remove_parts(old)
+
+    def _remove_parts(self, entry: dict) -> None:
+        for sheet in entry["sheets"]:
+            for kind in ("head", "body"):
+                path = os.path.join(self.dir, f"{entry['id']}.{WANTED_SHEETS.index(sheet)}.{kind}.parquet")
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def reset(self) -> None:
+        with self.lock:
+            shutil.rmtree(self.dir, ignore_errors=True)
+            os.makedirs(self.dir, exist_ok=True)
+
+    # ---------- output ----------
+    def _part(self, entry: dict, sheet: str, kind: str) -> str:
+        return os.path.join(self.dir, f"{entry['id']}.{WANTED_SHEETS.index(sheet)}.{kind}.parquet")
+
+    def _key_columns(self, head_path: str, sheet: str) -> Optional[List[int]]:
+        """Positions of the sheet's KEY_HEADERS on this file's header row (None: key on the whole row)."""
+        headers = KEY_HEADERS.get(sheet)
+        if not headers or not os.path.exists(head_path):
+            return None
+        head = read_frame(head_path)
+        for row in head.itertuples(index=False, name=None):
+            cells = [str(v).strip().lower() for v in row]
+            if all(h in cells for h in headers):
+                return [cells.index(h) for h in headers]
+        return None
+
+    def build_workbook(self):
+        """
+        The merged workbook of every file in the ledger (BytesIO), same layout as a fresh merge
+        of all of them: the first file (by name) keeps its header rows, later files add data rows.
+        """
+        with self.lock:
+            files = self.manifest()["files"]
+            names = sorted(files)
+            parts = {sheet: [] for sheet in WANTED_SHEETS}
+            keys = {}
+            for i, fname in enumerate(names):
+                entry = files[fname]
+                for sheet in WANTED_SHEETS:
+                    if sheet not in entry["sheets"]:
+                        continue
+                    width = entry["sheets"][sheet]
+                    head, body = self._part(entry, sheet, "head"), self._part(entry, sheet, "body")
+                    if i == 0:
+                        parts[sheet].append((head, width))
+                    parts[sheet].append((body, width))
+                    keys[body] = self._key_columns(head, sheet)
+            return write_spooled_workbook(parts, keys)
+
+    def stats(self) -> dict:
+        files = self.manifest()["files"]
+        return {"supplier": self.supplier, "files": len(files),
+                "first": min(files) if files else "", "last": max(files) if files else ""}
+
+
+def build_ledger_workbook(root: str, supplier: str) -> bytes:
+    """Process-pool entry for PaymentLedger.build_workbook()."""
+    return PaymentLedger(root, supplier).build_workbook().getvalue()
+
+
+def list_ledgers(root: str) -> List[str]:
+    base = os.path.join(root, "ledgers")
+    if not os.path.isdir(base):
+        return []
+    return sorted(d for d in os.listdir(base) if os.path.isfile(os.path.join(base, d, "manifest.json")))
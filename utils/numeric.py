@@ -0,0 +1,100 @@
+"""
+Parsing of Meesho amount cells ("₹1,234.50", "(120)", "−45", " 1 200 ").
+
+A column is factorized once and only its distinct texts are normalized and
+parsed; the numbers are then broadcast back to the cells by code.
+Payment sheets repeat the same few thousand amounts over 100k+ rows, so
+this is a fraction of running the regex passes over every cell.
+
+Normalization (same as the original ``coerce_col`` of the ZIP merge page):
+"(x)" -> "-x", Unicode minus / en dash -> "-", drop "₹" and ",", drop all
+whitespace, then ``pd.to_numeric``.
+"""
+
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+_PARENS = re.compile(r"^\((.*)\)$")
+_SPACE = re.compile(r"\s+")
+_DROP = str.maketrans({"−": "-", "–": "-", "₹": None, ",": None})
+
+
+def _normalize(text: str) -> str:
+    return _SPACE.sub("", _PARENS.sub(r"-\1", text).translate(_DROP))
+
+
+def _kind(v) -> int:
+    if isinstance(v, (bool, np.bool_)):
+        return 2
+    return 1 if isinstance(v, (float, np.floating)) else 0
+
+
+def _parse_texts(values: np.ndarray):
+    """
+    ``values``: object array of non-missing cells. Returns (numbers of the distinct
+    cells, code of every cell); the numbers are what pd.to_numeric gives on str(cell).
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = np.asarray(uniques, dtype=object)
+    if pd.api.types.infer_dtype(uniques, skipna=False) != "string":
+        # 1, 1.0 and True are equal, so they share a code, but their texts ("1", "1.0",
+        # "True") parse differently: split the non-text codes by value kind
+        non_text = np.fromiter((type(u) is not str for u in uniques), dtype=bool, count=len(uniques))
+        cells = np.flatnonzero(non_text[codes])
+        kinds = np.fromiter((_kind(v) for v in values[cells]), dtype=np.int64, count=len(cells))
+        key_codes, _ = pd.factorize(codes[cells].astype(np.int64) * 3 + kinds)
+        _, first = np.unique(key_codes, return_index=True)
+        codes[cells] = len(uniques) + key_codes
+        uniques = np.concatenate([uniques, values[cells[first]]])
+    normalized = pd.Series([_normalize(str(u)) for u in uniques], dtype=object)
+    nums = pd.to_numeric(normalized, errors="coerce").to_numpy()
+    return nums, codes
+
+
+def coerce_amount_cells(col: pd.Series) -> pd.Series:
+    """
+    Replace every cell that parses as an amount by its number and leave the
+    other cells as they are (header text, dates, ...). Numeric columns are
+    returned unchanged. This is ``coerce_col`` of the ZIP merge page.
+    """
+    if pd.api.types.is_numeric_dtype(col):
+        return col
+    # object, so a text ("str") column can take numbers
+    values = col.to_numpy(dtype=object)
+    present = np.flatnonzero(pd.notna(values))
+    if not len(present):
+        return col.copy()
+    nums, codes = _parse_texts(values[present])
+    cell_nums = nums[codes]
+    ok = pd.notna(cell_nums)
+    if not ok.any():
+        return col.copy()
+    out = values.copy()
+    out[present[ok]] = cell_nums[ok]
+    return pd.Series(out, index=col.index, name=col.name, dtype=object)
+
+
+def parse_amounts(s: pd.Series) -> pd.Series:
+    """Numbers for every cell that parses as an amount, NaN for the rest."""
+    if pd.api.types.is_numeric_dtype(s):
+        return pd.to_numeric(s, errors="coerce")
+    values = s.to_numpy(dtype=object)
+    present = np.flatnonzero(pd.notna(values))
+    if len(present) == len(values) and len(values):
+        nums, codes = _parse_texts(values)
+        # every cell parsed: keep pd.to_numeric's dtype (int64 for whole numbers)
+        return pd.Series(nums[codes], index=s.index, name=s.name)
+    out = np.full(len(values), np.nan)
+    if len(present):
+        nums, codes = _parse_texts(values[present])
+        out[present] = nums[codes].astype(float)
+    return pd.Series(out, index=s.index, name=s.name)
+
+
+def to_amount(s: pd.Series, fill: Optional[float] = 0) -> pd.Series:
+    """parse_amounts() with unparsable / missing cells set to ``fill`` (None keeps NaN)."""
+    out = parse_amounts(s)
+    return out if fill is None else out.fillna(fill)
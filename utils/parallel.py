@@ -0,0 +1,122 @@
+"""
+Worker processes for the CPU-bound parts of the pages (openpyxl parsing, cleaning).
+
+Workers are fresh interpreters running ``python -m utils.parallel_worker``
+(not multiprocessing children: spawn would run the Streamlit page that is
+``__main__`` again in every worker, and forking a server that already runs
+threads is not safe). One pool per worker count is kept for the life of the
+server process, so each worker pays the pandas import once.
+"""
+
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from utils.parallel_worker import recv_message, send_message
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_pools: Dict[int, "WorkerPool"] = {}
+_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    """``PARALLEL_WORKERS`` if set, else the CPU count (capped at 8)."""
+    env = os.environ.get("PARALLEL_WORKERS", "").strip()
+    if env.isdigit() and int(env) > 0:
+        return int(env)
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+class _Worker:
+    """One worker process, running one job at a time."""
+
+    def __init__(self):
+        # the worker keeps the server's working directory; utils is found through PYTHONPATH
+        path = os.pathsep.join(p for p in (_ROOT, os.environ.get("PYTHONPATH")) if p)
+        self.proc = subprocess.Popen([sys.executable, "-m", "utils.parallel_worker"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     env={**os.environ, "PYTHONPATH": path})
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def call(self, fn: Callable, args: tuple):
+        job = pickle.dumps((fn, args), protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            send_message(self.proc.stdin, job)
+            reply = recv_message(self.proc.stdout)
+        except OSError:
+            reply = None
+        if reply is None:
+            # killed mid-job (e.g. for memory): the next job gets a fresh worker
+            self.proc.kill()
+            raise ChildProcessError(f"worker process exited with code {self.proc.wait()} during {fn.__name__}")
+        try:
+            ok, value = pickle.loads(reply)
+        except Exception as e:
+            raise RuntimeError(f"could not read the result of {fn.__name__} ({type(e).__name__}: {e})") from None
+        if not ok:
+            raise value
+        return value
+
+
+class WorkerPool:
+    """``workers`` worker processes, started on first use and replaced when one dies."""
+
+    def __init__(self, workers: int):
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(None)  # a slot whose process is not started yet
+
+    def call(self, fn: Callable, args: tuple):
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.alive():
+                worker = _Worker()
+            return worker.call(fn, args)
+        finally:
+            self._idle.put(worker if worker is not None and worker.alive() else None)
+
+
+def worker_pool(workers: int) -> WorkerPool:
+    with _lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = WorkerPool(workers)
+        return pool
+
+
+def run_ordered(fn: Callable, jobs: Sequence[tuple], workers: int) -> List:
+    """
+    ``fn(*job)`` for every job, results in job order. A job that raised gives
+    its exception in place of the result, so one bad file does not sink the batch.
+
+    ``fn`` must be a module-level function (workers import it by name).
+    workers <= 1 (or a single job) runs in the calling thread.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        out = []
+        for job in jobs:
+            try:
+                out.append(fn(*job))
+            except Exception as e:
+                out.append(e)
+        return out
+
+    pool = worker_pool(workers)
+
+    def call(job):
+        try:
+            return pool.call(fn, job)
+        except Exception as e:
+            return e
+
+    # the threads only wait on the workers; each job takes the next free one
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as threads:
+        return list(threads.map(call, jobs))
@@ -0,0 +1,66 @@
+"""
+Entry point of the worker processes of utils.parallel.
+
+    python -m utils.parallel_worker      (started by utils.parallel)
+
+A worker is a fresh interpreter running this module, so it never imports
+the Streamlit page that asked for it. It reads ``(fn, args)`` jobs from
+stdin and answers each with ``(True, result)`` or ``(False, exception)``
+on stdout, until stdin is closed. Every message is a pickle behind an
+8-byte length, so one that cannot be unpickled leaves the stream in step.
+"""
+
+import os
+import pickle
+import sys
+from typing import BinaryIO, Optional
+
+_LEN = 8
+
+
+def send_message(stream: BinaryIO, data: bytes) -> None:
+    stream.write(len(data).to_bytes(_LEN, "little"))
+    stream.write(data)
+    stream.flush()
+
+
+def recv_message(stream: BinaryIO) -> Optional[bytes]:
+    """The next message; None when the other side has gone (or went mid-message)."""
+    head = stream.read(_LEN)
+    if len(head) < _LEN:
+        return None
+    size = int.from_bytes(head, "little")
+    data = stream.read(size)
+    return data if len(data) == size else None
+
+
+def _reply(ok: bool, value) -> bytes:
+    try:
+        data = pickle.dumps((ok, value), protocol=pickle.HIGHEST_PROTOCOL)
+        if not ok:
+            pickle.loads(data)  # exceptions with unusual __init__ signatures do not load back
+        return data
+    except Exception as e:
+        what = "result" if ok else f"{type(value).__name__}: {value}"
+        return pickle.dumps((False, RuntimeError(f"could not send the {what} back ({type(e).__name__}: {e})")))
+
+
+def main() -> None:
+    jobs = sys.stdin.buffer
+    # the replies own the real stdout; whatever the jobs print goes to stderr
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    while True:
+        data = recv_message(jobs)
+        if data is None:
+            return
+        try:
+            fn, args = pickle.loads(data)
+            reply = _reply(True, fn(*args))
+        except Exception as e:
+            reply = _reply(False, e)
+        send_message(replies, reply)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Content-addressed, disk-backed cache of parsed uploads.
+
+Streamlit reruns a page on every widget click, and most pages parse their
+uploads again each time. Here a parsed frame is stored once as Parquet
+(utils.frame_io) under a key made of the file's bytes and the read options,
+so any rerun, any user uploading the same file, or a restart reads it back
+memory-mapped instead of parsing Excel/CSV again.
+
+    PARSE_CACHE_DIR      cache directory (default "parse_cache")
+    PARSE_CACHE_MAX_MB   size cap; least recently used entries go first (default 1024)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Callable, Optional
+
+import pandas as pd
+
+from utils.frame_io import read_frame, write_frame
+
+# bump when the parsing of an entry changes meaning
+CACHE_VERSION = 1
+
+_evict_lock = threading.Lock()
+
+
+def cache_dir() -> str:
+    return os.environ.get("PARSE_CACHE_DIR", "parse_cache")
+
+
+def max_bytes() -> int:
+    try:
+        return int(float(os.environ.get("PARSE_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+    except ValueError:
+        return 1024 * 1024 * 1024
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(digest: str, **opts) -> str:
+    """sha256 of the content digest + read options (+ cache / pandas version)."""
+    h = hashlib.sha256(digest.encode("ascii"))
+    meta = {"v": CACHE_VERSION, "pandas": pd.__version__.split(".")[0], "opts": opts}
+    h.update(json.dumps(meta, sort_keys=True, default=repr).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _path(key: str, ext: str) -> str:
+    return os.path.join(cache_dir(), key[:2], key + ext)
+
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _atomic_write(path: str, writer: Callable[[str], None]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        writer(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def evict(limit: Optional[int] = None) -> None:
+    """Drop least recently used entries until the cache fits in ``limit`` bytes."""
+    limit = max_bytes() if limit is None else limit
+    root = cache_dir()
+    if not os.path.isdir(root):
+        return
+    with _evict_lock:
+        entries = []
+        for sub in os.scandir(root):
+            if not sub.is_dir():
+                continue
+            for f in os.scandir(sub.path):
+                if f.name.endswith(".tmp"):
+                    continue
+                st = f.stat()
+                entries.append((st.st_mtime, st.st_size, f.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+def cached_frame(data: bytes, parse: Callable[[], pd.DataFrame], digest: Optional[str] = None,
+                 **opts) -> pd.DataFrame:
+    """
+    The frame ``parse()`` produces for ``data`` read with ``opts``, from the cache when present.
+    ``digest``: content_digest(data), when the caller has it already. Frames that cannot be
+    stored exactly are returned uncached.
+    """
+    path = _path(cache_key(digest or content_digest(data), **opts), ".parquet")
+    if os.path.exists(path):
+        try:
+            df = read_frame(path)
+            _touch(path)
+            return df
+        except Exception:
+            pass  # half-written / outdated entry: parse again
+    df = parse()
+    try:
+        _atomic_write(path, lambda tmp: write_frame(df, tmp, strict=True))
+        evict()
+    except (TypeError, OSError, ValueError):
+        pass
+    return df
+
@@ -0,0 +1,153 @@
+"""
+The P&L page's counts, amounts and profit table from one grouped pass.
+
+The cards used to upper-case the status column once for value_counts and
+again for every per-status sum, scan claims / recovery separately, and parse
+the listing price twice for the RTO charges. Here:
+
+``prepare_pnl_frame(df, cols)`` parses the settlement amount and adds the
+RTO charge columns the export carries (each amount column parsed once):
+
+    Shipping Charge = Total Sale Amount - Listing Price      (RTO rows only)
+    Shipping GST    = Shipping Charge * 0.18
+    RTO Amount      = Listing Price - Shipping GST
+
+``pnl_metrics(df, cols)`` then groups the typed columns by upper-cased
+status once, giving every status count and settlement sum, the RTO amount,
+and the claims / recovery counts and totals (a NaN cell counts as non-zero,
+as ``!= 0`` did). ``PnlMetrics.profit(product_cost).table()`` is the "True
+Profit Analysis" table shown on the page and written as "Profit Logic".
+``metric_frame`` / ``status_key`` are the summed columns and the grouping
+key, shared with the period rollups of utils/rollups.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.numeric import to_amount
+
+STATUSES = ("DELIVERED", "RETURN", "EXCHANGE", "CANCELLED", "SHIPPED", "RTO")
+
+RTO_GST_RATE = 0.18
+
+
+@dataclass(frozen=True)
+class PnlColumns:
+    status: str
+    settle: Optional[str] = None
+    claims: Optional[str] = None
+    recovery: Optional[str] = None
+    listing_price: Optional[str] = None
+    total_sale: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PnlMetrics:
+    orders: int
+    counts: Dict[str, int]          # rows per upper-cased status (STATUSES)
+    amounts: Dict[str, float]       # settlement sum per status; "RTO": sum of RTO Amount
+    claims_count: int
+    recovery_count: int
+    claims_amount: float
+    recovery_amount: float          # abs() of the recovery total
+
+    @property
+    def shipped_total(self) -> float:
+        a = self.amounts
+        return (a["DELIVERED"] + a["CANCELLED"] + a["SHIPPED"]) - (abs(a["RETURN"]) + abs(a["EXCHANGE"]))
+
+    @property
+    def total_amount(self) -> float:
+        a = self.amounts
+        return (a["DELIVERED"] + a["EXCHANGE"] + a["CANCELLED"]) - abs(a["RETURN"])
+
+    def profit(self, product_cost: float) -> "Profit":
+        ret_loss = abs(self.amounts["RETURN"])
+        c_ret = self.counts["RETURN"]
+        avg_ret_cost = ret_loss / c_ret if c_ret > 0 else 0.0
+        return Profit(self.amounts["DELIVERED"], ret_loss, self.counts["EXCHANGE"] * avg_ret_cost,
+                      self.counts["DELIVERED"] * product_cost)
+
+
+@dataclass(frozen=True)
+class Profit:
+    """Delivered revenue less return loss, estimated exchange charge (at the average return loss) and COGS."""
+    revenue: float
+    return_loss: float
+    exchange_loss: float
+    cogs: float
+
+    @property
+    def deductions(self) -> float:
+        return self.return_loss + self.exchange_loss + self.cogs
+
+    @property
+    def net(self) -> float:
+        return self.revenue - self.deductions
+
+    def table(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Metric": ["Delivered Revenue (+)", "Return Loss (-)", "Est. Exchange Charge (-)",
+                       "Product Cost (COGS) (-)", "FINAL NET PROFIT (=)"],
+            "Amount (₹)": [self.revenue, -self.return_loss, -self.exchange_loss, -self.cogs, self.net],
+        })
+
+
+def prepare_pnl_frame(df: pd.DataFrame, cols: PnlColumns) -> pd.DataFrame:
+    """``df`` (changed in place and returned) with the settlement parsed and the RTO charge columns added."""
+    if cols.settle:
+        df[cols.settle] = to_amount(df[cols.settle])
+    if cols.listing_price and cols.total_sale:
+        rto = (df[cols.status].astype(str).str.upper() == "RTO").to_numpy()
+        listing = to_amount(df[cols.listing_price]).to_numpy(dtype=float)
+        shipping = to_amount(df[cols.total_sale]).to_numpy(dtype=float) - listing
+        gst = shipping * RTO_GST_RATE
+        df["Shipping Charge"] = np.where(rto, shipping, np.nan)
+        df["Shipping GST"] = np.where(rto, gst, np.nan)
+        df["RTO Amount"] = np.where(rto, listing - gst, np.nan)
+    return df
+
+
+def metric_frame(df: pd.DataFrame, cols: PnlColumns) -> pd.DataFrame:
+    """The columns pnl_metrics() sums per status (settle, rto, claims / recovery and their non-zero rows)."""
+    typed = {}
+    if cols.settle:
+        typed["settle"] = df[cols.settle]
+    if "RTO Amount" in df.columns:
+        typed["rto"] = df["RTO Amount"]
+    for name, col in (("claims", cols.claims), ("recovery", cols.recovery)):
+        if col:
+            typed[name] = df[col]
+            typed[name + "_rows"] = df[col] != 0
+    return pd.DataFrame(typed, index=df.index)
+
+
+def status_key(df: pd.DataFrame, cols: PnlColumns) -> pd.Series:
+    return df[cols.status].astype(str).str.upper()
+
+
+def pnl_metrics(df: pd.DataFrame, cols: PnlColumns) -> PnlMetrics:
+    """Every card / table number of the P&L page, from ``df`` as prepare_pnl_frame() left it."""
+    values = metric_frame(df, cols)
+    grouped = values.groupby(status_key(df, cols), dropna=False, sort=False)
+    sizes = grouped.size()
+    sums = grouped.sum() if len(values.columns) else pd.DataFrame(index=sizes.index)
+
+    def total(name, default=0):
+        return sums[name].sum() if name in sums else default
+
+    settle = sums["settle"] if "settle" in sums else pd.Series(dtype=float)
+    amounts = {s: settle.get(s, 0.0) for s in STATUSES if s != "RTO"}
+    amounts["RTO"] = sums["rto"].get("RTO", 0.0) if "rto" in sums else 0
+    return PnlMetrics(
+        orders=len(df),
+        counts={s: int(sizes.get(s, 0)) for s in STATUSES},
+        amounts=amounts,
+        claims_count=int(total("claims_rows")),
+        recovery_count=int(total("recovery_rows")),
+        claims_amount=total("claims"),
+        recovery_amount=abs(total("recovery")),
+    )
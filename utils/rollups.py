@@ -0,0 +1,201 @@
+"""
+Daily / weekly / monthly rollups of an "Order Payments" upload (the P&L trends).
+
+The P&L page only had totals over the current filter, and regrouped the
+filtered rows by day for its timeline on every rerun. ``build_rollups(df, ...)``
+groups the prepared frame (prepare_pnl_frame) once per upload into one cube
+per frequency, keyed by
+
+    period          day / week (from Monday) / month of the order date
+    status          upper-cased live status, missing kept (as pnl_metrics)
+    sku, catalog    as the sidebar filters compare them (str)
+    dispatched      the row has a dispatch date
+
+holding the row count and the metric_frame() sums (settlement, RTO amount,
+claims, recovery and their non-zero rows), plus a per-status cube without
+SKU / catalog for views not filtered on them, and the ads cost per period.
+
+A view is one groupby of a cube, whatever the number of orders:
+
+    orders(freq, **filters)                 orders per period
+    trend(freq, product_cost, **filters)    per period the cards' numbers
+                                            (counts, settlement, claims,
+                                            recovery, net profit as
+                                            PnlMetrics.profit) and ads cost
+
+filters: ``start`` / ``end`` (days, inclusive), ``skus``, ``catalogs``,
+``statuses`` (upper-cased, None / NaN for missing) and ``dispatched``. A
+window that does not cover the whole upload is cut from the daily cube and
+regrouped to the period. Rows without an order date are in no period.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.ads_ledger import AdsLedger
+from utils.pnl_metrics import PnlColumns, Profit, metric_frame, status_key
+
+FREQUENCIES = ("Daily", "Weekly", "Monthly")
+
+_KEYS = ["period", "status", "sku", "catalog", "dispatched"]
+_TOTAL_KEYS = ["period", "status", "dispatched"]
+
+
+@dataclass(frozen=True)
+class RollupColumns:
+    date: str
+    dispatch: Optional[str] = None
+    sku: Optional[str] = None
+    catalog: Optional[str] = None
+
+
+def period_start(days: pd.Series, freq: str) -> pd.Series:
+    """First day of the period of each day (weeks start on Monday)."""
+    if freq == "Daily":
+        return days
+    if freq == "Weekly":
+        return days - pd.to_timedelta(days.dt.dayofweek, unit="D")
+    return days.dt.to_period("M").dt.start_time
+
+
+@dataclass
+class Rollups:
+    detail: Dict[str, pd.DataFrame]     # freq -> sums by _KEYS
+    totals: Dict[str, pd.DataFrame]     # freq -> sums by _TOTAL_KEYS
+    ads: Dict[str, pd.Series] = field(default_factory=dict)   # freq -> ads cost by period
+    timed: bool = False                 # order dates carry a time of day: day windows are not exact
+    first: Optional[pd.Timestamp] = None    # first / last day with orders or ads
+    last: Optional[pd.Timestamp] = None
+
+    @property
+    def values(self) -> list:
+        return [c for c in self.totals["Daily"].columns if c not in _TOTAL_KEYS]
+
+    def _whole(self, start, end) -> bool:
+        return (start is None or pd.isna(self.first) or start <= self.first) and \
+               (end is None or pd.isna(self.last) or end >= self.last)
+
+    def _slice(self, freq, start=None, end=None, skus=None, catalogs=None, statuses=None, dispatched=False):
+        """The cube rows of a view and the period of each."""
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+        whole = self._whole(start, end)
+        cubes = self.totals if skus is None and catalogs is None else self.detail
+        cube = cubes[freq if whole else "Daily"]
+        keep = np.ones(len(cube), dtype=bool)
+        if not whole:
+            if start is not None:
+                keep &= (cube["period"] >= start).to_numpy()
+            if end is not None:
+                keep &= (cube["period"] <= end).to_numpy()
+        for name, selected in (("sku", skus), ("catalog", catalogs), ("status", statuses)):
+            if selected is not None:
+                keep &= cube[name].isin(list(selected)).to_numpy()
+        if dispatched:
+            keep &= cube["dispatched"].to_numpy(dtype=bool)
+        part = cube[keep]
+        return part, (part["period"] if whole else period_start(part["period"], freq)), whole, start, end
+
+    def _ads(self, freq, whole, start, end) -> pd.Series:
+        if not self.ads:
+            return pd.Series(dtype=float)
+        if whole:
+            return self.ads[freq]
+        daily = self.ads["Daily"]
+        days = daily.index.to_series()
+        keep = pd.Series(True, index=daily.index)
+        if start is not None:
+            keep &= days >= start
+        if end is not None:
+            keep &= days <= end
+        daily = daily[keep.to_numpy()]
+        return daily.groupby(period_start(daily.index.to_series(), freq).to_numpy()).sum()
+
+    def orders(self, freq: str, **filters) -> pd.Series:
+        """Orders per period (periods without any left out), oldest first."""
+        part, periods, *_ = self._slice(freq, **filters)
+        counts = part["rows"].groupby(periods.to_numpy()).sum()
+        return counts[counts > 0].rename_axis("Period").rename("Orders")
+
+    def trend(self, freq: str, product_cost: float = 0.0, **filters) -> pd.DataFrame:
+        """One row per period: order counts, settlement per status, claims, recovery, net profit, ads cost."""
+        part, periods, whole, start, end = self._slice(freq, **filters)
+        sums = part[self.values].groupby([periods.to_numpy(), part["status"].to_numpy()], dropna=False).sum()
+        wide = sums.unstack(level=1, fill_value=0)
+        index = wide.index
+        ads = self._ads(freq, whole, start, end) if self.ads else None
+        if ads is not None:
+            index = index.union(ads.index)
+        wide = wide.reindex(index, fill_value=0)
+        cells = wide.to_numpy(dtype=float)
+        position = {key: i for i, key in enumerate(wide.columns)}
+
+        def by_status(value, status):
+            i = position.get((value, status))
+            return cells[:, i] if i is not None else np.zeros(len(index))
+
+        def overall(value):
+            return cells[:, [i for (v, _), i in position.items() if v == value]].sum(axis=1)
+
+        out = {"Period": index, "Orders": overall("rows").astype(int)}
+        for status in ("DELIVERED", "RETURN", "EXCHANGE", "CANCELLED", "RTO"):
+            out[status.title() if status != "RTO" else status] = by_status("rows", status).astype(int)
+        out.update({
+            "Delivered ₹": by_status("settle", "DELIVERED"), "Return ₹": by_status("settle", "RETURN"),
+            "RTO ₹": by_status("rto", "RTO"), "Claims ₹": overall("claims"), "Recovery ₹": np.abs(overall("recovery")),
+        })
+        if ads is not None:
+            out["Ads Cost"] = ads.reindex(index, fill_value=0).to_numpy(dtype=float)
+
+        # PnlMetrics.profit() per period: exchanges charged at the period's average return loss
+        returns, delivered = out["Return"], out["Delivered"]
+        return_loss = np.abs(out["Return ₹"])
+        avg_return = np.divide(return_loss, returns, out=np.zeros(len(index)), where=returns > 0)
+        net = Profit(out["Delivered ₹"], return_loss, out["Exchange"] * avg_return, delivered * product_cost).net
+        out["Net Profit"] = net
+        out["Return %"] = np.divide(returns * 100, delivered, out=np.zeros(len(index)), where=delivered > 0)
+        out["Net Change"] = np.diff(net, prepend=net[:1]) if len(net) else net
+        return pd.DataFrame(out)
+
+
+def build_rollups(df: pd.DataFrame, pnl_cols: PnlColumns, cols: RollupColumns,
+                  ads: Optional[AdsLedger] = None) -> Rollups:
+    """Rollups of ``df`` (as prepare_pnl_frame() left it) and of the ads ledger's cost per day."""
+    stamps = df[cols.date]
+    day = stamps.dt.normalize()
+    dated = day.notna().to_numpy()
+    frame = pd.DataFrame({
+        "status": status_key(df, pnl_cols),
+        "sku": df[cols.sku].astype(str) if cols.sku else "",
+        "catalog": df[cols.catalog].astype(str) if cols.catalog else "",
+        "dispatched": df[cols.dispatch].notna() if cols.dispatch else True,
+        "rows": 1,
+    }, index=df.index)
+    frame = pd.concat([frame, metric_frame(df, pnl_cols)], axis=1)[dated]
+    day = day[dated]
+
+    detail, totals = {}, {}
+    for freq in FREQUENCIES:
+        frame["period"] = period_start(day, freq)
+        detail[freq] = frame.groupby(_KEYS, dropna=False, sort=True).sum().reset_index()
+        totals[freq] = detail[freq].drop(columns=["sku", "catalog"]).groupby(_TOTAL_KEYS, dropna=False, sort=True).sum().reset_index()
+
+    ads_cost = {}
+    if ads is not None:
+        ads_cost = {freq: ads.daily.groupby(period_start(ads.daily.index.to_series(), freq).to_numpy()).sum()
+                    for freq in FREQUENCIES}
+    days = pd.concat([day, ads.daily.index.to_series()] if ads is not None else [day])
+    return Rollups(detail, totals, ads_cost, timed=bool((stamps.notna() & (stamps != stamps.dt.normalize())).any()),
+                   first=days.min(), last=days.max())
+
+
+def selected_statuses(selection: Iterable[str]) -> Optional[list]:
+    """The page's Status multiselect as ``statuses`` (None for 'All'; "" or nothing picked: missing status)."""
+    selection = list(selection)
+    if "All" in selection:
+        return None
+    clean = [s.upper() for s in selection if s]
+    return clean + [None] if ("" in selection or not clean) else clean
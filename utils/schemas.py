@@ -0,0 +1,155 @@
+"""
+Registry of the Meesho report layouts, and header-row detection.
+
+Meesho reports put a variable number of title / blank lines above the
+header row, and some put a "(see help)" notes line under it. Instead of a
+hard-coded ``skiprows`` per page, ``read_report(upload, reports)`` reads the
+first PREFIX_ROWS raw rows, finds the row holding one of the ``reports``'
+signature columns, and then does one full read from that row: notes lines
+skipped, id columns kept as text, and only ``columns`` when the page names
+them. ``find_layout`` does the same on a grid already in memory (the ZIP
+merge reads its sheets with header=None).
+
+A file where no signature is found is read with ``default_header`` (the
+page's old fixed row), or raises ValueError when there is none.
+"""
+
+import csv
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.bundle import bundle_rows, is_bundle
+from utils.excel_reader import sheet_rows
+from utils.ingest import parse_upload, upload_bytes, upload_digest, upload_kind
+from utils.parse_cache import cached_frame
+
+PREFIX_ROWS = 30
+
+
+@dataclass(frozen=True)
+class ReportSchema:
+    name: str
+    signature: Tuple[str, ...]       # header cells that all appear on the header row
+    text: Tuple[str, ...] = ()       # id columns read as str (no 1.2e+11, no lost leading zeros)
+    numbers: Tuple[str, ...] = ()    # amount columns: a line under the header with no number
+                                     # in any of them is a notes line
+    sheet: Optional[str] = None      # workbook sheet of the report, when it is one
+
+
+SCHEMAS = {s.name: s for s in [
+    ReportSchema("order_payments", ("Sub Order No", "Live Order Status"),
+                 text=("Sub Order No", "Supplier SKU", "Transaction ID"),
+                 numbers=("Final Settlement Amount",), sheet="Order Payments"),
+    ReportSchema("ads_cost", ("Deduction Duration", "Total Ads Cost"),
+                 numbers=("Total Ads Cost",), sheet="Ads Cost"),
+    ReportSchema("referral_payments", ("Sub Order No", "Referral Amount"),
+                 text=("Sub Order No",), numbers=("Referral Amount",), sheet="Referral Payments"),
+    ReportSchema("returns_in_transit", ("Courier Partner", "Return Created Date"),
+                 text=("Sub Order No", "AWB Number", "SKU"), numbers=("Qty",)),
+    ReportSchema("returns_delivered", ("Courier Partner", "Delivered Date"),
+                 text=("Sub Order No", "AWB Number", "SKU"), numbers=("Qty",)),
+    ReportSchema("orders", ("Reason for Credit Entry", "Sub Order No"),
+                 text=("Sub Order No", "SKU", "Packet Id"),
+                 numbers=("Supplier Listed Price (Incl. GST + Commission)",
+                          "Supplier Discounted Price (Incl GST and Commision)")),
+]}
+
+
+@dataclass(frozen=True)
+class Layout:
+    schema: Optional[ReportSchema]
+    header: int                                # raw row index of the header row
+    skip: Tuple[int, ...]                      # raw rows to skip: everything above the header + notes lines
+    names: Tuple[str, ...]                     # header cells as in the file
+
+    @property
+    def data_start(self) -> int:
+        return max(self.skip + (self.header,)) + 1
+
+
+def _cell(v) -> str:
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    return " ".join(str(v).split()).casefold()
+
+
+def _is_number(v) -> bool:
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return v == v
+    text = _cell(v).replace(",", "").replace("₹", "").strip("()")
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _notes_lines(rows: Sequence[list], header: int, names: List[str], schema: ReportSchema) -> Tuple[int, ...]:
+    wanted = {_cell(c) for c in schema.numbers}
+    cols = [i for i, n in enumerate(names) if _cell(n) in wanted]
+    after = header + 1
+    if not cols or after >= len(rows):
+        return ()
+    row = rows[after]
+    cells = [row[i] if i < len(row) else "" for i in cols]
+    has_text = any(_cell(v) for v in row)
+    return (after,) if has_text and not any(_is_number(v) for v in cells) else ()
+
+
+def find_layout(rows: Sequence[list], reports: Iterable[str]) -> Optional[Layout]:
+    """The layout of the first row carrying a signature of ``reports``, None when there is none."""
+    schemas = [SCHEMAS[r] for r in reports]
+    for i, row in enumerate(rows):
+        cells = {_cell(v) for v in row}
+        for schema in schemas:
+            if all(_cell(c) in cells for c in schema.signature):
+                names = ["" if _cell(v) == "" else str(v) for v in row]
+                return Layout(schema, i, tuple(range(i)) + _notes_lines(rows, i, names, schema), tuple(names))
+    return None
+
+
+def prefix_rows(data: bytes, kind: str, sheet_name=0, rows: int = PREFIX_ROWS, encoding: str = "utf-8") -> List[list]:
+    """The first ``rows`` raw rows of a CSV / workbook sheet / .meesho bundle sheet."""
+    if kind == "csv":
+        text = data[:1 << 18].decode("utf-8-sig" if encoding.lower() in ("utf-8", "utf8") else encoding,
+                                     errors="replace")
+        return [r for _, r in zip(range(rows), csv.reader(text.splitlines()))]
+    if is_bundle(data):
+        return bundle_rows(data, sheet_name, rows)
+    return sheet_rows(data, sheet_name, rows)
+
+
+def _read(data: bytes, kind: str, reports: Tuple[str, ...], columns: Optional[Tuple[str, ...]],
+          default_header: Optional[int], opts: dict) -> pd.DataFrame:
+    layout = find_layout(prefix_rows(data, kind, opts.get("sheet_name", 0), encoding=opts.get("encoding", "utf-8")),
+                         reports)
+    if layout is None:
+        if default_header is None:
+            raise ValueError(f"No {' / '.join(reports)} header found in the first {PREFIX_ROWS} rows.")
+        return parse_upload(data, kind, skiprows=default_header, **opts)
+    read_opts = dict(opts)
+    read_opts["skiprows"] = list(layout.skip)
+    if columns is not None:
+        read_opts["usecols"] = [n for n in layout.names if n in columns]
+    if "dtype" not in read_opts:
+        text = [n for n in layout.names if n in layout.schema.text and (columns is None or n in columns)]
+        if text:
+            read_opts["dtype"] = {n: str for n in text}
+    return parse_upload(data, kind, **read_opts)
+
+
+def read_report(upload, reports: Iterable[str], kind: Optional[str] = None, columns: Optional[Iterable[str]] = None,
+                default_header: Optional[int] = None, **opts) -> pd.DataFrame:
+    """
+    One of ``reports`` (SCHEMAS names) read from its detected header row; ``columns``: only these
+    (the ones the file has). ``opts`` go to pd.read_excel / pd.read_csv. Cached as a whole.
+    """
+    kind = kind or upload_kind(upload)
+    data = upload_bytes(upload)
+    reports = tuple(reports)
+    columns = tuple(columns) if columns is not None else None
+    return cached_frame(data, lambda: _read(data, kind, reports, columns, default_header, opts), upload_digest(upload),
+                        kind=f"report-{kind}", reports=reports, columns=columns, default_header=default_header,
+                        schemas=[SCHEMAS[r] for r in reports], **opts)
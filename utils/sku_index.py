@@ -0,0 +1,136 @@
+"""
+Substring search over the distinct SKUs of a dataset, for the SKU group managers.
+
+The pages matched a keyword with ``[s for s in skus if kw.lower() in s.lower()]``
+on every keystroke, lower-casing every SKU again each time. ``sku_index(skus)``
+builds, once per SKU list (kept in a small module-level LRU), postings of
+the lower-cased SKUs' 1-, 2- and 3-character n-grams:
+
+    search("kurti")           same result as the comprehension, in ``skus`` order:
+                              the postings of the query's trigrams are intersected
+                              (rarest first) and only those candidates are checked
+                              with ``in``; 1- to 3-character queries are answered
+                              by their postings directly
+    search_all("kurti red")   SKUs containing every word (AND of search())
+    match("kurti red")        search(), or search_all() when the whole phrase
+                              matches nothing: what the SKU group managers use
+
+The postings are built in numpy: the SKUs as a fixed-width code point array,
+each n-gram numbered in base (distinct characters + 1), and (gram, SKU) pairs
+sorted once.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+GRAM = 3
+
+_NONE = np.empty(0, dtype=np.int32)
+
+
+def _sorted_unique(a: np.ndarray) -> np.ndarray:
+    # np.unique hashes in numpy 2, several times slower than a sort here
+    a = np.sort(a)
+    return a[np.r_[True, a[1:] != a[:-1]]] if len(a) else a
+
+
+class SkuIndex:
+    def __init__(self, skus: Iterable[str]):
+        self.skus = [str(s) for s in skus]
+        self._items = np.array(self.skus, dtype=object)
+        self._lower = [s.lower() for s in self.skus]
+        self._digits: Dict[str, int] = {}
+        self._base = 1
+        self._postings: Dict[int, np.ndarray] = {}
+        if self.skus:
+            self._build()
+
+    def _build(self) -> None:
+        n = len(self._lower)
+        text = np.array(self._lower, dtype=str)
+        width = text.dtype.itemsize // 4
+        points = text.view(np.uint32).reshape(n, width)
+        lengths = np.fromiter(map(len, self._lower), dtype=np.int64, count=n)
+        alphabet = _sorted_unique(points.ravel())
+        self._digits = {chr(c): d for d, c in enumerate(alphabet.tolist(), start=1)}
+        self._base = base = len(alphabet) + 1
+        digits = np.searchsorted(alphabet, points).astype(np.int64) + 1
+        rows = np.arange(n, dtype=np.int64)[:, None]
+        columns = np.arange(width)
+        pairs = []
+        for size in range(1, min(GRAM, width) + 1):
+            span = width - size + 1
+            gram = digits[:, :span]
+            for k in range(1, size):
+                gram = gram * base + digits[:, k:k + span]
+            present = columns[None, :span] < (lengths - size + 1)[:, None]
+            pairs.append((gram * n + rows)[present])
+        gram, row = np.divmod(_sorted_unique(np.concatenate(pairs)), n)
+        starts = np.flatnonzero(np.r_[True, gram[1:] != gram[:-1]])
+        self._postings = dict(zip(gram[starts].tolist(), np.split(row.astype(np.int32), starts[1:])))
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def _gram(self, text: str) -> Optional[int]:
+        code = 0
+        for ch in text:
+            digit = self._digits.get(ch)
+            if digit is None:
+                return None
+            code = code * self._base + digit
+        return code
+
+    def _posting(self, text: str) -> np.ndarray:
+        return self._postings.get(self._gram(text), _NONE)
+
+    def _ids(self, query: str) -> np.ndarray:
+        q = query.lower()
+        if not q:
+            return np.arange(len(self.skus), dtype=np.int32)
+        if len(q) <= GRAM:
+            return self._posting(q)
+        lists = sorted((self._posting(q[j:j + GRAM]) for j in range(len(q) - GRAM + 1)), key=len)
+        ids = lists[0]
+        for other in lists[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        lower = self._lower
+        return np.fromiter((i for i in ids.tolist() if q in lower[i]), dtype=np.int32)
+
+    def _take(self, ids: np.ndarray) -> List[str]:
+        return self._items[ids].tolist()
+
+    def search(self, query: str) -> List[str]:
+        """The SKUs containing ``query`` (case-insensitive), in index order; all of them for ""."""
+        return self._take(self._ids(query))
+
+    def search_all(self, query: str) -> List[str]:
+        """The SKUs containing every whitespace-separated word of ``query``."""
+        words = query.split()
+        if not words:
+            return []
+        ids = self._ids(words[0])
+        for w in words[1:]:
+            ids = np.intersect1d(ids, self._ids(w), assume_unique=True)
+        return self._take(ids)
+
+    def match(self, query: str) -> List[str]:
+        """search(query), falling back to search_all() for a multi-word query no SKU contains as is."""
+        found = self.search(query)
+        if not found and len(query.split()) > 1:
+            found = self.search_all(query)
+        return found
+
+
+@lru_cache(maxsize=16)
+def _cached(skus: tuple) -> SkuIndex:
+    return SkuIndex(skus)
+
+
+def sku_index(skus: Iterable[str]) -> SkuIndex:
+    """The SkuIndex of ``skus``, reused while the same list comes back (every rerun of a page)."""
+    return _cached(tuple(skus))
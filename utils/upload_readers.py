@@ -0,0 +1,65 @@
+"""
+Per-file readers of the multi-upload pages, for utils.ingest.read_uploads().
+
+They live in a module rather than the page scripts so process-pool workers
+(utils.parallel) can import them. Each one takes (file name, file bytes,
+position in the upload list, *page args) and returns the file's frame with
+the page's own header handling already applied; the page then lines the
+frames up and concatenates once.
+"""
+
+import pandas as pd
+
+from utils.ingest import read_csv_columns, read_upload
+from utils.schemas import read_report
+
+
+def intransit_report(name: str, data: bytes, pos: int) -> pd.DataFrame:
+    """6_intransit_return_details.py: from the detected header row (row 8 when none is found)."""
+    kind = "csv" if name.endswith(".csv") else "excel"
+    return read_report(data, ("returns_in_transit",), kind, default_header=7)
+
+
+def delivered_report(name: str, data: bytes, pos: int, header_row: int) -> pd.DataFrame:
+    """7_ Delivered_return_details.py: all text, from the detected header row, else ``header_row``, else the first row."""
+    kind = "csv" if name.lower().endswith(".csv") else "excel"
+    extra = {"encoding": "utf-8"} if kind == "csv" else {}
+    try:
+        return read_report(data, ("returns_delivered",), kind, default_header=header_row, dtype=str, **extra)
+    except Exception:
+        return read_upload(data, kind, dtype=str, **extra)
+
+
+def order_list_file(name: str, data: bytes, pos: int) -> pd.DataFrame:
+    """8_Order_List.py: Excel, or CSV in utf-8 / latin1, with stripped column names."""
+    try:
+        if name.lower().endswith(('.xlsx', '.xls')):
+            df = read_upload(data, "excel")
+        else:
+            df = read_upload(data, "csv", encoding='utf-8', on_bad_lines='skip')
+    except Exception:
+        df = read_upload(data, "csv", encoding='latin1', on_bad_lines='skip')
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+
+def discount_csv(name: str, data: bytes, pos: int, dtypes: dict) -> pd.DataFrame:
+    """10_Discount_Dashboard.py: the page's ``dtypes`` columns of a CSV (EmptyDataError for an empty file)."""
+    return read_csv_columns(data, dtypes)
+
+
+def order_performance_file(name: str, data: bytes, pos: int) -> pd.DataFrame:
+    """11_Order_Performance.py orders: every file after the first loses its first row."""
+    lower = name.lower()
+    if lower.endswith(".csv"):
+        df = read_upload(data, "csv", low_memory=False)
+    elif lower.endswith((".xls", ".xlsx")):
+        df = read_upload(data, "excel")
+    else:
+        raise ValueError("Upload CSV or Excel only.")
+    return df.iloc[1:] if pos > 0 else df
+
+
+def ads_cost_file(name: str, data: bytes, pos: int) -> pd.DataFrame:
+    """11_Order_Performance.py ads: from the detected header row, notes line under it dropped."""
+    return read_report(data, ("ads_cost",), "excel").reset_index(drop=True)
@@ -0,0 +1,364 @@
+"""
+User store backends for the login gate.
+
+``JsonUserStore`` keeps the original ``users.json`` layout (whole-file
+read/rewrite).  ``SqliteUserStore`` keeps one row per user in an embedded
+SQLite database in WAL mode: lookups are keyed, device binding / expiry
+changes are single-row UPDATEs, and readers never block the writer.
+
+Pick the backend with the ``USER_STORE`` env var ("sqlite" default, "json").
+
+Expiry dates are stored as ISO ``YYYY-MM-DD`` strings, so string order is
+date order and the SQLite ``expiry`` index answers range queries directly.
+"""
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+USER_FILE = os.environ.get("USER_FILE", "users.json")
+USER_DB = os.environ.get("USER_DB", "users.db")
+
+# Seed account used when no store exists yet (same as the original users.json bootstrap)
+DEFAULT_USERS = {"admin@test.com": {"password": "123", "expiry": "2030-01-01", "device": ""}}
+
+
+class UserStore:
+    """Interface every backend implements. Records are dicts with password / expiry / device."""
+
+    def get(self, email: str) -> Optional[Dict[str, str]]:
+        raise NotImplementedError
+
+    def list_emails(self) -> List[str]:
+        raise NotImplementedError
+
+    def upsert(self, email: str, password: str, expiry: str, device: str = "") -> None:
+        raise NotImplementedError
+
+    def bind_device(self, email: str, device: str) -> bool:
+        """Bind ``device`` if the account has none yet. True if the account is (now) on ``device``."""
+        raise NotImplementedError
+
+    def reset_device(self, email: str) -> None:
+        raise NotImplementedError
+
+    def set_expiry(self, email: str, expiry: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, email: str) -> None:
+        raise NotImplementedError
+
+    def bulk_apply(self, rows: List[Dict]) -> Dict[str, int]:
+        """
+        Apply many user changes at once (see ``read_bulk_csv`` for the row shape).
+        Existing users get the non-empty fields updated, new users need password + expiry.
+        Returns counts: inserted / updated / skipped.
+        """
+        raise NotImplementedError
+
+    def expiring_between(self, start: str, end: str) -> List[Tuple[str, str]]:
+        """(email, expiry) pairs with start <= expiry <= end, soonest first."""
+        raise NotImplementedError
+
+    def purge_expired(self, today: str, keep: Iterable[str] = ()) -> int:
+        """Delete users whose expiry is before ``today`` (except ``keep``). Returns rows deleted."""
+        raise NotImplementedError
+
+
+# ------------------------------
+# JSON backend (legacy layout)
+# ------------------------------
+class JsonUserStore(UserStore):
+    def __init__(self, path: str = USER_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            self._write(DEFAULT_USERS)
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def _write(self, data) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def get(self, email):
+        return self._read().get(email)
+
+    def list_emails(self):
+        return list(self._read().keys())
+
+    def upsert(self, email, password, expiry, device=""):
+        with self._lock:
+            users = self._read()
+            users[email] = {"password": password, "expiry": str(expiry), "device": device}
+            self._write(users)
+
+    def bind_device(self, email, device):
+        with self._lock:
+            users = self._read()
+            if email not in users:
+                return False
+            if users[email]["device"] == "":
+                users[email]["device"] = device
+                self._write(users)
+            return users[email]["device"] == device
+
+    def reset_device(self, email):
+        with self._lock:
+            users = self._read()
+            if email in users:
+                users[email]["device"] = ""
+                self._write(users)
+
+    def set_expiry(self, email, expiry):
+        with self._lock:
+            users = self._read()
+            if email in users:
+                users[email]["expiry"] = str(expiry)
+                self._write(users)
+
+    def delete(self, email):
+        with self._lock:
+            users = self._read()
+            if users.pop(email, None) is not None:
+                self._write(users)
+
+    def bulk_apply(self, rows):
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        with self._lock:
+            users = self._read()
+            for r in rows:
+                u = users.get(r["email"])
+                if u is None:
+                    if not r["password"] or not r["expiry"]:
+                        counts["skipped"] += 1
+                        continue
+                    users[r["email"]] = {"password": r["password"], "expiry": r["expiry"], "device": ""}
+                    counts["inserted"] += 1
+                    continue
+                if r["password"]:
+                    u["password"] = r["password"]
+                if r["expiry"]:
+                    u["expiry"] = r["expiry"]
+                if r["reset_device"]:
+                    u["device"] = ""
+                counts["updated"] += 1
+            self._write(users)
+        return counts
+
+    def expiring_between(self, start, end):
+        hits = [(e, u["expiry"]) for e, u in self._read().items() if start <= u["expiry"] <= end]
+        return sorted(hits, key=lambda t: t[1])
+
+    def purge_expired(self, today, keep=()):
+        keep = set(keep)
+        with self._lock:
+            users = self._read()
+            gone = [e for e, u in users.items() if u["expiry"] < today and e not in keep]
+            for e in gone:
+                users.pop(e)
+            if gone:
+                self._write(users)
+        return len(gone)
+
+
+# ------------------------------
+# SQLite backend (WAL)
+# ------------------------------
+class SqliteUserStore(UserStore):
+    def __init__(self, path: str = USER_DB):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                " email TEXT PRIMARY KEY,"
+                " password TEXT NOT NULL,"
+                " expiry TEXT NOT NULL,"
+                " device TEXT NOT NULL DEFAULT '')"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_users_expiry ON users (expiry)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread: Streamlit runs every session on its own script thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, email):
+        row = self._conn().execute(
+            "SELECT password, expiry, device FROM users WHERE email = ?", (email,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"password": row[0], "expiry": row[1], "device": row[2]}
+
+    def list_emails(self):
+        return [r[0] for r in self._conn().execute("SELECT email FROM users ORDER BY rowid")]
+
+    def upsert(self, email, password, expiry, device=""):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO users (email, password, expiry, device) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(email) DO UPDATE SET password = excluded.password, "
+                "expiry = excluded.expiry, device = excluded.device",
+                (email, password, str(expiry), device),
+            )
+
+    def bind_device(self, email, device):
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE users SET device = ? WHERE email = ? AND device = ''", (device, email))
+            row = conn.execute("SELECT device FROM users WHERE email = ?", (email,)).fetchone()
+        return row is not None and row[0] == device
+
+    def reset_device(self, email):
+        with self._conn() as conn:
+            conn.execute("UPDATE users SET device = '' WHERE email = ?", (email,))
+
+    def set_expiry(self, email, expiry):
+        with self._conn() as conn:
+            conn.execute("UPDATE users SET expiry = ? WHERE email = ?", (str(expiry), email))
+
+    def delete(self, email):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM users WHERE email = ?", (email,))
+
+    def bulk_apply(self, rows):
+        conn = self._conn()
+        with conn:
+            # stage the batch, then two set-based statements inside one transaction
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS bulk_users ("
+                " email TEXT PRIMARY KEY, password TEXT, expiry TEXT, reset INTEGER)"
+            )
+            conn.execute("DELETE FROM bulk_users")
+            conn.executemany(
+                "INSERT OR REPLACE INTO bulk_users (email, password, expiry, reset) VALUES (?, ?, ?, ?)",
+                [(r["email"], r["password"] or None, r["expiry"] or None, int(bool(r["reset_device"]))) for r in rows],
+            )
+            staged = conn.execute("SELECT COUNT(*) FROM bulk_users").fetchone()[0]
+            updated = conn.execute(
+                "UPDATE users SET"
+                " password = COALESCE(b.password, users.password),"
+                " expiry = COALESCE(b.expiry, users.expiry),"
+                " device = CASE WHEN b.reset THEN '' ELSE users.device END"
+                " FROM bulk_users AS b WHERE b.email = users.email"
+            ).rowcount
+            inserted = conn.execute(
+                "INSERT INTO users (email, password, expiry, device)"
+                " SELECT b.email, b.password, b.expiry, '' FROM bulk_users AS b"
+                " WHERE b.password IS NOT NULL AND b.expiry IS NOT NULL"
+                " AND NOT EXISTS (SELECT 1 FROM users AS u WHERE u.email = b.email)"
+            ).rowcount
+            conn.execute("DELETE FROM bulk_users")
+        return {"inserted": inserted, "updated": updated, "skipped": staged - inserted - updated}
+
+    def expiring_between(self, start, end):
+        return self._conn().execute(
+            "SELECT email, expiry FROM users WHERE expiry BETWEEN ? AND ? ORDER BY expiry", (start, end)
+        ).fetchall()
+
+    def purge_expired(self, today, keep=()):
+        keep = list(keep)
+        marks = ",".join("?" * len(keep))
+        sql = "DELETE FROM users WHERE expiry < ?" + (f" AND email NOT IN ({marks})" if keep else "")
+        with self._conn() as conn:
+            return conn.execute(sql, (today, *keep)).rowcount
+
+    def is_migrated(self) -> bool:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'migrated_from_json'").fetchone()
+        return row is not None
+
+
+# ------------------------------
+# Bulk CSV
+# ------------------------------
+_EXPIRY_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%Y/%m/%d")
+
+
+def normalize_expiry(value: str) -> str:
+    """Return ``value`` as YYYY-MM-DD, raising ValueError for unknown formats."""
+    value = str(value).strip()
+    for fmt in _EXPIRY_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"bad expiry date: {value!r}")
+
+
+def read_bulk_csv(data) -> Tuple[List[Dict], List[str]]:
+    """
+    Parse an admin CSV with columns email, password, expiry, reset_device
+    (only email is required; header names are case-insensitive).
+    Returns (rows, errors); a later row for the same email wins.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    reader = csv.DictReader(io.StringIO(data))
+    rows: Dict[str, Dict] = {}
+    errors: List[str] = []
+    for line_no, raw in enumerate(reader, start=2):
+        rec = {str(k).strip().lower(): (v or "").strip() for k, v in raw.items() if k is not None}
+        email = rec.get("email", "")
+        if not email:
+            errors.append(f"line {line_no}: missing email")
+            continue
+        expiry = rec.get("expiry", "")
+        if expiry:
+            try:
+                expiry = normalize_expiry(expiry)
+            except ValueError as e:
+                errors.append(f"line {line_no}: {e}")
+                continue
+        rows[email] = {
+            "email": email,
+            "password": rec.get("password", ""),
+            "expiry": expiry,
+            "reset_device": rec.get("reset_device", "").lower() in ("1", "y", "yes", "true"),
+        }
+    return list(rows.values()), errors
+
+
+def migrate_json_to_sqlite(store: SqliteUserStore, json_path: str = USER_FILE) -> int:
+    """One-shot import of ``users.json`` into ``store``. Returns the number of users imported."""
+    if store.is_migrated():
+        return 0
+    users = DEFAULT_USERS
+    if os.path.exists(json_path):
+        with open(json_path, "r") as f:
+            users = json.load(f)
+    rows = [
+        (email, str(u.get("password", "")), str(u.get("expiry", "")), str(u.get("device", "")))
+        for email, u in users.items()
+    ]
+    with store._conn() as conn:
+        conn.executemany("INSERT OR IGNORE INTO users (email, password, expiry, device) VALUES (?, ?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', ?)", (json_path,))
+    return len(rows)
+
+
+def open_user_store(backend: Optional[str] = None) -> UserStore:
+    backend = (backend or os.environ.get("USER_STORE", "sqlite")).lower()
+    json_path = os.environ.get("USER_FILE", USER_FILE)
+    if backend == "json":
+        return JsonUserStore(json_path)
+    store = SqliteUserStore(os.environ.get("USER_DB", USER_DB))
+    migrate_json_to_sqlite(store, json_path)
+    return store
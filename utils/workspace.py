@@ -0,0 +1,278 @@
+"""
+Per-user workspace on disk, keyed by the logged-in email.
+
+Pages keep their results in ``st.session_state``; anything registered here
+is also written under ``workspaces/<user hash>/`` and put back into the
+session the first time a page asks for it after a refresh or a new login.
+
+    DataFrame            -> <key>.parquet   (utils.frame_io)
+    dict of DataFrames   -> <key>/          (one parquet per entry + _names.json)
+    BytesIO              -> <key>.buf       (generated reports)
+    bytes                -> <key>.bin
+    anything else        -> <key>.json      (SKU groups, file names, ...)
+    uploaded files       -> <key>.files/    (one .bin per file + _names.json)
+
+Uploads are kept as the bytes that came in: after a refresh or a new login
+``uploads_or_saved`` (and utils.datasets.upload_or_saved) hand them back in
+place of an empty uploader, and the pages' reads of them are answered by
+utils.parse_cache, so the files are not parsed again. A user's kept uploads
+are capped at ``WORKSPACE_UPLOADS_MAX_MB`` (default 200): the least
+recently used ones are dropped to make room, and an upload larger than the
+cap is not kept.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from utils.frame_io import read_frame, write_frame
+
+WORKSPACE_DIR = os.environ.get("WORKSPACE_DIR", "workspaces")
+
+_KEPT = "_kept_uploads"          # session: key -> fingerprint of the files on disk
+_RESTORED = "_restored_uploads"  # session: key -> the SavedUploads read back
+
+# session keys that belong to the logged-in user (cleared on logout)
+WORKSPACE_KEYS = ["merged_buf", "filename", "bundle_buf", "seller_dfs", "sku_groups", "merged_df", "courier_stats",
+                  _KEPT, _RESTORED]
+
+_MISSING = object()
+
+
+def uploads_max_bytes() -> int:
+    try:
+        return int(float(os.environ.get("WORKSPACE_UPLOADS_MAX_MB", "200")) * 1024 * 1024)
+    except ValueError:
+        return 200 * 1024 * 1024
+
+
+def _dir_size(path: str) -> int:
+    return sum(f.stat().st_size for f in os.scandir(path) if f.is_file())
+
+
+class Workspace:
+    def __init__(self, email: str, root: str = WORKSPACE_DIR):
+        digest = hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:24]
+        self.dir = os.path.join(root, digest)
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _path(self, key: str, ext: str = "") -> str:
+        return os.path.join(self.dir, key + ext)
+
+    def _existing(self, key: str) -> Optional[str]:
+        for ext in (".parquet", ".buf", ".bin", ".json", ".files", ""):
+            path = self._path(key, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def delete(self, key: str) -> None:
+        path = self._existing(key)
+        if path is None:
+            return
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+    def save(self, key: str, value) -> None:
+        self.delete(key)
+        if value is None:
+            return
+        if isinstance(value, pd.DataFrame):
+            path = self._path(key, ".parquet")
+            write_frame(value, path + ".tmp")
+            os.replace(path + ".tmp", path)
+        elif isinstance(value, dict) and value and all(isinstance(v, pd.DataFrame) for v in value.values()):
+            tmp_dir = self._path(key, ".tmp")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            names = list(value.keys())
+            for i, name in enumerate(names):
+                write_frame(value[name], os.path.join(tmp_dir, f"{i}.parquet"))
+            with open(os.path.join(tmp_dir, "_names.json"), "w") as f:
+                json.dump(names, f)
+            os.replace(tmp_dir, self._path(key))
+        elif isinstance(value, (BytesIO, bytes)):
+            ext = ".buf" if isinstance(value, BytesIO) else ".bin"
+            data = value.getvalue() if isinstance(value, BytesIO) else value
+            with open(self._path(key, ext + ".tmp"), "wb") as f:
+                f.write(data)
+            os.replace(self._path(key, ext + ".tmp"), self._path(key, ext))
+        else:
+            with open(self._path(key, ".json.tmp"), "w") as f:
+                json.dump(value, f)
+            os.replace(self._path(key, ".json.tmp"), self._path(key, ".json"))
+
+    def save_files(self, key: str, files: List[Tuple[str, bytes]], limit: Optional[int] = None) -> bool:
+        """
+        Uploaded files as (name, bytes), replacing what ``key`` held; the least recently used
+        uploads of other keys are dropped to keep them all within ``limit`` bytes. False (and
+        nothing kept under ``key``) when the files alone are larger than that.
+        """
+        limit = uploads_max_bytes() if limit is None else limit
+        self.delete(key)
+        if sum(len(data) for _, data in files) > limit:
+            return False
+        tmp_dir = self._path(key, ".files.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for i, (_, data) in enumerate(files):
+            with open(os.path.join(tmp_dir, f"{i}.bin"), "wb") as f:
+                f.write(data)
+        with open(os.path.join(tmp_dir, "_names.json"), "w") as f:
+            json.dump([name for name, _ in files], f)
+        os.replace(tmp_dir, self._path(key, ".files"))
+        self.evict_files(limit, keep=key)
+        return True
+
+    def evict_files(self, limit: int, keep: Optional[str] = None) -> None:
+        """Drop the least recently used uploads (other than ``keep``'s) until they fit in ``limit`` bytes."""
+        entries = []
+        for entry in os.scandir(self.dir):
+            if not entry.name.endswith(".files") or not entry.is_dir():
+                continue
+            try:
+                used = os.stat(os.path.join(entry.path, "_names.json")).st_mtime
+                entries.append((used, _dir_size(entry.path), entry.name[:-len(".files")], entry.path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, key, path in sorted(entries):
+            if total <= limit:
+                break
+            if key != keep:
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def load_files(self, key: str) -> List[Tuple[str, bytes]]:
+        path = self._path(key, ".files")
+        try:
+            with open(os.path.join(path, "_names.json")) as f:
+                names = json.load(f)
+            out = []
+            for i, name in enumerate(names):
+                with open(os.path.join(path, f"{i}.bin"), "rb") as f:
+                    out.append((name, f.read()))
+            os.utime(os.path.join(path, "_names.json"))  # recently used: evicted last
+            return out
+        except (OSError, ValueError):
+            return []
+
+    def load(self, key: str, default=None):
+        path = self._existing(key)
+        if path is None:
+            return default
+        try:
+            if os.path.isdir(path):
+                with open(os.path.join(path, "_names.json")) as f:
+                    names = json.load(f)
+                return {name: read_frame(os.path.join(path, f"{i}.parquet")) for i, name in enumerate(names)}
+            if path.endswith(".parquet"):
+                return read_frame(path)
+            if path.endswith((".buf", ".bin")):
+                with open(path, "rb") as f:
+                    data = f.read()
+                return BytesIO(data) if path.endswith(".buf") else data
+            with open(path) as f:
+                return json.load(f)
+        except Exception:
+            # a half-written / outdated entry is just treated as missing
+            return default
+
+
+def current_workspace() -> Optional[Workspace]:
+    email = st.session_state.get("user_email")
+    return Workspace(email) if email else None
+
+
+def restore_state(key: str, default=_MISSING) -> None:
+    """Lazily fill ``st.session_state[key]`` from the workspace (or ``default``) if it isn't set yet."""
+    if key in st.session_state:
+        return
+    ws = current_workspace()
+    value = ws.load(key) if ws else None
+    if value is not None:
+        st.session_state[key] = value
+    elif default is not _MISSING:
+        st.session_state[key] = default
+
+
+def persist_state(*keys: str) -> None:
+    """Write the current session value of each key to the user's workspace."""
+    ws = current_workspace()
+    if ws is None:
+        return
+    for key in keys:
+        ws.save(key, st.session_state.get(key))
+
+
+class SavedUpload:
+    """An upload read back from the workspace, read like an UploadedFile."""
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.size = len(data)
+        self._data = data
+
+    def getvalue(self) -> bytes:
+        return self._data
+
+
+def _fingerprint(files: list) -> list:
+    return [[getattr(f, "name", ""), getattr(f, "size", None), getattr(f, "file_id", None)] for f in files]
+
+
+def keep_uploads(key: str, files: list) -> None:
+    """Write the uploaded ``files`` to the user's workspace under ``key``, unless they are the ones kept already."""
+    ws = current_workspace()
+    if ws is None or not files:
+        return
+    kept = st.session_state.setdefault(_KEPT, {})
+    fingerprint = _fingerprint(files)
+    if kept.get(key) == fingerprint:
+        return
+    # UploadedFile, zip members and SavedUpload all hand out their whole content with getvalue()
+    ws.save_files(key, [(getattr(f, "name", ""), f.getvalue()) for f in files])
+    kept[key] = fingerprint
+    st.session_state.setdefault(_RESTORED, {}).pop(key, None)
+
+
+def saved_uploads(key: str) -> List[SavedUpload]:
+    """The files kept under ``key`` ([] when none), read from disk once per session."""
+    restored = st.session_state.setdefault(_RESTORED, {})
+    if key not in restored:
+        ws = current_workspace()
+        restored[key] = [SavedUpload(name, data) for name, data in (ws.load_files(key) if ws else [])]
+        st.session_state.setdefault(_KEPT, {})[key] = _fingerprint(restored[key])
+    return restored[key]
+
+
+def uploads_or_saved(key: str, uploads, container=st):
+    """
+    A file uploader's value (one file or None, or a list with ``accept_multiple_files``),
+    kept in the user's workspace under ``key``. While the uploader is empty the files kept
+    last are returned instead, behind a ticked "Use saved upload ..." checkbox.
+    """
+    many = isinstance(uploads, list)
+    files = list(uploads) if many else [uploads] if uploads is not None else []
+    if files:
+        keep_uploads(key, files)
+        return uploads
+    saved = saved_uploads(key)
+    names = ", ".join(f.name for f in saved)
+    if not saved or not container.checkbox(f"Use saved upload: {names}", value=True, key=f"use_saved_{key}"):
+        return uploads
+    return saved if many else saved[0]
+
+
+def forget_session_state() -> None:
+    """Drop workspace-backed keys from the session (on logout); the files stay on disk."""
+    for key in WORKSPACE_KEYS:
+        st.session_state.pop(key, None)
@@ -0,0 +1,300 @@
+"""
+Cleaning helpers of the ZIP merge page (1_zip_clean.py).
+
+They live in a module rather than the page script so process-pool workers
+(utils.parallel) can import them.
+"""
+
+import math
+import os
+import re
+import zipfile
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from utils.excel_reader import read_sheets
+from utils.frame_io import read_frame, write_frame
+from utils.numeric import coerce_amount_cells
+from utils.parallel import run_ordered
+from utils.schemas import PREFIX_ROWS, SCHEMAS, find_layout
+
+
+def is_suborder_or_blank(series: pd.Series) -> pd.Series:
+    is_blank = series.isna()
+    s_str = series.astype(str).str.strip()
+    s_norm = s_str.replace(r"\s+", " ", regex=True)
+    is_empty = s_norm.eq("") | s_norm.str.lower().eq("nan")
+    is_sub_order = s_norm.str.casefold().eq("sub order")
+    return is_blank | is_empty | is_sub_order
+
+
+def coerce_numeric_df(df: pd.DataFrame) -> pd.DataFrame:
+    return df.apply(coerce_amount_cells, axis=0)
+
+
+def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove rows where column A (index 0) OR column C (index 2) are blank/'Sub Order'. Then coerce numeric."""
+    if df is None or df.empty:
+        return df
+    df = df.copy()
+    try:
+        cond_a1 = is_suborder_or_blank(df.iloc[:, 0])
+    except Exception:
+        cond_a1 = pd.Series(False, index=df.index)
+    if df.shape[1] >= 3:
+        try:
+            cond_a3 = is_suborder_or_blank(df.iloc[:, 2])
+        except Exception:
+            cond_a3 = pd.Series(False, index=df.index)
+    else:
+        cond_a3 = pd.Series(False, index=df.index)
+    df = df.loc[~(cond_a1 | cond_a3)].copy()
+    df = coerce_numeric_df(df)
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+
+WANTED_SHEETS = ["Order Payments", "Ads Cost", "Referral Payments"]
+
+# title, header and notes lines above the data of a sheet whose header row is not found
+HEAD_ROWS = 3
+
+_SHEET_REPORTS = {s.sheet: (s.name,) for s in SCHEMAS.values() if s.sheet}
+
+
+def drop_empty_rows_cols(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove fully-empty rows/cols and renumber both axes (what the old cleaned-workbook round trip did)."""
+    df = df.dropna(axis=0, how="all").dropna(axis=1, how="all")
+    df.index = pd.RangeIndex(len(df))
+    df.columns = pd.RangeIndex(df.shape[1])
+    return df
+
+
+def number_part_of(fname: str) -> str:
+    """Supplier id from a Meesho payment file name ("<id>_SP_....xlsx"), "UNKNOWN" otherwise."""
+    m = re.match(r"(\d+)_SP", os.path.basename(fname), flags=re.IGNORECASE)
+    return m.group(1) if m else "UNKNOWN"
+
+
+def head_rows(df: pd.DataFrame, sheet: str) -> int:
+    """Rows above the data of a sheet (empty rows dropped): up to its header row + notes line."""
+    reports = _SHEET_REPORTS.get(sheet)
+    layout = find_layout(df.head(PREFIX_ROWS).values.tolist(), reports) if reports else None
+    return layout.data_start if layout else HEAD_ROWS
+
+
+def read_wanted_sheets(data, skip_header: bool) -> dict:
+    """
+    Read only the merged sheets of one workbook, given as bytes or a file path.
+    skip_header=True drops the (non-empty) rows above the data, found by head_rows().
+    Returns {sheet: cleaned DataFrame} for the sheets that have data.
+    """
+    out = {}
+    for sheet, raw in read_sheets(data, WANTED_SHEETS, header=None).items():
+        df = drop_empty_rows_cols(raw)
+        if skip_header:
+            # re-infer dtypes on the remaining rows, as read_excel(skiprows=...) did
+            df = df.iloc[head_rows(df, sheet):].infer_objects()
+        df = df.dropna(how='all')
+        if not df.empty:
+            try:
+                df = clean_dataframe(df)
+            except Exception:
+                pass
+            out[sheet] = df
+    return out
+
+
+def read_wanted_sheet_parts(data) -> dict:
+    """
+    Like read_wanted_sheets(), but keeps each sheet's rows above the data apart:
+    {sheet: (header rows, data rows)}, both cleaned. Header + data of the first file
+    followed by the data rows of every later file is exactly what the merge produces.
+    """
+    out = {}
+    for sheet, raw in read_sheets(data, WANTED_SHEETS, header=None).items():
+        df = drop_empty_rows_cols(raw)
+        if df.empty:
+            continue
+        start = head_rows(df, sheet)
+        head, body = df.iloc[:start], df.iloc[start:].infer_objects()
+        try:
+            head, body = clean_dataframe(head), clean_dataframe(body)
+        except Exception:
+            pass
+        out[sheet] = (head, body)
+    return out
+
+
+def merge_in_order(names, results, reread, errors: list):
+    """
+    Walk per-file results in sorted-filename order and yield (fname, result) for the files to merge.
+    The first file that reads fine keeps its header rows: if it was processed with skip_header=True
+    (because earlier files failed), ``reread(fname)`` redoes it with the header kept.
+    Files that failed are reported in ``errors``.
+    """
+    first_file = True
+    for i, (fname, result) in enumerate(zip(names, results)):
+        if first_file and i > 0 and not isinstance(result, Exception):
+            try:
+                result = reread(fname)
+            except Exception as e:
+                result = e
+        if isinstance(result, Exception):
+            errors.append(f"{fname} -> {result}")
+            continue
+        yield fname, result
+        first_file = False
+
+
+def write_merged_workbook(merged_data: dict) -> BytesIO:
+    """concat + clean each sheet and write the workbook (xlsxwriter is far faster than openpyxl; cell text kept literal)."""
+    buf = BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter",
+                        engine_kwargs={"options": {"strings_to_formulas": False, "strings_to_urls": False}}) as writer:
+        for sheet in WANTED_SHEETS:
+            if merged_data.get(sheet):
+                final_df = pd.concat(merged_data[sheet], ignore_index=True)
+                final_df = clean_dataframe(final_df)
+                final_df.to_excel(writer, sheet_name=sheet, index=False, header=False)
+    buf.seek(0)
+    return buf
+
+
+def merge_workbooks(workbooks: list, workers: int = 1):
+    """
+    Merge [(file name, xlsx bytes), ...] (sorted by name) into one cleaned workbook:
+    file 0 keeps its header rows, later files skip them. Returns (BytesIO, errors).
+    """
+    data = dict(workbooks)
+    names = [fname for fname, _ in workbooks]
+    results = run_ordered(read_wanted_sheets, [(data[fname], i > 0) for i, fname in enumerate(names)], workers)
+    errors = []
+    merged_data = {sheet: [] for sheet in WANTED_SHEETS}
+    for fname, sheets in merge_in_order(names, results,
+                                        lambda f: read_wanted_sheets(data[f], skip_header=False), errors):
+        for sheet, df in sheets.items():
+            merged_data[sheet].append(df)
+    return write_merged_workbook(merged_data), errors
+
+
+def merge_supplier(workbooks: list):
+    """Process-pool entry: one supplier's workbooks merged in the worker. Returns (xlsx bytes, errors)."""
+    buf, errors = merge_workbooks(workbooks, workers=1)
+    return buf.getvalue(), errors
+
+
+def partition_by_supplier(names: list) -> dict:
+    """{supplier id: [file names]} keeping the sorted order, suppliers in order of their first file."""
+    parts = {}
+    for fname in names:
+        parts.setdefault(number_part_of(fname), []).append(fname)
+    return parts
+
+
+def bundle_outputs(outputs: dict, date_str: str):
+    """
+    One workbook per supplier -> (BytesIO, download file name): the workbook itself for a
+    single supplier, else a ZIP of "<supplier>_<date>.xlsx" files.
+    """
+    if len(outputs) == 1:
+        supplier, data = next(iter(outputs.items()))
+        buf = BytesIO(data.getvalue() if isinstance(data, BytesIO) else data)
+        return buf, f"{supplier}_{date_str}.xlsx"
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for supplier, data in outputs.items():
+            zf.writestr(f"{supplier}_{date_str}.xlsx", data.getvalue() if isinstance(data, BytesIO) else data)
+    buf.seek(0)
+    return buf, f"{len(outputs)}_suppliers_{date_str}.zip"
+
+
+# ------------------------------
+# Low-memory path: Parquet spool on disk + row-by-row workbook writer
+# ------------------------------
+def spool_wanted_sheets(path: str, skip_header: bool, spool_dir: str, tag: str) -> dict:
+    """
+    read_wanted_sheets() for a workbook on disk, with each cleaned sheet written
+    to ``spool_dir`` instead of being returned. Returns {sheet: (part path, n columns)}.
+    """
+    out = {}
+    for sheet, df in read_wanted_sheets(path, skip_header).items():
+        part = os.path.join(spool_dir, f"{tag}.{WANTED_SHEETS.index(sheet)}.parquet")
+        write_frame(df, part)
+        out[sheet] = (part, df.shape[1])
+    return out
+
+
+def _write_cell(ws, r: int, c: int, v, fmts: dict) -> None:
+    # same cell conversions as DataFrame.to_excel(engine="xlsxwriter"); blanks are skipped
+    if isinstance(v, np.generic):
+        v = v.item()
+    if v is None or v is pd.NaT:
+        return
+    if isinstance(v, float):
+        if math.isnan(v):
+            return
+        if math.isinf(v):
+            ws.write_string(r, c, "inf" if v > 0 else "-inf")
+            return
+    if isinstance(v, datetime):
+        ws.write_datetime(r, c, v.replace(tzinfo=None), fmts["datetime"])
+    elif isinstance(v, date):
+        ws.write_datetime(r, c, v, fmts["date"])
+    elif isinstance(v, timedelta):
+        ws.write_number(r, c, v.total_seconds() / 86400, fmts["timedelta"])
+    else:
+        try:
+            ws.write(r, c, v)
+        except TypeError:
+            ws.write_string(r, c, str(v))
+
+
+def write_spooled_workbook(parts: dict, keys: dict = None) -> BytesIO:
+    """
+    Build the merged workbook from spooled parts ({sheet: [(part path, n columns), ...]} in
+    merge order), one part in memory at a time.
+
+    Same result as concat + clean_dataframe + to_excel: each part is padded to the sheet's
+    widest part first, so the A1/A3 blank checks see the same cells as on the concatenated frame.
+    ``keys`` ({part path: [column positions], or None for the whole row}) drops the rows of
+    those parts whose key an earlier part of the sheet already wrote; keys compare the cells
+    in the order given, so parts may hold the key columns at different positions.
+    """
+    buf = BytesIO()
+    wb = xlsxwriter.Workbook(buf, {"constant_memory": True, "strings_to_formulas": False,
+                                   "strings_to_urls": False})
+    fmts = {
+        "datetime": wb.add_format({"num_format": "YYYY-MM-DD HH:MM:SS"}),
+        "date": wb.add_format({"num_format": "YYYY-MM-DD"}),
+        "timedelta": wb.add_format({"num_format": "0"}),
+    }
+    for sheet in WANTED_SHEETS:
+        if not parts.get(sheet):
+            continue
+        ws = wb.add_worksheet(sheet)
+        width = max(n for _, n in parts[sheet])
+        seen = set()
+        r = 0
+        for path, _ in parts[sheet]:
+            df = read_frame(path)
+            df.columns = pd.RangeIndex(df.shape[1])
+            df = clean_dataframe(df.reset_index(drop=True).reindex(columns=range(width)))
+            if keys and path in keys:
+                key_cols = keys[path]
+                part_keys = [tuple(None if pd.isna(v) else v for v in k)
+                             for k in (df if key_cols is None else df[key_cols]).itertuples(index=False, name=None)]
+                # rows repeated inside one part are kept: a sheet can list a sub order twice
+                df = df.loc[[k not in seen for k in part_keys]]
+                seen.update(part_keys)
+            for row in df.itertuples(index=False, name=None):
+                for c, v in enumerate(row):
+                    _write_cell(ws, r, c, v, fmts)
+                r += 1
+    wb.close()
+    buf.seek(0)
+    return buf